@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escalabilidade das etapas do pipeline
+Gera dados sintéticos M1 (benchmarks/dados_sinteticos.py) para 1, 5 e 20 anos, mede cada etapa de
+run.py e acrescenta os tempos em benchmarks/resultados/etapas.jsonl junto com o commit atual.
+Etapas cujo tempo cresce mais rápido que o número de barras são sinalizadas.
+
+Uso: python benchmarks/benchmark_etapas.py [--anos 1 5 20] [--repeticoes 1] [--graficos]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np
+
+from benchmarks.dados_sinteticos import gerar_m1, salvar_m1
+from src.pipeline import ExecutorPipeline, etapas_padrao
+
+ARQUIVO_RESULTADOS = os.path.join(RAIZ, 'benchmarks', 'resultados', 'etapas.jsonl')
+
+# Expoente de crescimento (tempo ~ barras^k) acima do qual a etapa é sinalizada
+LIMITE_EXPOENTE = 1.2
+# Etapas mais rápidas que isso no maior tamanho não são sinalizadas (ruído de medição)
+TEMPO_MINIMO_S = 0.05
+
+
+def commit_atual():
+    """Hash curto do commit (com '+' se houver alterações não commitadas)"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        alterado = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=RAIZ,
+                                  capture_output=True, text=True).stdout.strip()
+        return commit + ('+' if alterado else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+
+def medir_etapas(pasta, anos, repeticoes, graficos):
+    """Gera os dados e executa o pipeline sem cache; retorna (barras, {etapa: melhor tempo})"""
+    caminho_dados = salvar_m1(gerar_m1(anos), os.path.join(pasta, 'WIN$N_M1.csv'))
+    with open(caminho_dados) as f:
+        barras = sum(1 for _ in f) - 1
+
+    config = {
+        'GAP_MINIMO': 100,
+        'OUTLIER_THRESHOLD': 1.5,
+        'DIAS_LIMITE_GAP': 30,
+        'DATA_FILE': caminho_dados,
+        'OUTPUT_DIR': os.path.join(pasta, 'output'),
+        'PROCESSED_DIR': os.path.join(pasta, 'processed'),
+        'CACHE_ETAPAS': False,
+        'GERAR_GRAFICOS': graficos,
+        'PULAR_SAIDAS_INALTERADAS': False,
+        'GRAFICOS_SEGUNDO_PLANO': False
+    }
+    for pasta_saida in (config['PROCESSED_DIR'], f"{config['OUTPUT_DIR']}/graphs", f"{config['OUTPUT_DIR']}/reports"):
+        os.makedirs(pasta_saida, exist_ok=True)
+
+    tempos = {}
+    for _ in range(repeticoes):
+        executor = ExecutorPipeline(config, etapas_padrao(incluir_graficos=graficos))
+        with contextlib.redirect_stdout(io.StringIO()):
+            executor.executar()
+            executor.finalizar()
+        for etapa, tempo in executor.executadas:
+            tempos[etapa] = min(tempo, tempos.get(etapa, np.inf))
+    return barras, tempos
+
+
+def expoente_crescimento(barras, tempos):
+    """Inclinação de log(tempo) x log(barras): ~1 linear, > 1 superlinear"""
+    if len(barras) < 2 or min(tempos) <= 0:
+        return np.nan
+    return np.polyfit(np.log(barras), np.log(tempos), 1)[0]
+
+
+def carregar_anteriores(commit):
+    """Resultados mais recentes de outro commit, por (anos, etapa)"""
+    if not os.path.exists(ARQUIVO_RESULTADOS):
+        return None, {}
+    with open(ARQUIVO_RESULTADOS, encoding='utf-8') as f:
+        registros = [json.loads(linha) for linha in f if linha.strip()]
+    anteriores = [r for r in registros if r['commit'] != commit]
+    if not anteriores:
+        return None, {}
+    commit_anterior = anteriores[-1]['commit']
+    return commit_anterior, {
+        (r['anos'], r['etapa']): r['tempo_s'] for r in anteriores if r['commit'] == commit_anterior
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o tempo de cada etapa para tamanhos crescentes de histórico")
+    parser.add_argument('--anos', type=float, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--repeticoes', type=int, default=1)
+    parser.add_argument('--graficos', action='store_true', help="Incluir a etapa de gráficos")
+    args = parser.parse_args()
+
+    commit = commit_atual()
+    commit_anterior, anteriores = carregar_anteriores(commit)
+    data = datetime.now().isoformat(timespec='seconds')
+
+    # Execução curta descartada: importações e caches de primeira chamada não entram na medição
+    with tempfile.TemporaryDirectory() as pasta:
+        medir_etapas(pasta, 0.1, 1, args.graficos)
+
+    resultados = []
+    for anos in args.anos:
+        with tempfile.TemporaryDirectory() as pasta:
+            barras, tempos = medir_etapas(pasta, anos, args.repeticoes, args.graficos)
+        print(f"📏 {anos:g} anos: {barras:,} barras")
+        for etapa, tempo in tempos.items():
+            resultados.append({'commit': commit, 'data': data, 'anos': anos, 'barras': barras,
+                               'etapa': etapa, 'tempo_s': round(tempo, 4)})
+
+    os.makedirs(os.path.dirname(ARQUIVO_RESULTADOS), exist_ok=True)
+    with open(ARQUIVO_RESULTADOS, 'a', encoding='utf-8') as f:
+        for registro in resultados:
+            f.write(json.dumps(registro) + '\n')
+
+    print(f"\n{'Etapa':<15} {'Anos':>5} {'Barras':>11} {'Tempo (s)':>10} {'µs/barra':>9} {'Anterior (s)':>13}")
+    print("-" * 68)
+    sinalizadas = []
+    for etapa in dict.fromkeys(r['etapa'] for r in resultados):
+        linhas = [r for r in resultados if r['etapa'] == etapa]
+        for r in linhas:
+            anterior = anteriores.get((r['anos'], etapa))
+            print(f"{etapa:<15} {r['anos']:>5g} {r['barras']:>11,} {r['tempo_s']:>10.3f} "
+                  f"{r['tempo_s'] / r['barras'] * 1e6:>9.2f} {'-' if anterior is None else f'{anterior:.3f}':>13}")
+
+        expoente = expoente_crescimento([r['barras'] for r in linhas], [r['tempo_s'] for r in linhas])
+        print(f"{'':<15} crescimento ~ barras^{expoente:.2f}")
+        if expoente > LIMITE_EXPOENTE and max(linhas, key=lambda r: r['barras'])['tempo_s'] >= TEMPO_MINIMO_S:
+            sinalizadas.append((etapa, expoente))
+
+    print(f"\n💾 Resultados acrescentados em: {ARQUIVO_RESULTADOS} (commit {commit})")
+    if commit_anterior:
+        print(f"📊 Coluna 'Anterior': commit {commit_anterior}")
+    for etapa, expoente in sinalizadas:
+        print(f"⚠️  Etapa '{etapa}' cresce mais rápido que linear (barras^{expoente:.2f})")
+    if not sinalizadas:
+        print("✅ Nenhuma etapa com crescimento superlinear")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark de renderização dos gráficos de barras
+Compara barras em PolyCollection (atual) com um Rectangle por barra (ax.bar) para 1, 5 e 20 anos
+
+Uso: python benchmarks/benchmark_graficos.py [repeticoes]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+
+from src.visualizer import Visualizer
+
+ANOS = [1, 5, 20]
+DIAS_POR_ANO = 252
+
+
+class VisualizerRetangulos(Visualizer):
+    """Referência: mesma figura desenhando cada barra como um Rectangle (ax.bar)"""
+
+    def _barras_colecao(self, ax, x, alturas, larguras, cores, alpha):
+        return ax.bar(x, alturas, width=larguras, color=cores, alpha=alpha)
+
+
+def gerar_dados_diarios(anos, semente=42):
+    """Série diária sintética com as colunas usadas por plotar_evolucao_precos"""
+    rng = np.random.default_rng(semente)
+    n = anos * DIAS_POR_ANO
+    indice = pd.bdate_range('2000-01-03', periods=n)
+    fechamento = 100000 + np.cumsum(rng.normal(0, 800, n))
+    amplitude = np.abs(rng.normal(1500, 400, n))
+
+    dados = pd.DataFrame({
+        'fechamento': fechamento,
+        'minima': fechamento - amplitude / 2,
+        'maxima': fechamento + amplitude / 2,
+        'volume_total': rng.lognormal(15, 0.3, n),
+        'retorno_diario': rng.normal(0, 0.012, n)
+    }, index=indice)
+    dados['volatilidade'] = amplitude / dados['fechamento'] * 100
+    return dados
+
+
+def medir(visualizer, dados, repeticoes):
+    """Melhor tempo de renderização (s) entre as repetições"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            sucesso = visualizer.plotar_evolucao_precos(dados)
+        tempos.append(time.perf_counter() - inicio)
+        if not sucesso:
+            raise RuntimeError(f"Falha ao renderizar com {type(visualizer).__name__}")
+    return min(tempos)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+
+    with tempfile.TemporaryDirectory() as pasta:
+        config = {'OUTPUT_DIR': pasta}
+        atual = Visualizer(config)
+        referencia = VisualizerRetangulos(config)
+
+        print(f"{'Anos':>5} {'Dias':>7} {'ax.bar (s)':>11} {'Coleção (s)':>12} {'Ganho':>7}")
+        for anos in ANOS:
+            dados = gerar_dados_diarios(anos)
+            tempo_referencia = medir(referencia, dados, repeticoes)
+            tempo_atual = medir(atual, dados, repeticoes)
+            print(f"{anos:>5} {len(dados):>7} {tempo_referencia:>11.2f} {tempo_atual:>12.2f} "
+                  f"{tempo_referencia / tempo_atual:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
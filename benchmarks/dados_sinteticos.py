@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Gerador de dados sintéticos WIN$N M1 no formato exportado pelo MetaTrader 5
+Arquivo separado por tabulação com <DATE> <TIME> <OPEN> <HIGH> <LOW> <CLOSE> <TICKVOL> <VOL> <SPREAD>,
+o mesmo layout validado por DataProcessor.carregar_dados_brutos
+
+Uso: python benchmarks/dados_sinteticos.py [--anos 5] [--regime normal] [--saida data/WIN$N_M1.csv]
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Variação de abertura (pontos) entre pregões: desvio dos gaps comuns, probabilidade e desvio dos gaps grandes
+REGIMES_GAP = {
+    'calmo': {'desvio': 150, 'prob_choque': 0.02, 'desvio_choque': 600},
+    'normal': {'desvio': 300, 'prob_choque': 0.05, 'desvio_choque': 1200},
+    'volatil': {'desvio': 600, 'prob_choque': 0.10, 'desvio_choque': 2500}
+}
+
+TICK = 5              # Variação mínima do mini índice (pontos)
+VOLATILIDADE_MINUTO = 15.0
+
+
+def _perfil_intradiario(minutos):
+    """Curva em U: mais volatilidade e volume na abertura e no fechamento do pregão"""
+    posicao = np.linspace(-1, 1, minutos)
+    return 0.7 + 0.8 * posicao ** 2
+
+
+def gerar_m1(anos=1, regime='normal', inicio='2020-01-02', abertura_sessao='09:00', fechamento_sessao='18:00',
+             preco_inicial=100000, falhas=0.003, semente=42):
+    """DataFrame M1 sintético com as colunas do MT5
+
+    Preços em múltiplos de TICK, gaps entre pregões conforme `regime` (REGIMES_GAP) e
+    uma fração `falhas` de minutos sem negócio removida, como no histórico real.
+    """
+    if regime not in REGIMES_GAP:
+        raise ValueError(f"Regime desconhecido: {regime} (use {', '.join(REGIMES_GAP)})")
+
+    rng = np.random.default_rng(semente)
+    dias = pd.bdate_range(inicio, periods=int(round(anos * 252)))
+    horarios = pd.date_range(abertura_sessao, fechamento_sessao, freq='min', inclusive='left')
+    n_dias, n_minutos = len(dias), len(horarios)
+    n = n_dias * n_minutos
+
+    # Retornos por minuto com caudas pesadas e perfil em U, mais o gap na primeira barra de cada dia
+    perfil = np.tile(_perfil_intradiario(n_minutos), n_dias)
+    variacoes = rng.standard_t(4, n) * VOLATILIDADE_MINUTO * perfil
+    parametros = REGIMES_GAP[regime]
+    gaps = rng.normal(0, parametros['desvio'], n_dias)
+    choques = rng.random(n_dias) < parametros['prob_choque']
+    gaps[choques] += rng.normal(0, parametros['desvio_choque'], choques.sum())
+    variacoes[::n_minutos] += gaps
+
+    fechamento = preco_inicial + np.cumsum(variacoes)
+    fechamento = np.maximum(fechamento, preco_inicial * 0.2)
+    abertura = np.r_[preco_inicial, fechamento[:-1]]
+    abertura[::n_minutos] = fechamento[::n_minutos] - rng.normal(0, VOLATILIDADE_MINUTO, n_dias)
+
+    maxima = np.maximum(abertura, fechamento) + rng.exponential(VOLATILIDADE_MINUTO / 2, n) * perfil
+    minima = np.minimum(abertura, fechamento) - rng.exponential(VOLATILIDADE_MINUTO / 2, n) * perfil
+
+    def arredondar(precos):
+        return (np.round(precos / TICK) * TICK).astype(np.int64)
+
+    abertura, maxima, minima, fechamento = map(arredondar, (abertura, maxima, minima, fechamento))
+    maxima = np.maximum.reduce([maxima, abertura, fechamento])
+    minima = np.minimum.reduce([minima, abertura, fechamento])
+
+    # Volume acompanha o perfil do dia e o tamanho da barra
+    atividade = perfil * (1 + (maxima - minima) / (4 * VOLATILIDADE_MINUTO))
+    ticks = rng.poisson(300 * atividade) + 1
+    volume = ticks * rng.integers(5, 15, n)
+
+    dados = pd.DataFrame({
+        '<DATE>': np.repeat(dias.strftime('%Y.%m.%d'), n_minutos),
+        '<TIME>': np.tile(horarios.strftime('%H:%M:%S'), n_dias),
+        '<OPEN>': abertura,
+        '<HIGH>': maxima,
+        '<LOW>': minima,
+        '<CLOSE>': fechamento,
+        '<TICKVOL>': ticks,
+        '<VOL>': volume,
+        '<SPREAD>': rng.choice([0, 1, 2], n, p=[0.6, 0.3, 0.1]) * TICK
+    })
+
+    # Minutos sem negócio (nunca a primeira barra do dia, que carrega o gap)
+    sem_negocio = rng.random(n) < falhas
+    sem_negocio[::n_minutos] = False
+    return dados[~sem_negocio].reset_index(drop=True)
+
+
+def salvar_m1(dados, caminho):
+    """Grava no layout do MT5 (tabulação, sem índice)"""
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    dados.to_csv(caminho, sep='\t', index=False)
+    return caminho
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um arquivo WIN$N M1 sintético no formato do MT5")
+    parser.add_argument('--anos', type=float, default=1)
+    parser.add_argument('--regime', choices=sorted(REGIMES_GAP), default='normal')
+    parser.add_argument('--inicio', default='2020-01-02')
+    parser.add_argument('--abertura', default='09:00', help="Início do pregão (HH:MM)")
+    parser.add_argument('--fechamento', default='18:00', help="Fim do pregão (HH:MM, exclusivo)")
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--saida', default='data/WIN$N_M1.csv')
+    args = parser.parse_args()
+
+    dados = gerar_m1(args.anos, args.regime, args.inicio, args.abertura, args.fechamento, semente=args.semente)
+    salvar_m1(dados, args.saida)
+    print(f"✅ {len(dados):,} barras M1 ({args.anos:g} anos, regime {args.regime}) salvas em: {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,19 +10,41 @@ Este arquivo contém todas as configurações modificáveis do sistema
 # Análise de Gaps
 GAP_MINIMO = 100              # Gap mínimo em pontos para considerar significativo
 DIAS_LIMITE_GAP = 30          # Dias máximos para verificar fechamento de gap
+JANELA_RECLASSIFICACAO = 500  # Gaps na janela móvel da reclassificação walk-forward
 
 # Análise de Outliers  
 OUTLIER_THRESHOLD = 1.5       # Multiplicador IQR para detecção de outliers
-OUTLIER_METHOD = 'iqr'        # Método: 'iqr' ou 'zscore'
+OUTLIER_METHOD = 'iqr'        # Método: 'iqr', 'zscore', 'mad' ou 'percentil'
+OUTLIER_ZSCORE_THRESHOLD = 3  # |z| acima deste valor é outlier (método 'zscore')
+OUTLIER_MAD_THRESHOLD = 3.5   # Desvios MAD robustos acima da mediana (método 'mad')
+OUTLIER_PERCENTIS = (1, 99)   # Percentis inferior/superior (método 'percentil')
+OUTLIER_JANELA = None         # Dias da janela móvel dos limites (None = histórico completo)
+OUTLIER_JANELA_MIN = None     # Mínimo de dias na janela para avaliar um dia (None = metade da janela; limitado a OUTLIER_JANELA)
 
 # Caminhos de arquivos
 DATA_FILE = 'data/WIN$N_M1.csv'      # Arquivo de dados original
 OUTPUT_DIR = 'output'                 # Pasta de saída
 PROCESSED_DIR = 'data/processed'      # Pasta de dados processados
+CACHE_ETAPAS = True                   # Reaproveitar etapas cujas entradas, configurações e código não mudaram (data/processed/.cache)
+GRADE_PROCESSOS = None                # Processos do run_grid.py (None = núcleos disponíveis, 1 = serial)
+
+# Servidor de consultas (run_server.py)
+SERVIDOR_HOST = '127.0.0.1'           # Apenas conexões locais
+SERVIDOR_PORTA = 8765                 # Porta HTTP (ou `python run_server.py --porta N`)
+SERVIDOR_INTERVALO_S = 2.0            # Intervalo (s) da verificação de crescimento do arquivo de dados
+SERVIDOR_DISTANCIA_PADRAO = 1000      # Distância (pontos) padrão da consulta /gaps-abertos
+OBSERVAR_INTERVALO_S = 2.0            # Intervalo (s) entre verificações do arquivo em `python run.py --observar`
 
 # Gráficos
+GERAR_GRAFICOS = True         # False (ou `python run.py --sem-graficos`) executa só as etapas de dados, sem matplotlib
 GRAPH_DPI = 300               # Resolução dos gráficos (300 = alta qualidade)
 GRAPH_FORMAT = 'png'          # Formato dos gráficos
+GRAFICOS_PROCESSOS = None     # Processos para renderizar gráficos (None = núcleos disponíveis, 1 = serial)
+GRAFICOS_SEGUNDO_PLANO = False  # Renderizar gráficos enquanto o relatório é gerado
+PULAR_SAIDAS_INALTERADAS = True  # Não regenerar gráficos/seções cujo hash de entrada não mudou
+GERAR_DRILLDOWN_GAPS = False  # Um gráfico por gap em output/graphs/gaps/ (trajetória até o fechamento)
+DRILLDOWN_TAMANHO = (4, 2.5)  # Tamanho (polegadas) dos gráficos individuais
+DRILLDOWN_DPI = 100           # Resolução dos gráficos individuais
 
 # ============================================================================
 # CONFIGURAÇÕES AVANÇADAS
@@ -31,6 +53,8 @@ GRAPH_FORMAT = 'png'          # Formato dos gráficos
 # Processamento de dados
 REMOVE_WEEKENDS = True        # Remover fins de semana (se houver)
 MIN_VOLUME = 100             # Volume mínimo para considerar sessão válida
+FILTRAR_TICKS_SUSPEITOS = True  # Remover barras de minuto suspeitas antes da agregação diária
+TICK_SALTO_MAXIMO_PCT = 1.0   # Afastamento máximo (%) da máxima/mínima em relação aos fechamentos vizinhos
 
 # Análise estatística
 CONFIDENCE_LEVEL = 0.95       # Nível de confiança para intervalos
@@ -59,22 +83,28 @@ COLOR_NEUTRAL = 'blue'        # Cor neutra
 # ============================================================================
 
 # Validações de entrada
-MAX_FILE_SIZE_MB = 500        # Tamanho máximo do arquivo em MB
+MAX_FILE_SIZE_MB = 500        # Acima deste tamanho (MB) a ingestão é feita em partições mensais
 MIN_RECORDS = 100             # Número mínimo de registros para análise
 MAX_GAP_SIZE = 10000          # Gap máximo considerado válido (pontos)
 
 # Limites de processamento
 MAX_MEMORY_USAGE_PCT = 80     # % máximo de uso de memória
 CHUNK_SIZE = 10000            # Tamanho do chunk para arquivos grandes
+PROCESSAMENTO_PARTICIONADO = 'auto'  # Ingestão em partições mensais com despejo em disco: 'auto' (acima de MAX_FILE_SIZE_MB), True ou False
+LINHAS_POR_LEITURA = 1_000_000  # Linhas do arquivo lidas por vez no modo particionado (limita a memória)
 
 # ============================================================================
 # CONFIGURAÇÕES DE DEBUG
 # ============================================================================
 
-DEBUG_MODE = False            # Ativar modo debug
+DEBUG_MODE = False            # Ativar modo debug (liga também o log de performance)
 VERBOSE_OUTPUT = True         # Saída detalhada
-SAVE_INTERMEDIATE = True      # Salvar dados intermediários
-LOG_PERFORMANCE = False       # Log de performance
+GRAVAR_ARQUIVOS = True        # False mantém os resultados só em memória (padrão da API em src/api.py)
+SAVE_INTERMEDIATE = True      # Salvar dados intermediários (dados_diarios, dados_sem_outliers, gaps_analisados)
+FORMATO_INTERMEDIARIO = 'auto'  # Tabelas de data/processed: 'parquet', 'pickle' ou 'auto' (Parquet se houver pyarrow)
+EXPORTAR_CSV = False          # Gravar também uma cópia CSV de cada tabela (para abrir em planilhas)
+LOG_PERFORMANCE = False       # Tempo, CPU, memória e linhas por etapa em output/reports/desempenho.jsonl (ou `python run.py --desempenho`)
+PERFIL_MEMORIA = True         # Medir pico de memória com tracemalloc no log de performance (deixa a execução ~2x mais lenta)
 
 # ============================================================================
 # CONFIGURAÇÕES CUSTOMIZÁVEIS POR USUÁRIO
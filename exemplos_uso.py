@@ -6,6 +6,7 @@ Como usar os dados gerados e personalizar análises
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+from src.table_store import carregar_tabela
 
 # ============================================================================
 # 1. CARREGANDO OS DADOS PROCESSADOS
@@ -13,18 +14,23 @@ import numpy as np
 
 def carregar_dados_limpos():
     """Carrega o dataset final limpo"""
-    dados = pd.read_csv('data/processed/dados_limpos_finais.csv', 
-                       index_col=0, parse_dates=True)
+    dados = carregar_tabela('dados_limpos_finais')
     print(f"✅ {len(dados)} dias de dados carregados")
     return dados
 
 def carregar_analise_gaps():
     """Carrega a análise completa dos gaps"""
-    gaps = pd.read_csv('data/processed/gaps_analisados.csv',
-                      index_col=0, parse_dates=True)
+    gaps = carregar_tabela('gaps_analisados')
     print(f"✅ {len(gaps)} gaps analisados carregados")
     return gaps
 
+def analisar_em_memoria(gap_minimo=100):
+    """Executa ingestão, outliers e gaps no próprio processo, sem gravar nem reler arquivos"""
+    from src.api import AnaliseGaps
+    resultado = AnaliseGaps({'GAP_MINIMO': gap_minimo}).executar(['gaps'])
+    print(f"✅ {len(resultado.dados_finais)} dias e {len(resultado.gaps)} gaps calculados em memória")
+    return resultado.dados_finais, resultado.gaps
+
 # ============================================================================
 # 2. ANÁLISES BÁSICAS COM OS DADOS
 # ============================================================================
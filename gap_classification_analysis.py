@@ -14,13 +14,15 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy import stats
 from sklearn.cluster import KMeans
+from src.table_store import carregar_tabela, salvar_tabela
 import warnings
 warnings.filterwarnings('ignore')
 
 class GapClassificationAnalyzer:
-    def __init__(self, gaps_file):
+    def __init__(self, pasta_dados='data/processed'):
         """Inicializa o analisador com dados de gaps"""
-        self.gaps_df = pd.read_csv(gaps_file, index_col=0, parse_dates=True)
+        self.config = {'PROCESSED_DIR': pasta_dados}
+        self.gaps_df = carregar_tabela('gaps_analisados', pasta_dados)
         self.gaps_df = self.gaps_df[self.gaps_df['gap_absoluto'] >= 100]  # Apenas gaps significativos
         
     def analyze_distribution(self):
@@ -313,13 +315,11 @@ class GapClassificationAnalyzer:
         print("=" * 60)
         
         # Dataset 1: Dados classificados completos
-        classified_file = 'data/processed/gaps_classificados.csv'
-        self.gaps_df.to_csv(classified_file)
+        classified_file = salvar_tabela(self.gaps_df, self.config, 'gaps_classificados')
         print(f"✅ Gaps classificados salvos: {classified_file}")
         
         # Dataset 2: Métricas por classe
-        metrics_file = 'data/processed/metricas_por_classe.csv'
-        metrics_df.to_csv(metrics_file, index=False)
+        metrics_file = salvar_tabela(metrics_df, self.config, 'metricas_por_classe', indice=False)
         print(f"✅ Métricas por classe salvas: {metrics_file}")
         
         # Dataset 3: Features para modelo (dados numéricos)
@@ -332,8 +332,7 @@ class GapClassificationAnalyzer:
         features_df['tipo_gap_up'] = (self.gaps_df['tipo_gap'] == 'Gap Up').astype(int)
         features_df['gap_class_encoded'] = self.gaps_df['gap_class'].cat.codes
         
-        features_file = 'data/processed/features_para_modelo.csv'
-        features_df.to_csv(features_file)
+        features_file = salvar_tabela(features_df, self.config, 'features_para_modelo')
         print(f"✅ Features para modelo salvas: {features_file}")
         
         print(f"\n📊 Resumo dos datasets:")
@@ -353,7 +352,7 @@ def main():
     
     try:
         # Inicializar analisador
-        analyzer = GapClassificationAnalyzer('data/processed/gaps_analisados.csv')
+        analyzer = GapClassificationAnalyzer('data/processed')
         
         # Etapa 1: Analisar distribuição e otimizar intervalos
         optimal_intervals = analyzer.analyze_distribution()
@@ -376,7 +375,7 @@ def main():
         print(f"📋 Tabela resumo com todas as métricas gerada")
         
     except FileNotFoundError:
-        print("❌ Erro: Arquivo 'data/processed/gaps_analisados.csv' não encontrado.")
+        print("❌ Erro: Tabela 'gaps_analisados' não encontrada em 'data/processed/'.")
         print("   Execute primeiro o script 'run.py' para gerar os dados de gaps.")
     except Exception as e:
         print(f"❌ Erro durante a análise: {str(e)}")
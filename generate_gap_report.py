@@ -7,12 +7,13 @@ Gera um relatório detalhado da análise de classificação de gaps
 
 import pandas as pd
 import numpy as np
+from src.table_store import carregar_tabela
 
 def generate_detailed_report():
     """Gera relatório detalhado da análise de gaps"""
     
     # Carregar dados
-    metricas_df = pd.read_csv('data/processed/metricas_por_classe.csv')
+    metricas_df = carregar_tabela('metricas_por_classe', indice=False)
     
     print("📊 RELATÓRIO DETALHADO - ANÁLISE DE GAPS POR CLASSE")
     print("=" * 80)
@@ -109,7 +110,7 @@ def generate_detailed_report():
 def create_excel_report():
     """Cria um relatório em Excel com formatação"""
     try:
-        metricas_df = pd.read_csv('data/processed/metricas_por_classe.csv')
+        metricas_df = carregar_tabela('metricas_por_classe', indice=False)
         
         # Criar arquivo Excel com múltiplas abas
         with pd.ExcelWriter('output/reports/analise_gaps_detalhada.xlsx', engine='openpyxl') as writer:
@@ -117,13 +118,14 @@ def create_excel_report():
             metricas_df.to_excel(writer, sheet_name='Métricas por Classe', index=False)
             
             # Aba com dados classificados (sample)
-            gaps_class = pd.read_csv('data/processed/gaps_classificados.csv')
-            gaps_sample = gaps_class.head(100)  # Apenas uma amostra para não ficar muito grande
+            gaps_class = carregar_tabela('gaps_classificados')
+            gaps_sample = gaps_class.head(100).reset_index()
+            gaps_sample['gap_class'] = gaps_sample['gap_class'].astype(str)  # Apenas uma amostra para não ficar muito grande
             gaps_sample.to_excel(writer, sheet_name='Amostra Dados', index=False)
             
             # Aba com features para modelo
-            features = pd.read_csv('data/processed/features_para_modelo.csv')
-            features.head(100).to_excel(writer, sheet_name='Features Modelo', index=False)
+            features = carregar_tabela('features_para_modelo')
+            features.head(100).reset_index().to_excel(writer, sheet_name='Features Modelo', index=False)
         
         print(f"\n📊 Relatório Excel criado: output/reports/analise_gaps_detalhada.xlsx")
         
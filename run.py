@@ -9,8 +9,8 @@ Arquivo principal - Execute este para realizar toda a análise
 
 import sys
 import os
-import subprocess
-import importlib
+import time
+import importlib.util
 
 # Configurações principais
 CONFIG = {
@@ -22,31 +22,30 @@ CONFIG = {
     'PROCESSED_DIR': 'data/processed'
 }
 
-def install_requirements():
-    """Instala dependências necessárias automaticamente"""
-    required_packages = [
-        'pandas',
-        'numpy', 
-        'matplotlib',
-        'scipy'
-    ]
+# Valores de config.py (constantes em maiúsculas) sobrepõem os padrões acima
+try:
+    import config as _config_arquivo
+    CONFIG.update({chave: valor for chave, valor in vars(_config_arquivo).items() if chave.isupper()})
+except ImportError:
+    pass
+
+def check_requirements():
+    """Verifica as dependências sem importá-las (os módulos pesados só são carregados quando usados)"""
+    required_packages = ['pandas', 'numpy', 'scipy']
+    if CONFIG.get('GERAR_GRAFICOS', True) or CONFIG.get('GERAR_DRILLDOWN_GAPS', False):
+        required_packages.append('matplotlib')
+    if CONFIG.get('GERAR_DRILLDOWN_GAPS', False):
+        required_packages.append('PIL')
     
     print("🔧 Verificando dependências...")
     
-    for package in required_packages:
-        try:
-            importlib.import_module(package)
-            print(f"✅ {package} - OK")
-        except ImportError:
-            print(f"📦 Instalando {package}...")
-            try:
-                subprocess.check_call([sys.executable, '-m', 'pip', 'install', package])
-                print(f"✅ {package} - Instalado com sucesso")
-            except subprocess.CalledProcessError:
-                print(f"❌ Erro ao instalar {package}")
-                sys.exit(1)
+    faltando = [package for package in required_packages if importlib.util.find_spec(package) is None]
+    if faltando:
+        print(f"❌ Dependências ausentes: {', '.join(faltando)}")
+        print("💡 Instale com: pip install -r requirements.txt")
+        sys.exit(1)
     
-    print("✅ Todas as dependências estão prontas!\n")
+    print(f"✅ Dependências encontradas: {', '.join(required_packages)}\n")
 
 def check_data_file():
     """Verifica se o arquivo de dados existe"""
@@ -61,6 +60,8 @@ def check_data_file():
     # Verificar tamanho do arquivo
     file_size = os.path.getsize(CONFIG['DATA_FILE']) / (1024 * 1024)  # MB
     print(f"📊 Arquivo de dados encontrado: {file_size:.1f} MB")
+    if CONFIG.get('PROCESSAMENTO_PARTICIONADO', 'auto') == 'auto' and file_size > CONFIG.get('MAX_FILE_SIZE_MB', 500):
+        print(f"💽 Acima de {CONFIG.get('MAX_FILE_SIZE_MB', 500)} MB: ingestão em partições mensais (PROCESSAMENTO_PARTICIONADO)")
 
 def create_directories():
     """Cria diretórios necessários se não existirem"""
@@ -76,65 +77,65 @@ def create_directories():
 
 def main():
     """Função principal que executa toda a análise"""
+    inicio = time.perf_counter()
+    if '--sem-graficos' in sys.argv:
+        CONFIG['GERAR_GRAFICOS'] = False
+    if '--desempenho' in sys.argv:
+        CONFIG['LOG_PERFORMANCE'] = True
+    if '--particionado' in sys.argv:
+        CONFIG['PROCESSAMENTO_PARTICIONADO'] = True
+    
     print("🚀 WIN$N FINANCIAL DATA ANALYZER")
     print("=" * 50)
     print("Análise Completa de Dados Financeiros")
     print("Desenvolvido para o Mercado Brasileiro\n")
     
     # 1. Preparação do ambiente
-    install_requirements()
+    check_requirements()
     check_data_file()
     create_directories()
     
     # Importar módulos após instalar dependências
     try:
-        from src.data_processor import DataProcessor
-        from src.outlier_analyzer import OutlierAnalyzer  
-        from src.gap_analyzer import GapAnalyzer
-        from src.gap_classification_analyzer import GapClassificationAnalyzer
-        from src.visualizer import Visualizer
-        from src.report_generator import ReportGenerator
+        inicio_importacao = time.perf_counter()
+        from src.pipeline import ExecutorPipeline, etapas_padrao
+        from src.performance import iniciar_registro, resumo_desempenho
+        print(f"📦 src.pipeline (pandas/numpy) importado em {time.perf_counter() - inicio_importacao:.2f}s")
     except ImportError as e:
         print(f"❌ Erro ao importar módulos: {e}")
         print("💡 Certifique-se de que todos os arquivos estão na pasta 'src/'")
         sys.exit(1)
     
-    print("📥 Iniciando análise dos dados...")
+    # Modo de observação: reanálise incremental a cada mudança do arquivo de dados
+    if '--observar' in sys.argv:
+        from src.file_watcher import ObservadorDados
+        ObservadorDados(CONFIG).observar()
+        return
+    
+    print(f"📥 Iniciando análise dos dados... (inicialização: {time.perf_counter() - inicio:.2f}s)")
     
     try:
-        # 2. Processamento dos dados
-        print("\n📊 ETAPA 1: Processamento e Agregação de Dados")
-        processor = DataProcessor(CONFIG)
-        dados_diarios = processor.carregar_e_agregar_dados()
-        
-        if dados_diarios is None:
-            print("❌ Erro no processamento dos dados")
-            return
-        
-        # 3. Análise de outliers
-        print("\n🔍 ETAPA 2: Análise de Outliers")
-        outlier_analyzer = OutlierAnalyzer(CONFIG)
-        dados_sem_outliers = outlier_analyzer.analisar_outliers(dados_diarios)
+        # 2-7. Etapas da análise (ingestão, outliers, gaps, classificação, gráficos e relatório)
+        # executadas como grafo de dependências com cache por conteúdo (CACHE_ETAPAS)
+        iniciar_registro(CONFIG)
+        executor = ExecutorPipeline(CONFIG, etapas_padrao(incluir_graficos=CONFIG.get('GERAR_GRAFICOS', True)))
+        resultados = executor.executar()
         
-        # 4. Análise de gaps
-        print("\n📈 ETAPA 3: Análise de Gaps")
-        gap_analyzer = GapAnalyzer(CONFIG)
-        dados_gaps, dados_finais = gap_analyzer.analisar_gaps(dados_sem_outliers)
+        dados_diarios = resultados['ingestao']
+        dados_sem_outliers = resultados['outliers']
+        dados_gaps, dados_finais = resultados['gaps']
+        gaps_classificados, metricas_classificacao = resultados['classificacao']
         
-        # 5. Classificação de gaps
-        print("\n🎯 ETAPA 4: Classificação Estatística de Gaps")
-        classification_analyzer = GapClassificationAnalyzer(CONFIG)
-        gaps_classificados, metricas_classificacao = classification_analyzer.executar_analise_completa()
+        # Gráficos individuais por gap (opcional: milhares de imagens)
+        if CONFIG.get('GERAR_DRILLDOWN_GAPS', False):
+            from src.gap_drilldown import RenderizadorDrilldown
+            RenderizadorDrilldown(CONFIG).executar(dados_gaps, dados_sem_outliers)
         
-        # 6. Geração de visualizações
-        print("\n📊 ETAPA 5: Geração de Gráficos")
-        visualizer = Visualizer(CONFIG)
-        visualizer.gerar_todos_graficos(dados_diarios, dados_gaps, dados_finais)
+        # Gráficos em segundo plano (GRAFICOS_SEGUNDO_PLANO) terminam aqui
+        executor.finalizar()
         
-        # 7. Geração de relatório
-        print("\n📋 ETAPA 6: Geração de Relatório")
-        report_gen = ReportGenerator(CONFIG)
-        report_gen.gerar_relatorio_completo(dados_diarios, dados_gaps, dados_finais)
+        # Tabela de desempenho (LOG_PERFORMANCE/DEBUG_MODE)
+        resumo_desempenho(CONFIG)
         
         # 7. Resumo final
         print("\n" + "=" * 50)
@@ -149,26 +150,31 @@ def main():
         print(f"   • Dados finais limpos: {len(dados_finais)} dias")
         
         print(f"\n📁 Arquivos gerados:")
-        print(f"   • {CONFIG['PROCESSED_DIR']}/dados_diarios.csv")
-        print(f"   • {CONFIG['PROCESSED_DIR']}/gaps_analisados.csv") 
-        print(f"   • {CONFIG['PROCESSED_DIR']}/gaps_classificados.csv")
-        print(f"   • {CONFIG['PROCESSED_DIR']}/metricas_por_classe.csv")
-        print(f"   • {CONFIG['PROCESSED_DIR']}/features_para_modelo.csv")
-        print(f"   • {CONFIG['PROCESSED_DIR']}/dados_limpos_finais.csv")
-        print(f"   • {CONFIG['OUTPUT_DIR']}/graphs/evolucao_precos.png")
-        print(f"   • {CONFIG['OUTPUT_DIR']}/graphs/analise_gaps.png")
-        print(f"   • {CONFIG['OUTPUT_DIR']}/graphs/classificacao_distribuicao.png")
-        print(f"   • {CONFIG['OUTPUT_DIR']}/graphs/classificacao_probabilidades.png")
-        print(f"   • {CONFIG['OUTPUT_DIR']}/graphs/classificacao_tempos.png")
-        print(f"   • {CONFIG['OUTPUT_DIR']}/graphs/classificacao_volatilidade.png")
+        tabelas = ['dados_diarios', 'dados_sem_outliers', 'gaps_analisados', 'gaps_classificados',
+                   'metricas_por_classe', 'features_para_modelo', 'reclassificacao_rolante', 'dados_limpos_finais']
+        for tabela in tabelas:
+            for extensao in ('.parquet', '.pkl', '.csv'):
+                caminho = f"{CONFIG['PROCESSED_DIR']}/{tabela}{extensao}"
+                if os.path.exists(caminho):
+                    print(f"   • {caminho}")
+        print(f"   • {CONFIG['PROCESSED_DIR']}/ticks_suspeitos.csv")
+        print(f"   • {CONFIG['PROCESSED_DIR']}/curvas_sobrevivencia.npz")
+        print(f"   • {CONFIG['PROCESSED_DIR']}/tabela_classes.npz")
+        if CONFIG.get('GERAR_GRAFICOS', True):
+            print(f"   • {CONFIG['OUTPUT_DIR']}/graphs/evolucao_precos.png")
+            print(f"   • {CONFIG['OUTPUT_DIR']}/graphs/analise_gaps.png")
+            print(f"   • {CONFIG['OUTPUT_DIR']}/graphs/classificacao_distribuicao.png")
+            print(f"   • {CONFIG['OUTPUT_DIR']}/graphs/classificacao_probabilidades.png")
+            print(f"   • {CONFIG['OUTPUT_DIR']}/graphs/classificacao_tempos.png")
+            print(f"   • {CONFIG['OUTPUT_DIR']}/graphs/classificacao_volatilidade.png")
         print(f"   • {CONFIG['OUTPUT_DIR']}/reports/relatorio_completo.txt")
         
         print(f"\n💡 Para usar os dados:")
-        print(f"   import pandas as pd")
-        print(f"   dados = pd.read_csv('{CONFIG['PROCESSED_DIR']}/dados_limpos_finais.csv')")
-        print(f"   gaps_class = pd.read_csv('{CONFIG['PROCESSED_DIR']}/gaps_classificados.csv')")
-        print(f"   metricas = pd.read_csv('{CONFIG['PROCESSED_DIR']}/metricas_por_classe.csv')")
-        print(f"   features = pd.read_csv('{CONFIG['PROCESSED_DIR']}/features_para_modelo.csv')")
+        print(f"   from src.table_store import carregar_tabela")
+        print(f"   dados = carregar_tabela('dados_limpos_finais', '{CONFIG['PROCESSED_DIR']}')")
+        print(f"   gaps_class = carregar_tabela('gaps_classificados', '{CONFIG['PROCESSED_DIR']}')")
+        print(f"   metricas = carregar_tabela('metricas_por_classe', '{CONFIG['PROCESSED_DIR']}')")
+        print(f"   features = carregar_tabela('features_para_modelo', '{CONFIG['PROCESSED_DIR']}')")
         
         print(f"\n🚀 Análise finalizada! Verifique a pasta 'output/' para resultados.")
         
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Grade de Parâmetros
+Executa outliers, gaps e classificação para todas as combinações de GRADE em paralelo
+e salva a comparação em output/reports/comparacao_grade.csv
+
+Uso: python run_grid.py [--graficos]
+"""
+
+import sys
+
+from run import CONFIG, check_data_file, create_directories
+
+# Valores avaliados (parâmetros omitidos usam o valor de CONFIG em run.py)
+GRADE = {
+    'GAP_MINIMO': [50, 100, 200, 400],
+    'DIAS_LIMITE_GAP': [10, 30, 60],
+    'OUTLIER_THRESHOLD': [1.5, 3.0]
+}
+
+
+def main():
+    """Carrega os dados uma vez e executa a grade"""
+    print("🧮 WIN$N - GRADE DE PARÂMETROS")
+    print("=" * 50)
+
+    check_data_file()
+    create_directories()
+
+    from src.parameter_grid import ExecutorGrade
+    ExecutorGrade(CONFIG).executar(GRADE, graficos='--graficos' in sys.argv)
+
+
+if __name__ == "__main__":
+    main()
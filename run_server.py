@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Servidor de Consultas
+Mantém dados, gaps e classes em memória e responde consultas HTTP locais,
+recarregando apenas o trecho novo quando o arquivo de dados cresce
+
+Uso: python run_server.py [--porta 8765]
+"""
+
+import sys
+
+from run import CONFIG, check_data_file
+
+
+def main():
+    """Carrega os dados e inicia o servidor"""
+    print("🌐 WIN$N - SERVIDOR DE CONSULTAS")
+    print("=" * 50)
+
+    if '--porta' in sys.argv:
+        CONFIG['SERVIDOR_PORTA'] = int(sys.argv[sys.argv.index('--porta') + 1])
+
+    check_data_file()
+
+    from src.analysis_server import ServidorAnalise
+    ServidorAnalise(CONFIG).servir()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Analysis Server Module
+Módulo do servidor de consultas: mantém dados de minuto, diários, gaps e classes em memória,
+responde consultas HTTP locais e reprocessa apenas o trecho novo quando o arquivo de dados cresce
+"""
+
+import contextlib
+import io
+import json
+import math
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from src.class_lookup import TabelaClasses
+from src.incremental_reader import DESCRICAO_MUDANCA, IngestaoIncremental
+
+
+def _para_json(valor):
+    """Converte tipos do numpy/pandas para JSON (NaN vira null, datas em ISO)"""
+    if isinstance(valor, dict):
+        return {str(chave): _para_json(item) for chave, item in valor.items()}
+    if isinstance(valor, (list, tuple, np.ndarray)):
+        return [_para_json(item) for item in valor]
+    if isinstance(valor, (pd.Timestamp, datetime)):
+        return None if pd.isna(valor) else valor.isoformat()
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return None
+    return valor
+
+
+def _numero(parametros, nome, padrao=None):
+    """Parâmetro numérico finito da consulta (KeyError se ausente sem padrão, ValueError se inválido)"""
+    bruto = parametros[nome] if padrao is None else parametros.get(nome, padrao)
+    try:
+        valor = float(bruto)
+    except (TypeError, ValueError):
+        raise ValueError(f"Parâmetro {nome} inválido: {bruto!r} (use um número)") from None
+    if not math.isfinite(valor):
+        raise ValueError(f"Parâmetro {nome} inválido: {bruto!r} (use um número finito)")
+    return valor
+
+
+def _data(parametros, nome):
+    """Parâmetro de data opcional da consulta, validado com pd.Timestamp (None se ausente, ValueError se inválido)
+
+    O texto original é devolvido para que datas parciais ('2024-01') continuem valendo o mês inteiro no fatiamento.
+    """
+    bruto = parametros.get(nome)
+    if bruto is None:
+        return None
+    try:
+        data = pd.Timestamp(bruto)
+    except (TypeError, ValueError):
+        data = pd.NaT
+    if pd.isna(data):
+        raise ValueError(f"Parâmetro {nome} inválido: {bruto!r} (use uma data como 2024-01-31)")
+    return bruto
+
+
+class EstadoAnalise:
+    """Resultado imutável de uma carga: as consultas leem um estado completo enquanto o próximo é montado"""
+
+    def __init__(self, dados_minuto, dados_diarios, gaps, metricas, tabela, mudanca, tempo_analise, gap_minimo=0):
+        self.dados_minuto = dados_minuto
+        self.dados_diarios = dados_diarios
+        self.gaps = gaps
+        self.metricas = metricas
+        self.tabela = tabela
+        self.mudanca = mudanca
+        self.tempo_analise = tempo_analise
+        self.gap_minimo = gap_minimo
+        self.atualizado_em = datetime.now().isoformat(timespec='seconds')
+
+        # Estruturas pré-calculadas para as consultas
+        self.datas_minuto = dados_minuto['data_clean'].to_numpy()
+        self.metricas_por_classe = (
+            {str(linha['intervalo']): linha for linha in metricas.to_dict('records')} if metricas is not None else {}
+        )
+        if gaps is not None and len(gaps) > 0:
+            self.gaps_abertos = gaps[~gaps['gap_fechado'].astype(bool)]
+            self.niveis_abertos = self.gaps_abertos['fechamento_anterior'].to_numpy(dtype=float)
+        else:
+            self.gaps_abertos, self.niveis_abertos = None, np.array([])
+
+    def resumo(self):
+        """Estado geral: período, volumes carregados e última atualização"""
+        return {
+            'atualizado_em': self.atualizado_em,
+            'ultima_mudanca': self.mudanca,
+            'tempo_analise_s': round(self.tempo_analise, 3),
+            'barras_minuto': len(self.dados_minuto),
+            'dias': len(self.dados_diarios),
+            'primeiro_dia': self.dados_diarios.index.min(),
+            'ultimo_dia': self.dados_diarios.index.max(),
+            'gaps': 0 if self.gaps is None else len(self.gaps),
+            'gaps_abertos': 0 if self.gaps_abertos is None else len(self.gaps_abertos),
+            'classes': [] if self.tabela is None else self.tabela.classes
+        }
+
+    def classe(self, gap):
+        """Classe e métricas de um gap com sinal (positivo = Gap Up, negativo = Gap Down)
+
+        Gaps abaixo de GAP_MINIMO não pertencem a nenhuma classe (ValueError, resposta 400).
+        """
+        if self.tabela is None:
+            raise ValueError("Classificação indisponível (nenhum gap significativo nos dados)")
+        if abs(gap) < self.gap_minimo:
+            raise ValueError(f"Gap de {abs(gap):g} pontos abaixo de GAP_MINIMO ({self.gap_minimo}): "
+                             f"não é classificado")
+        resultado = self.tabela.pontuar(gap)
+        linha = self.metricas_por_classe.get(resultado['classe'], {})
+        resultado.update({
+            'gap': gap,
+            'n_observacoes': linha.get('n_observacoes'),
+            'gap_medio_classe': linha.get('gap_medio')
+        })
+        return resultado
+
+    def gaps_abertos_proximos(self, preco, distancia):
+        """Gaps não fechados cujo nível de fechamento está a até `distancia` pontos do preço"""
+        if self.gaps_abertos is None:
+            return []
+        afastamento = self.niveis_abertos - preco
+        posicoes = np.flatnonzero(np.abs(afastamento) <= distancia)
+        posicoes = posicoes[np.argsort(np.abs(afastamento[posicoes]), kind='stable')]
+
+        colunas = ['tipo_gap', 'gap_abertura', 'fechamento_anterior', 'pregoes_observados', 'excursao_maxima']
+        if 'gap_class' in self.gaps_abertos.columns:
+            colunas.append('gap_class')
+        selecionados = self.gaps_abertos.iloc[posicoes]
+        return [
+            {'data': data, **{coluna: linha[coluna] for coluna in colunas}, 'distancia': afastamento[posicao]}
+            for (data, linha), posicao in zip(selecionados.iterrows(), posicoes)
+        ]
+
+    def estatisticas(self, inicio=None, fim=None):
+        """Estatísticas dos dias e dos gaps no período [inicio, fim]"""
+        dias = self.dados_diarios.loc[inicio:fim]
+        if len(dias) == 0:
+            raise ValueError(f"Nenhum dia no período {inicio or '...'} a {fim or '...'}")
+
+        primeiro, ultimo = dias.index.min(), dias.index.max()
+        barras = (np.searchsorted(self.datas_minuto, np.datetime64(ultimo), side='right')
+                  - np.searchsorted(self.datas_minuto, np.datetime64(primeiro), side='left'))
+        resultado = {
+            'primeiro_dia': primeiro,
+            'ultimo_dia': ultimo,
+            'dias': len(dias),
+            'barras_minuto': int(barras),
+            'retorno_medio_pct': dias['retorno_diario'].mean() * 100,
+            'retorno_acumulado_pct': ((1 + dias['retorno_diario']).prod() - 1) * 100,
+            'volatilidade_media_pct': dias['volatilidade'].mean(),
+            'amplitude_media': dias['amplitude'].mean(),
+            'dias_alta': int((dias['tipo_dia'] == 'Alta').sum())
+        }
+
+        gaps = self.gaps.loc[primeiro:ultimo] if self.gaps is not None else None
+        if gaps is not None and len(gaps) > 0:
+            fechados = gaps['gap_fechado'].astype(bool)
+            resultado.update({
+                'gaps': len(gaps),
+                'gaps_up': int((gaps['tipo_gap'] == 'Gap Up').sum()),
+                'gaps_down': int((gaps['tipo_gap'] == 'Gap Down').sum()),
+                'taxa_fechamento_pct': fechados.mean() * 100,
+                'dias_medios_fechamento': gaps.loc[fechados, 'dias_para_fechamento'].mean()
+            })
+        else:
+            resultado['gaps'] = 0
+        return resultado
+
+
+class AnaliseIncremental:
+    """Ingestão incremental (IngestaoIncremental) mais outliers, gaps e classificação em memória
+
+    Outliers, gaps e classificação são recalculados sobre a série diária completa (uma
+    linha por pregão) a cada mudança do arquivo.
+    """
+
+    def __init__(self, config):
+        self.config = {**config, 'GRAVAR_ARQUIVOS': False, 'GERAR_GRAFICOS': False}
+        self.ingestao = IngestaoIncremental(self.config)
+
+    def carregar(self):
+        """Carga completa do arquivo"""
+        self.ingestao.carregar()
+
+    def atualizar(self):
+        """Incorpora a mudança do arquivo; retorna 'inalterado', 'acrescimo', 'reescrita' ou 'ausente'"""
+        return self.ingestao.atualizar()
+
+    def analisar(self, mudanca='carga'):
+        """Executa outliers, gaps e classificação em memória e retorna o novo EstadoAnalise"""
+        from src.outlier_analyzer import OutlierAnalyzer
+        from src.gap_analyzer import GapAnalyzer
+        from src.gap_classification_analyzer import GapClassificationAnalyzer
+
+        inicio = time.perf_counter()
+        dados_diarios = self.ingestao.dados_diarios()
+        gaps, metricas, tabela = None, None, None
+        with contextlib.redirect_stdout(io.StringIO()):
+            dados_sem_outliers = OutlierAnalyzer(self.config).analisar_outliers(dados_diarios)
+            dados_gaps, _ = GapAnalyzer(self.config).analisar_gaps(dados_sem_outliers)
+            if dados_gaps is not None:
+                classificador = GapClassificationAnalyzer(self.config)
+                gaps, metricas = classificador.executar_analise_completa(dados_gaps)
+                if gaps is not None:
+                    tabela = TabelaClasses.de_metricas(classificador.intervals, gaps['gap_class'].cat.categories, metricas)
+                else:
+                    gaps = dados_gaps
+
+        return EstadoAnalise(self.ingestao.dados_minuto, dados_diarios, gaps, metricas, tabela, mudanca,
+                             time.perf_counter() - inicio, self.config['GAP_MINIMO'])
+
+
+class _ManipuladorConsultas(BaseHTTPRequestHandler):
+    """Rotas GET: /estado, /classe?gap=, /gaps-abertos?preco=&distancia=, /estatisticas?inicio=&fim="""
+
+    def _responder(self, status, corpo):
+        conteudo = json.dumps(_para_json(corpo), ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(conteudo)))
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parametros = {chave: valores[-1] for chave, valores in parse_qs(url.query).items()}
+        servidor = self.server.servidor_analise
+        estado = servidor.estado
+        inicio = time.perf_counter()
+        try:
+            if url.path == '/estado':
+                corpo = estado.resumo()
+            elif url.path == '/classe':
+                corpo = estado.classe(_numero(parametros, 'gap'))
+            elif url.path == '/gaps-abertos':
+                distancia = _numero(parametros, 'distancia', servidor.config.get('SERVIDOR_DISTANCIA_PADRAO', 1000))
+                corpo = {'gaps': estado.gaps_abertos_proximos(_numero(parametros, 'preco'), distancia)}
+            elif url.path == '/estatisticas':
+                corpo = estado.estatisticas(_data(parametros, 'inicio'), _data(parametros, 'fim'))
+            else:
+                self._responder(404, {'erro': f"Rota desconhecida: {url.path}",
+                                      'rotas': ['/estado', '/classe', '/gaps-abertos', '/estatisticas']})
+                return
+        except KeyError as e:
+            self._responder(400, {'erro': f"Parâmetro obrigatório ausente: {e.args[0]}"})
+            return
+        except (TypeError, ValueError) as e:
+            self._responder(400, {'erro': str(e)})
+            return
+
+        if isinstance(corpo, dict):
+            corpo['tempo_consulta_ms'] = (time.perf_counter() - inicio) * 1000
+        self._responder(200, corpo)
+
+    def log_message(self, formato, *args):
+        if self.server.servidor_analise.config.get('DEBUG_MODE', False):
+            super().log_message(formato, *args)
+
+
+class ServidorAnalise:
+    """Servidor HTTP local com os dados da análise em memória e recarga incremental
+
+    Uma thread verifica DATA_FILE a cada SERVIDOR_INTERVALO_S segundos; quando o arquivo
+    cresce (ou é reescrito) um novo EstadoAnalise é montado em segundo plano e só então
+    substitui o atual, de modo que as consultas nunca veem um estado pela metade nem
+    esperam pela recarga. O servidor escuta apenas em SERVIDOR_HOST (127.0.0.1 por padrão).
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.analise = AnaliseIncremental(config)
+        self.estado = None
+        self.parar = threading.Event()
+
+    def carregar(self):
+        """Carga inicial completa"""
+        inicio = time.perf_counter()
+        print(f"📥 Carregando dados de: {self.config['DATA_FILE']}")
+        self.analise.carregar()
+        self.estado = self.analise.analisar()
+        resumo = self.estado.resumo()
+        print(f"✅ {resumo['barras_minuto']:,} barras, {resumo['dias']} dias e {resumo['gaps']} gaps em memória "
+              f"({time.perf_counter() - inicio:.1f}s)")
+
+    def recarregar(self):
+        """Incorpora mudanças no arquivo de dados; retorna o tipo de mudança"""
+        inicio = time.perf_counter()
+        mudanca = self.analise.atualizar()
+        if mudanca in ('acrescimo', 'reescrita'):
+            self.estado = self.analise.analisar(mudanca)
+            resumo = self.estado.resumo()
+            print(f"🔄 {DESCRICAO_MUDANCA[mudanca]}: {resumo['barras_minuto']:,} barras, {resumo['dias']} dias, "
+                  f"{resumo['gaps']} gaps ({time.perf_counter() - inicio:.2f}s)")
+        elif mudanca == 'ausente':
+            print(f"⚠️  {self.config['DATA_FILE']} indisponível; mantendo os dados atuais")
+        return mudanca
+
+    def _monitorar(self):
+        intervalo = self.config.get('SERVIDOR_INTERVALO_S', 2.0)
+        while not self.parar.wait(intervalo):
+            try:
+                self.recarregar()
+            except Exception as e:
+                print(f"❌ Erro ao recarregar os dados: {e}")
+
+    def servir(self):
+        """Carrega os dados e atende consultas até Ctrl+C"""
+        try:
+            self.carregar()
+        except ValueError as e:
+            print(f"❌ Servidor não iniciado: {e}")
+            return
+        monitor = threading.Thread(target=self._monitorar, daemon=True)
+        monitor.start()
+
+        host = self.config.get('SERVIDOR_HOST', '127.0.0.1')
+        porta = self.config.get('SERVIDOR_PORTA', 8765)
+        servidor = ThreadingHTTPServer((host, porta), _ManipuladorConsultas)
+        servidor.servidor_analise = self
+        print(f"🌐 Servindo em http://{host}:{servidor.server_port} "
+              f"(/estado, /classe?gap=, /gaps-abertos?preco=, /estatisticas?inicio=&fim=)")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Servidor encerrado")
+        finally:
+            self.parar.set()
+            servidor.server_close()
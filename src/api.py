@@ -0,0 +1,154 @@
+"""
+API Module
+Interface programática da análise: executa as etapas no próprio processo e retorna os resultados
+em memória, com gravação de arquivos e saída de console opcionais
+"""
+
+import contextlib
+import io
+import os
+import time
+
+# Configuração mínima (mesmos valores de run.py); chaves ausentes usam os padrões de cada módulo
+CONFIG_PADRAO = {
+    'GAP_MINIMO': 100,
+    'OUTLIER_THRESHOLD': 1.5,
+    'DIAS_LIMITE_GAP': 30,
+    'DATA_FILE': 'data/WIN$N_M1.csv',
+    'OUTPUT_DIR': 'output',
+    'PROCESSED_DIR': 'data/processed'
+}
+
+# Etapas que só produzem arquivos (exigem gravar_arquivos=True)
+ETAPAS_DE_ARQUIVO = ('graficos', 'relatorio')
+
+
+class ResultadoAnalise:
+    """Resultados de uma execução da API (None para etapas não executadas)
+
+    Atributos:
+        dados_diarios (DataFrame): barras diárias agregadas, indexadas por data
+        dados_sem_outliers (DataFrame): dados diários após a análise de outliers
+        gaps (DataFrame | None): gaps significativos com fechamento, tempo até o pico etc.
+        dados_finais (DataFrame): dados diários sem os dias de gaps não fechados
+        gaps_classificados (DataFrame | None): gaps com a coluna categórica `gap_class`
+        metricas (DataFrame | None): métricas por classe (uma linha por intervalo)
+        etapas (list[str]): etapas executadas ou reaproveitadas do cache, em ordem
+        tempos (dict[str, float]): tempo (s) de cada etapa executada
+    """
+
+    def __init__(self, resultados, etapas, tempos):
+        dados_gaps, dados_finais = resultados.get('gaps', (None, None))
+        gaps_classificados, metricas = resultados.get('classificacao', (None, None))
+
+        self.dados_diarios = resultados.get('ingestao')
+        self.dados_sem_outliers = resultados.get('outliers')
+        self.gaps = dados_gaps
+        self.dados_finais = dados_finais
+        self.gaps_classificados = gaps_classificados
+        self.metricas = metricas
+        self.etapas = etapas
+        self.tempos = tempos
+
+    def __repr__(self):
+        partes = [
+            f"{nome}={len(valor)}" for nome, valor in (
+                ('dados_diarios', self.dados_diarios), ('gaps', self.gaps),
+                ('gaps_classificados', self.gaps_classificados), ('metricas', self.metricas)
+            ) if valor is not None
+        ]
+        return f"ResultadoAnalise({', '.join(partes)})"
+
+
+class AnaliseGaps:
+    """Executa qualquer subconjunto das etapas de run.py em memória
+
+    Exemplo:
+        analise = AnaliseGaps({'GAP_MINIMO': 150})
+        resultado = analise.executar(['classificacao'])
+        resultado.metricas
+
+    As dependências das etapas pedidas são executadas automaticamente. Por padrão nada
+    é gravado em disco (tabelas, relatórios, gráficos, cache de etapas e log de desempenho
+    ficam desligados) e a saída de console é suprimida; `gravar_arquivos=True` reproduz as
+    saídas de run.py (e habilita o cache de etapas conforme CACHE_ETAPAS) e `exibir=True`
+    mostra o progresso. As barras de minuto podem ser passadas em `dados_brutos` (colunas
+    do MT5) em vez de lidas de DATA_FILE.
+    """
+
+    def __init__(self, config=None, gravar_arquivos=False, exibir=False):
+        self.config = {**CONFIG_PADRAO, **(config or {})}
+        self.gravar_arquivos = gravar_arquivos
+        self.exibir = exibir
+        self.saida_console = ''
+
+    def _config_execucao(self, usar_cache):
+        """Configuração efetiva: sem gravação, sem gráficos, sem cache e sem log de desempenho quando gravar_arquivos=False"""
+        config = dict(self.config)
+        if not self.gravar_arquivos:
+            config.update({
+                'GRAVAR_ARQUIVOS': False, 'GERAR_GRAFICOS': False, 'CACHE_ETAPAS': False,
+                'LOG_PERFORMANCE': False, 'DEBUG_MODE': False
+            })
+        elif not usar_cache:
+            config['CACHE_ETAPAS'] = False
+        return config
+
+    def _etapas(self, nomes):
+        """Etapas pedidas mais as suas dependências"""
+        from src.pipeline import etapas_padrao
+
+        por_nome = {etapa.nome: etapa for etapa in etapas_padrao()}
+        desconhecidas = [nome for nome in nomes if nome not in por_nome]
+        if desconhecidas:
+            raise ValueError(f"Etapas desconhecidas: {desconhecidas} (use {', '.join(por_nome)})")
+        if not self.gravar_arquivos:
+            so_arquivos = [nome for nome in nomes if nome in ETAPAS_DE_ARQUIVO]
+            if so_arquivos:
+                raise ValueError(f"As etapas {so_arquivos} só geram arquivos; use gravar_arquivos=True")
+
+        selecionadas, pendentes = {}, list(nomes)
+        while pendentes:
+            etapa = por_nome[pendentes.pop()]
+            if etapa.nome not in selecionadas:
+                selecionadas[etapa.nome] = etapa
+                pendentes.extend(etapa.entradas)
+        return [etapa for etapa in por_nome.values() if etapa.nome in selecionadas]
+
+    def _criar_pastas(self, config):
+        """Pastas de saída (apenas quando há gravação)"""
+        for pasta in (config['PROCESSED_DIR'], f"{config['OUTPUT_DIR']}/graphs", f"{config['OUTPUT_DIR']}/reports"):
+            os.makedirs(pasta, exist_ok=True)
+
+    def executar(self, etapas=('classificacao',), dados_brutos=None):
+        """Executa as etapas pedidas (e suas dependências) e retorna um ResultadoAnalise
+
+        Um erro em qualquer etapa é propagado como exceção (RuntimeError para falhas de
+        carga dos dados); com `exibir=False` a saída de console capturada fica em
+        `self.saida_console` para diagnóstico.
+        """
+        from src.pipeline import ExecutorPipeline
+
+        if isinstance(etapas, str):
+            etapas = [etapas]
+        # O cache da ingestão é indexado por DATA_FILE e não vale para barras recebidas em memória
+        config = self._config_execucao(usar_cache=dados_brutos is None)
+        if self.gravar_arquivos:
+            self._criar_pastas(config)
+
+        executor = ExecutorPipeline(config, self._etapas(list(etapas)))
+        executor.contexto['dados_brutos'] = dados_brutos
+
+        saida = io.StringIO()
+        destino = contextlib.nullcontext() if self.exibir else contextlib.redirect_stdout(saida)
+        inicio = time.perf_counter()
+        try:
+            with destino:
+                resultados = executor.executar()
+                executor.finalizar()
+        finally:
+            self.saida_console = saida.getvalue()
+
+        tempos = dict(executor.executadas)
+        tempos['total'] = time.perf_counter() - inicio
+        return ResultadoAnalise(resultados, [etapa.nome for etapa in executor.etapas], tempos)
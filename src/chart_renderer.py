@@ -0,0 +1,158 @@
+"""
+Chart Renderer Module
+Módulo responsável pela renderização paralela (ou em segundo plano) dos gráficos
+"""
+
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from src.content_cache import ManifestoSaidas, caminho_manifesto, hash_codigo, hash_conteudo
+
+# Configurações que alteram a imagem gerada além dos dados de entrada
+CHAVES_CONFIG_GRAFICOS = ('GRAPH_DPI',)
+
+
+def _inicializar_worker():
+    """Backend sem interface gráfica e conversores de datas do pandas, como no processo principal"""
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+    import pandas as pd
+    pd.plotting.register_matplotlib_converters()
+
+
+def _executar_tarefa(classe, config, preparar, metodo, atributos, argumentos):
+    """Recria um objeto leve da classe com apenas os dados da tarefa e chama o método de plot"""
+    objeto = classe.__new__(classe)
+    objeto.config = config
+    objeto.__dict__.update(atributos)
+
+    saida = io.StringIO()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(saida):
+        try:
+            if preparar:
+                getattr(objeto, preparar)()
+            resultado = getattr(objeto, metodo)(*argumentos)
+            sucesso = resultado is not False
+        except Exception as e:
+            print(f"❌ Erro ao gerar gráfico ({metodo}): {e}")
+            sucesso = False
+
+    return sucesso, saida.getvalue(), time.perf_counter() - inicio
+
+
+def _resultado_pronto(resultado):
+    """Future já concluído (execução serial ou gráfico inalterado)"""
+    futuro = Future()
+    futuro.set_result(resultado)
+    return futuro
+
+
+class GraficosPendentes:
+    """Gráficos submetidos ao pool; `aguardar` exibe as mensagens na ordem original"""
+
+    def __init__(self, futuros, executor, manifesto=None, hashes=None):
+        self.futuros = futuros
+        self.executor = executor
+        self.manifesto = manifesto
+        self.hashes = hashes or [None] * len(futuros)
+        self.resultado = None
+
+    def aguardar(self):
+        """Espera todos os gráficos, registra os hashes gerados e retorna quantos estão atualizados"""
+        if self.resultado is None:
+            gerados = 0
+            for futuro, (arquivo, hash_entrada) in zip(self.futuros, self.hashes):
+                try:
+                    sucesso, saida, _ = futuro.result()
+                except Exception as e:
+                    # Falha fora do método de plot (serialização das tarefas, worker encerrado)
+                    sucesso, saida = False, f"❌ Erro ao gerar gráfico {arquivo}: {e!r}\n"
+                print(saida, end='')
+                gerados += int(sucesso)
+                if sucesso and hash_entrada and self.manifesto is not None:
+                    self.manifesto.registrar(arquivo, hash_entrada, arquivo=arquivo)
+
+            if self.executor is not None:
+                self.executor.shutdown()
+            if self.manifesto is not None:
+                self.manifesto.salvar()
+            self.resultado = gerados
+        return self.resultado
+
+
+class RenderizadorGraficos:
+    """Executa métodos de plot independentes em processos separados
+
+    Cada tarefa é (metodo, atributos, argumentos, arquivo): o worker recebe somente os
+    atributos e argumentos listados (em geral DataFrames já reduzidos às colunas
+    usadas pelo gráfico), e não o objeto completo. GRAFICOS_PROCESSOS=1 mantém
+    a execução serial no processo atual; em segundo plano, um único processo
+    auxiliar renderiza os gráficos em série.
+
+    Com PULAR_SAIDAS_INALTERADAS, o hash desses dados, do código do módulo e de
+    CHAVES_CONFIG_GRAFICOS é comparado ao manifesto de OUTPUT_DIR e o gráfico
+    só é renderizado novamente se algo mudou ou o arquivo não existe.
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    def _n_processos(self, n_tarefas):
+        """Número de processos: GRAFICOS_PROCESSOS ou um por tarefa limitado aos núcleos"""
+        n_processos = self.config.get('GRAFICOS_PROCESSOS') or os.cpu_count() or 1
+        return max(1, min(n_processos, n_tarefas))
+
+    def executar(self, classe, tarefas, preparar=None, segundo_plano=False):
+        """Renderiza as tarefas; com `segundo_plano` retorna GraficosPendentes sem esperar"""
+        manifesto = None
+        hashes = [(arquivo, None) for _, _, _, arquivo in tarefas]
+        if self.config.get('PULAR_SAIDAS_INALTERADAS', True):
+            manifesto = ManifestoSaidas(caminho_manifesto(self.config))
+            codigo = hash_codigo(classe)
+            hashes = [
+                (arquivo, hash_conteudo(codigo, preparar, metodo, atributos, argumentos,
+                                        config=self.config, chaves=CHAVES_CONFIG_GRAFICOS))
+                for metodo, atributos, argumentos, arquivo in tarefas
+            ]
+
+        pendentes = [
+            i for i, (arquivo, hash_entrada) in enumerate(hashes)
+            if manifesto is None or not manifesto.atualizado(arquivo, hash_entrada, arquivo)
+        ]
+        futuros = [
+            _resultado_pronto((True, f"⏭️  Gráfico inalterado: {arquivo}\n", 0.0))
+            for arquivo, _ in hashes
+        ]
+
+        executor = None
+        n_processos = self._n_processos(len(pendentes)) if pendentes else 1
+        if n_processos == 1 and not (segundo_plano and pendentes):
+            for i in pendentes:
+                metodo, atributos, argumentos, _ = tarefas[i]
+                futuros[i] = _resultado_pronto(
+                    _executar_tarefa(classe, self.config, preparar, metodo, atributos, argumentos)
+                )
+        else:
+            executor = ProcessPoolExecutor(max_workers=n_processos, initializer=_inicializar_worker)
+            for i in pendentes:
+                metodo, atributos, argumentos, arquivo = tarefas[i]
+                try:
+                    futuros[i] = executor.submit(
+                        _executar_tarefa, classe, self.config, preparar, metodo, atributos, argumentos
+                    )
+                except Exception as e:
+                    futuros[i] = _resultado_pronto((False, f"❌ Erro ao gerar gráfico {arquivo}: {e!r}\n", 0.0))
+
+        resultado = GraficosPendentes(futuros, executor, manifesto, hashes)
+
+        if segundo_plano:
+            if executor is not None:
+                print(f"⏳ {len(pendentes)} gráficos em renderização em segundo plano "
+                      f"({n_processos} processo{'s' if n_processos > 1 else ''})")
+            return resultado
+        return resultado.aguardar()
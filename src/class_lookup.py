@@ -0,0 +1,106 @@
+"""
+Class Lookup Module
+Tabela compacta de classes de gap para consulta rápida na abertura (depende apenas de numpy)
+"""
+
+from bisect import bisect_left
+
+import numpy as np
+
+DIRECOES = ['up', 'down']
+METRICAS_LOOKUP = [
+    'prob_fechamento',
+    'tempo_fechamento',
+    'tempo_pico',
+    'tempo_mediano_km',
+    'prob_aberto_limite',
+    'excursao_media',
+    'excursao_p90'
+]
+
+
+def montar_matriz(classes, metricas_df):
+    """Matriz de métricas (direção × classe × métrica) a partir da tabela de métricas por classe
+
+    As linhas são alinhadas às classes pela coluna `intervalo`; classes sem gaps (ausentes
+    da tabela de métricas) ficam com NaN.
+    """
+    linhas = metricas_df.set_index(metricas_df['intervalo'].astype(str)).reindex([str(classe) for classe in classes])
+    matriz = np.full((len(DIRECOES), len(classes), len(METRICAS_LOOKUP)), np.nan)
+    for d, direcao in enumerate(DIRECOES):
+        for m, metrica in enumerate(METRICAS_LOOKUP):
+            coluna = f'{metrica}_{direcao}'
+            if coluna in linhas.columns:
+                matriz[d, :, m] = linhas[coluna].values.astype(float)
+    return matriz
+
+
+def exportar_tabela(caminho, limites, classes, metricas_df):
+    """Exporta limites e matriz de métricas (direção × classe × métrica) em .npz"""
+    np.savez(
+        caminho,
+        limites=np.asarray(limites, dtype=float),
+        classes=np.array([str(classe) for classe in classes]),
+        metricas=np.array(METRICAS_LOOKUP),
+        matriz=montar_matriz(classes, metricas_df)
+    )
+    return caminho
+
+
+class TabelaClasses:
+    """Consulta a classe e as métricas de um gap (ou lote de gaps) via busca binária nos limites"""
+
+    def __init__(self, limites, classes, metricas, matriz):
+        self.limites = limites
+        self.limites_internos = limites[1:-1]
+        self.limites_internos_lista = self.limites_internos.tolist()
+        self.classes = classes
+        self.metricas = metricas
+        self.matriz = matriz
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Carrega a tabela exportada pela análise de classificação"""
+        with np.load(caminho) as arquivo:
+            return cls(
+                arquivo['limites'],
+                arquivo['classes'].tolist(),
+                arquivo['metricas'].tolist(),
+                arquivo['matriz']
+            )
+
+    @classmethod
+    def de_metricas(cls, limites, classes, metricas_df):
+        """Monta a tabela em memória a partir do resultado da classificação (sem passar pelo .npz)"""
+        return cls(
+            np.asarray(limites, dtype=float),
+            [str(classe) for classe in classes],
+            list(METRICAS_LOOKUP),
+            montar_matriz(classes, metricas_df)
+        )
+
+    def pontuar(self, gap):
+        """Métricas para um único gap com sinal (positivo = Gap Up, negativo = Gap Down)"""
+        tamanho = abs(gap)
+        classe = bisect_left(self.limites_internos_lista, tamanho)
+        direcao = 0 if gap > 0 else 1
+
+        resultado = dict(zip(self.metricas, self.matriz[direcao, classe].tolist()))
+        resultado['classe'] = self.classes[classe]
+        resultado['direcao'] = DIRECOES[direcao]
+        resultado['dentro_faixa'] = bool(self.limites[0] <= tamanho <= self.limites[-1])
+        return resultado
+
+    def pontuar_lote(self, gaps):
+        """Métricas para um array de gaps com sinal; retorna um dicionário de arrays"""
+        gaps = np.asarray(gaps, dtype=float)
+        tamanhos = np.abs(gaps)
+        classes = np.searchsorted(self.limites_internos, tamanhos, side='left')
+        direcoes = (gaps <= 0).astype(np.intp)
+
+        valores = self.matriz[direcoes, classes]
+        resultado = {metrica: valores[:, m] for m, metrica in enumerate(self.metricas)}
+        resultado['classe'] = classes
+        resultado['direcao'] = direcoes
+        resultado['dentro_faixa'] = (tamanhos >= self.limites[0]) & (tamanhos <= self.limites[-1])
+        return resultado
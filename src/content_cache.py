@@ -0,0 +1,169 @@
+"""
+Content Cache Module
+Módulo com hash de conteúdo e manifesto de saídas para pular gráficos e seções inalterados
+"""
+
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def _atualizar_hash(h, objeto):
+    """Alimenta o hash com o conteúdo de DataFrames, Series, arrays, coleções e escalares"""
+    if isinstance(objeto, pd.DataFrame):
+        h.update(repr((list(objeto.columns), [str(tipo) for tipo in objeto.dtypes])).encode())
+        h.update(pd.util.hash_pandas_object(objeto, index=True).values.tobytes())
+    elif isinstance(objeto, pd.Series):
+        h.update(repr((objeto.name, str(objeto.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(objeto, index=True).values.tobytes())
+    elif isinstance(objeto, np.ndarray):
+        h.update(repr((str(objeto.dtype), objeto.shape)).encode())
+        if objeto.dtype == object:
+            h.update(repr(objeto.tolist()).encode())
+        else:
+            h.update(np.ascontiguousarray(objeto).tobytes())
+    elif isinstance(objeto, dict):
+        for chave in sorted(objeto, key=str):
+            h.update(repr(chave).encode())
+            _atualizar_hash(h, objeto[chave])
+    elif isinstance(objeto, (list, tuple)):
+        h.update(f"{type(objeto).__name__}[{len(objeto)}]".encode())
+        for item in objeto:
+            _atualizar_hash(h, item)
+    else:
+        h.update(repr(objeto).encode())
+
+
+def hash_conteudo(*objetos, config=None, chaves=()):
+    """Hash dos objetos de entrada e dos valores das chaves de configuração indicadas"""
+    h = hashlib.blake2b(digest_size=16)
+    for objeto in objetos:
+        _atualizar_hash(h, objeto)
+    for chave in chaves:
+        h.update(repr((chave, (config or {}).get(chave))).encode())
+    return h.hexdigest()
+
+
+# Código-fonte e imports src.* de cada módulo lido, por (arquivo, data de modificação)
+_MODULOS_LIDOS = {}
+
+
+def _ler_modulo(nome):
+    """Código-fonte do módulo e os módulos src.* que ele importa (inclusive dentro de funções)"""
+    origem = importlib.util.find_spec(nome).origin
+    chave = (origem, os.stat(origem).st_mtime_ns)
+    if chave not in _MODULOS_LIDOS:
+        with open(origem, encoding='utf-8') as f:
+            fonte = f.read()
+        dependencias = set()
+        for no in ast.walk(ast.parse(fonte)):
+            if isinstance(no, ast.ImportFrom) and no.level == 0 and no.module:
+                if no.module == 'src':
+                    dependencias.update(f"src.{alias.name}" for alias in no.names)
+                elif no.module.startswith('src.'):
+                    dependencias.add(no.module)
+            elif isinstance(no, ast.Import):
+                dependencias.update(alias.name for alias in no.names if alias.name.startswith('src.'))
+        _MODULOS_LIDOS[chave] = (fonte, dependencias)
+    return _MODULOS_LIDOS[chave]
+
+
+def hash_modulos(nomes):
+    """Hash do código dos módulos indicados e de todos os módulos src.* de que dependem (transitivo)"""
+    fontes, pendentes = {}, list(nomes)
+    while pendentes:
+        nome = pendentes.pop()
+        if nome not in fontes:
+            fontes[nome], dependencias = _ler_modulo(nome)
+            pendentes.extend(dependencias)
+
+    h = hashlib.blake2b(digest_size=16)
+    for nome in sorted(fontes):
+        h.update(nome.encode())
+        h.update(fontes[nome].encode())
+    return h.hexdigest()
+
+
+def hash_codigo(classe):
+    """Hash do código do módulo da classe e dos auxiliares src.* que ele usa (mudanças invalidam as saídas)"""
+    try:
+        return hash_modulos([classe.__module__])
+    except (ImportError, OSError, ValueError, AttributeError, SyntaxError):
+        return hashlib.blake2b(classe.__qualname__.encode(), digest_size=16).hexdigest()
+
+
+def hash_arquivo(caminho):
+    """Hash do conteúdo de um arquivo (None se ausente)"""
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(bloco)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+class ManifestoSaidas:
+    """Manifesto JSON com o hash de entrada da última geração de cada saída
+
+    Vários geradores podem compartilhar o mesmo arquivo: `salvar` relê o manifesto
+    e grava apenas as entradas alteradas por esta instância. Para saídas em arquivo
+    guarda-se também o hash do arquivo gerado, de modo que um arquivo trocado depois
+    (restaurado do cache de etapas, por exemplo) não é tomado como atualizado.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.entradas = self._ler()
+        self.alteradas = {}
+
+    def _ler(self):
+        """Lê o manifesto em disco (vazio se ausente ou corrompido)"""
+        try:
+            with open(self.caminho, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def atualizado(self, chave, hash_atual, arquivo=None):
+        """True se a saída foi gerada com o mesmo hash (e o arquivo, se indicado, é o que foi gerado)"""
+        entrada = self.entradas.get(chave)
+        if entrada is None or entrada.get('hash') != hash_atual:
+            return False
+        return arquivo is None or entrada.get('hash_arquivo') == hash_arquivo(arquivo)
+
+    def obter(self, chave, campo, padrao=None):
+        """Valor auxiliar guardado junto ao hash (por exemplo, o texto de uma seção)"""
+        return self.entradas.get(chave, {}).get(campo, padrao)
+
+    def registrar(self, chave, hash_atual, arquivo=None, **extras):
+        """Registra o hash da saída recém-gerada (e o do arquivo gerado, se indicado)"""
+        entrada = {'hash': hash_atual, **extras}
+        if arquivo is not None:
+            entrada['hash_arquivo'] = hash_arquivo(arquivo)
+        self.entradas[chave] = entrada
+        self.alteradas[chave] = entrada
+
+    def salvar(self):
+        """Grava as entradas alteradas de forma atômica"""
+        if not self.alteradas:
+            return
+        entradas = self._ler()
+        entradas.update(self.alteradas)
+
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(entradas, f, ensure_ascii=False, indent=1)
+        os.replace(temporario, self.caminho)
+        self.alteradas = {}
+
+
+def caminho_manifesto(config):
+    """Manifesto compartilhado das saídas em OUTPUT_DIR"""
+    return f"{config['OUTPUT_DIR']}/.manifesto_saidas.json"
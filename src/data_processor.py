@@ -5,16 +5,43 @@ Módulo responsável pelo carregamento e agregação dos dados de minuto para di
 
 import pandas as pd
 import numpy as np
+import contextlib
+import io
 import os
+import tempfile
+from src.performance import medir_desempenho
+from src.table_store import gravacao_ativa, salvar_tabela
 
 class DataProcessor:
     """Classe para processamento e agregação de dados financeiros"""
     
+    COLUNAS_PRECO = ['abertura', 'maxima', 'minima', 'fechamento']
+    COLUNAS_ESPERADAS = ['<DATE>', '<TIME>', '<OPEN>', '<HIGH>', '<LOW>', '<CLOSE>', '<TICKVOL>', '<VOL>', '<SPREAD>']
+    
+    # Agregações de minuto para diário e nomes das colunas resultantes
+    AGREGACOES = {
+        'abertura': 'first',    # Primeira abertura do dia
+        'maxima': 'max',        # Máxima do dia
+        'minima': 'min',        # Mínima do dia
+        'fechamento': 'last',   # Último fechamento do dia
+        'volume': ['sum', 'mean', 'std'],  # Volume: soma, média, desvio
+        'volume_ticks': ['sum', 'mean'],
+        'spread': ['mean', 'min', 'max']
+    }
+    COLUNAS_DIARIAS = [
+        'abertura', 'maxima', 'minima', 'fechamento',
+        'volume_total', 'volume_medio', 'volume_desvio',
+        'volume_ticks_total', 'volume_ticks_medio',
+        'spread_medio', 'spread_minimo', 'spread_maximo'
+    ]
+    
     def __init__(self, config):
         self.config = config
         self.dados_originais = None
         self.dados_diarios = None
+        self.ticks_suspeitos = None
     
+    @medir_desempenho
     def carregar_dados_brutos(self):
         """Carrega os dados originais do arquivo CSV"""
         try:
@@ -24,9 +51,7 @@ class DataProcessor:
             dados_brutos = pd.read_csv(self.config['DATA_FILE'], sep='\t')
             
             # Verificar estrutura do arquivo
-            colunas_esperadas = ['<DATE>', '<TIME>', '<OPEN>', '<HIGH>', '<LOW>', '<CLOSE>', '<TICKVOL>', '<VOL>', '<SPREAD>']
-            
-            if not all(col in dados_brutos.columns for col in colunas_esperadas):
+            if not all(col in dados_brutos.columns for col in self.COLUNAS_ESPERADAS):
                 raise ValueError("Estrutura do arquivo CSV não está conforme esperado")
             
             print(f"✅ {len(dados_brutos):,} registros carregados")
@@ -39,8 +64,9 @@ class DataProcessor:
             print(f"❌ Erro ao carregar dados: {e}")
             return None
     
-    def processar_dados(self, dados_brutos):
-        """Processa e limpa os dados brutos"""
+    @medir_desempenho
+    def processar_dados(self, dados_brutos, salvar_relatorio=True):
+        """Processa e limpa os dados brutos (o relatório de ticks suspeitos é salvo com `salvar_relatorio`)"""
         print("🔄 Processando dados...")
         
         # Renomear colunas para português
@@ -70,50 +96,122 @@ class DataProcessor:
             print(f"❌ Erro na conversão de tipos: {e}")
             return None
         
+        # Filtro de ticks ruins antes da agregação (evita contaminar máxima/mínima do dia)
+        mascara_suspeitos = self.detectar_ticks_suspeitos(dados)
+        if mascara_suspeitos.any() and self.config.get('FILTRAR_TICKS_SUSPEITOS', True):
+            dados = dados[~mascara_suspeitos]
+            print(f"🧹 {int(mascara_suspeitos.sum())} barras suspeitas removidas antes da agregação")
+        if salvar_relatorio and gravacao_ativa(self.config):
+            self.salvar_ticks_suspeitos()
+        
         print(f"✅ Dados processados: {len(dados)} registros")
         return dados
     
+    @medir_desempenho
+    def detectar_ticks_suspeitos(self, dados):
+        """Marca barras de minuto com OHLC inconsistente, preço não positivo ou salto isolado
+
+        Um salto é uma máxima (mínima) que se afasta mais de TICK_SALTO_MAXIMO_PCT %
+        dos fechamentos vizinhos do mesmo dia, nos dois lados. Retorna a máscara booleana
+        das barras suspeitas e guarda o relatório compacto em `self.ticks_suspeitos`.
+        """
+        abertura, maxima, minima, fechamento = (dados[coluna].to_numpy(dtype=float) for coluna in self.COLUNAS_PRECO)
+        limite_salto = self.config.get('TICK_SALTO_MAXIMO_PCT', 1.0) / 100
+        
+        # Consistência OHLC e preços não positivos
+        ohlc_inconsistente = (
+            (maxima < np.maximum(abertura, fechamento)) |
+            (minima > np.minimum(abertura, fechamento)) |
+            (maxima < minima)
+        )
+        preco_nao_positivo = (np.minimum(np.minimum(abertura, fechamento), minima) <= 0)
+        
+        # Fechamentos vizinhos apenas dentro do mesmo dia
+        dias = dados['data_clean'].to_numpy()
+        mesmo_dia_anterior = np.zeros(len(dados), dtype=bool)
+        mesmo_dia_anterior[1:] = dias[1:] == dias[:-1]
+        mesmo_dia_posterior = np.zeros(len(dados), dtype=bool)
+        mesmo_dia_posterior[:-1] = mesmo_dia_anterior[1:]
+        
+        fechamento_anterior = np.full(len(dados), np.nan)
+        fechamento_anterior[1:] = fechamento[:-1]
+        fechamento_anterior[~mesmo_dia_anterior] = np.nan
+        fechamento_posterior = np.full(len(dados), np.nan)
+        fechamento_posterior[:-1] = fechamento[1:]
+        fechamento_posterior[~mesmo_dia_posterior] = np.nan
+        
+        # Referências ignoram o vizinho ausente; barras sem vizinhos ficam NaN (não marcadas)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            referencia_superior = np.fmax(fechamento_anterior, fechamento_posterior)
+            referencia_inferior = np.fmin(fechamento_anterior, fechamento_posterior)
+            salto_alta = (maxima - referencia_superior) > limite_salto * referencia_superior
+            salto_baixa = (referencia_inferior - minima) > limite_salto * referencia_inferior
+        
+        motivos = {
+            'ohlc_inconsistente': ohlc_inconsistente,
+            'preco_nao_positivo': preco_nao_positivo,
+            'salto_alta': salto_alta & ~preco_nao_positivo,
+            'salto_baixa': salto_baixa & ~preco_nao_positivo
+        }
+        mascara = np.logical_or.reduce(list(motivos.values()))
+        
+        indices = np.flatnonzero(mascara)
+        relatorio = dados.iloc[indices][['data', 'hora'] + self.COLUNAS_PRECO].copy()
+        relatorio['motivo'] = [
+            ','.join(motivo for motivo, flags in motivos.items() if flags[i]) for i in indices
+        ]
+        self.ticks_suspeitos = relatorio
+        
+        if len(indices) > 0:
+            contagem = ', '.join(f"{motivo}: {int(flags.sum())}" for motivo, flags in motivos.items() if flags.any())
+            print(f"⚠️  {len(indices)} barras suspeitas ({contagem})")
+        
+        return mascara
+    
+    def salvar_ticks_suspeitos(self):
+        """Salva o relatório de barras suspeitas em PROCESSED_DIR"""
+        try:
+            caminho_saida = f"{self.config['PROCESSED_DIR']}/ticks_suspeitos.csv"
+            self.ticks_suspeitos.to_csv(caminho_saida, index=False)
+            return True
+        except Exception as e:
+            print(f"❌ Erro ao salvar ticks suspeitos: {e}")
+            return False
+    
+    def agregar_bruto(self, dados_processados):
+        """Agrega as barras de minuto de cada dia (sem as métricas que dependem de outros dias)"""
+        agrupado = dados_processados.groupby('data_clean')
+        dados_agrupados = agrupado.agg(self.AGREGACOES)
+        dados_agrupados.columns = self.COLUNAS_DIARIAS
+        
+        # Horário (primeiro minuto) da máxima e da mínima do dia, usado no pico intradiário dos gaps
+        dados_agrupados['hora_maxima'] = dados_processados.loc[agrupado['maxima'].idxmax(), 'hora'].values
+        dados_agrupados['hora_minima'] = dados_processados.loc[agrupado['minima'].idxmin(), 'hora'].values
+        return dados_agrupados
+    
+    def calcular_metricas_diarias(self, dados_agrupados):
+        """Métricas derivadas dos dados diários (o retorno usa o fechamento do dia anterior)"""
+        dados_agrupados['amplitude'] = dados_agrupados['maxima'] - dados_agrupados['minima']
+        dados_agrupados['retorno_diario'] = dados_agrupados['fechamento'].pct_change()
+        dados_agrupados['corpo_candle'] = abs(dados_agrupados['fechamento'] - dados_agrupados['abertura'])
+        dados_agrupados['volatilidade'] = dados_agrupados['amplitude'] / dados_agrupados['abertura'] * 100
+        
+        # Classificar tipo de dia
+        dados_agrupados['tipo_dia'] = np.where(
+            dados_agrupados['fechamento'] > dados_agrupados['abertura'], 
+            'Alta', 'Baixa'
+        )
+        
+        # Remover NaN do primeiro retorno
+        return dados_agrupados.dropna()
+    
+    @medir_desempenho
     def agregar_por_dia(self, dados_processados):
         """Agrega dados de minuto para diário"""
         print("📊 Agregando dados por dia...")
         
         try:
-            # Definir agregações
-            agregacoes = {
-                'abertura': 'first',    # Primeira abertura do dia
-                'maxima': 'max',        # Máxima do dia
-                'minima': 'min',        # Mínima do dia
-                'fechamento': 'last',   # Último fechamento do dia
-                'volume': ['sum', 'mean', 'std'],  # Volume: soma, média, desvio
-                'volume_ticks': ['sum', 'mean'],
-                'spread': ['mean', 'min', 'max']
-            }
-            
-            # Agrupar por data
-            dados_agrupados = dados_processados.groupby('data_clean').agg(agregacoes)
-            
-            # Simplificar nomes das colunas
-            dados_agrupados.columns = [
-                'abertura', 'maxima', 'minima', 'fechamento',
-                'volume_total', 'volume_medio', 'volume_desvio',
-                'volume_ticks_total', 'volume_ticks_medio',
-                'spread_medio', 'spread_minimo', 'spread_maximo'
-            ]
-            
-            # Calcular métricas adicionais
-            dados_agrupados['amplitude'] = dados_agrupados['maxima'] - dados_agrupados['minima']
-            dados_agrupados['retorno_diario'] = dados_agrupados['fechamento'].pct_change()
-            dados_agrupados['corpo_candle'] = abs(dados_agrupados['fechamento'] - dados_agrupados['abertura'])
-            dados_agrupados['volatilidade'] = dados_agrupados['amplitude'] / dados_agrupados['abertura'] * 100
-            
-            # Classificar tipo de dia
-            dados_agrupados['tipo_dia'] = np.where(
-                dados_agrupados['fechamento'] > dados_agrupados['abertura'], 
-                'Alta', 'Baixa'
-            )
-            
-            # Remover NaN do primeiro retorno
-            dados_agrupados = dados_agrupados.dropna()
+            dados_agrupados = self.calcular_metricas_diarias(self.agregar_bruto(dados_processados))
             
             print(f"✅ Agregação concluída: {len(dados_agrupados)} dias")
             return dados_agrupados
@@ -122,12 +220,108 @@ class DataProcessor:
             print(f"❌ Erro na agregação: {e}")
             return None
     
+    def processamento_particionado(self):
+        """Usa o modo particionado? PROCESSAMENTO_PARTICIONADO ('auto' = arquivo acima de MAX_FILE_SIZE_MB)"""
+        modo = self.config.get('PROCESSAMENTO_PARTICIONADO', 'auto')
+        if modo != 'auto':
+            return bool(modo)
+        try:
+            tamanho_mb = os.path.getsize(self.config['DATA_FILE']) / (1024 * 1024)
+        except OSError:
+            return False
+        return tamanho_mb > self.config.get('MAX_FILE_SIZE_MB', 500)
+    
+    def _despejar_particoes(self, bloco, pasta, particoes, relatorios):
+        """Processa um bloco de dias completos e grava a agregação bruta de cada mês em disco"""
+        saida = io.StringIO()
+        with contextlib.redirect_stdout(saida):
+            dados = self.processar_dados(bloco, salvar_relatorio=False)
+        if dados is None:
+            print(saida.getvalue(), end='')
+            raise ValueError(f"Bloco com datas {bloco['<DATE>'].iloc[0]} a {bloco['<DATE>'].iloc[-1]} não pôde ser processado")
+        relatorios.append(self.ticks_suspeitos)
+        
+        agregado = self.agregar_bruto(dados)
+        for mes, parte in agregado.groupby(agregado.index.to_period('M')):
+            caminho = f"{pasta}/{len(particoes):05d}_{mes}.pkl"
+            parte.to_pickle(caminho)
+            particoes.append(caminho)
+    
+    @medir_desempenho
+    def carregar_e_agregar_particionado(self):
+        """Carrega e agrega o arquivo em blocos de LINHAS_POR_LEITURA linhas sem mantê-lo inteiro em memória
+
+        As barras do último dia de cada leitura passam para a leitura seguinte, de modo que
+        cada dia é filtrado e agregado inteiro, exatamente como no caminho em memória. A
+        agregação bruta de cada mês vai para uma pasta temporária em PROCESSED_DIR; ao final
+        as partições são juntadas e as métricas que dependem do dia anterior são calculadas
+        sobre a série completa. O resultado é idêntico ao de `processar_dados` + `agregar_por_dia`.
+        """
+        linhas_por_leitura = self.config.get('LINHAS_POR_LEITURA', 1_000_000)
+        print(f"📥 Carregando dados em partições mensais de: {self.config['DATA_FILE']} "
+              f"(leituras de {linhas_por_leitura:,} linhas)")
+        
+        try:
+            pasta_particoes = self.config['PROCESSED_DIR'] if os.path.isdir(self.config['PROCESSED_DIR']) else None
+            with tempfile.TemporaryDirectory(prefix='particoes_', dir=pasta_particoes) as pasta, \
+                    pd.read_csv(self.config['DATA_FILE'], sep='\t', chunksize=linhas_por_leitura) as leitor:
+                particoes, relatorios = [], []
+                total_registros, pendente = 0, None
+                for bloco in leitor:
+                    if total_registros == 0 and not all(col in bloco.columns for col in self.COLUNAS_ESPERADAS):
+                        raise ValueError("Estrutura do arquivo CSV não está conforme esperado")
+                    total_registros += len(bloco)
+                    if pendente is not None:
+                        bloco = pd.concat([pendente, bloco], ignore_index=True)
+                    
+                    # Barras do último dia lido podem continuar na próxima leitura
+                    ultimo_dia = bloco['<DATE>'].to_numpy() == bloco['<DATE>'].iloc[-1]
+                    corte = 0 if ultimo_dia.all() else len(bloco) - int(np.argmax(~ultimo_dia[::-1]))
+                    pendente = bloco.iloc[corte:].copy()
+                    if corte > 0:
+                        self._despejar_particoes(bloco.iloc[:corte], pasta, particoes, relatorios)
+                
+                if pendente is not None and len(pendente) > 0:
+                    self._despejar_particoes(pendente, pasta, particoes, relatorios)
+                if not particoes:
+                    raise ValueError("Arquivo sem registros")
+                
+                print(f"✅ {total_registros:,} registros lidos; {len(particoes)} partições mensais em disco")
+                dados_agrupados = pd.concat([pd.read_pickle(caminho) for caminho in particoes])
+        
+        except FileNotFoundError:
+            print(f"❌ Arquivo não encontrado: {self.config['DATA_FILE']}")
+            return None
+        except Exception as e:
+            print(f"❌ Erro ao carregar dados: {e}")
+            return None
+        
+        # Um dia repetido em trechos separados do arquivo não pode ser agregado por partes
+        if dados_agrupados.index.has_duplicates:
+            repetidos = dados_agrupados.index[dados_agrupados.index.duplicated()].unique()
+            print(f"❌ Arquivo fora de ordem: {len(repetidos)} dia(s) em trechos separados "
+                  f"(ex.: {repetidos[0]:%d/%m/%Y}); use PROCESSAMENTO_PARTICIONADO = False")
+            return None
+        dados_agrupados = dados_agrupados.sort_index()
+        
+        self.ticks_suspeitos = pd.concat(relatorios)
+        if len(self.ticks_suspeitos) > 0:
+            acao = "removidas antes da agregação" if self.config.get('FILTRAR_TICKS_SUSPEITOS', True) else "mantidas"
+            print(f"🧹 {len(self.ticks_suspeitos)} barras suspeitas {acao}")
+        if gravacao_ativa(self.config):
+            self.salvar_ticks_suspeitos()
+        
+        dados_diarios = self.calcular_metricas_diarias(dados_agrupados)
+        print(f"✅ Agregação concluída: {len(dados_diarios)} dias")
+        return dados_diarios
+    
+    @medir_desempenho
     def salvar_dados_diarios(self, dados_diarios):
         """Salva os dados diários processados"""
         try:
-            caminho_saida = f"{self.config['PROCESSED_DIR']}/dados_diarios.csv"
-            dados_diarios.to_csv(caminho_saida)
-            print(f"💾 Dados diários salvos: {caminho_saida}")
+            caminho_saida = salvar_tabela(dados_diarios, self.config, 'dados_diarios')
+            if caminho_saida:
+                print(f"💾 Dados diários salvos: {caminho_saida}")
             return True
         except Exception as e:
             print(f"❌ Erro ao salvar dados diários: {e}")
@@ -159,28 +353,50 @@ class DataProcessor:
         for tipo, count in tipo_dias.items():
             print(f"   • Dias de {tipo}: {count} ({count/len(dados_diarios)*100:.1f}%)")
     
-    def carregar_e_agregar_dados(self):
-        """Método principal que executa todo o pipeline de processamento"""
+    @medir_desempenho
+    def carregar_e_agregar_dados(self, dados_brutos=None):
+        """Método principal que executa todo o pipeline de processamento
+        
+        `dados_brutos` permite receber as barras de minuto (colunas do MT5) já em memória;
+        sem ele, os dados são lidos de DATA_FILE.
+        """
         print("\n📊 INICIANDO PROCESSAMENTO DE DADOS")
         print("=" * 50)
         
-        # 1. Carregar dados brutos
-        dados_brutos = self.carregar_dados_brutos()
-        if dados_brutos is None:
-            return None
-        
-        # 2. Processar dados
-        dados_processados = self.processar_dados(dados_brutos)
-        if dados_processados is None:
-            return None
-        
-        # 3. Agregar por dia
-        dados_diarios = self.agregar_por_dia(dados_processados)
-        if dados_diarios is None:
-            return None
+        if dados_brutos is not None:
+            if not all(col in dados_brutos.columns for col in self.COLUNAS_ESPERADAS):
+                print("❌ Erro ao carregar dados: estrutura das barras recebidas não está conforme esperado")
+                return None
+            dados_processados = self.processar_dados(dados_brutos)
+            if dados_processados is None:
+                return None
+            dados_diarios = self.agregar_por_dia(dados_processados)
+            if dados_diarios is None:
+                return None
+        elif self.processamento_particionado():
+            # 1-3. Carregar, processar e agregar por partições mensais
+            dados_diarios = self.carregar_e_agregar_particionado()
+            if dados_diarios is None:
+                return None
+        else:
+            # 1. Carregar dados brutos
+            dados_brutos = self.carregar_dados_brutos()
+            if dados_brutos is None:
+                return None
+            
+            # 2. Processar dados
+            dados_processados = self.processar_dados(dados_brutos)
+            if dados_processados is None:
+                return None
+            
+            # 3. Agregar por dia
+            dados_diarios = self.agregar_por_dia(dados_processados)
+            if dados_diarios is None:
+                return None
         
         # 4. Salvar dados processados
-        self.salvar_dados_diarios(dados_diarios)
+        if gravacao_ativa(self.config):
+            self.salvar_dados_diarios(dados_diarios)
         
         # 5. Exibir estatísticas
         self.exibir_estatisticas_basicas(dados_diarios)
@@ -0,0 +1,66 @@
+"""
+Downsampling Module
+Módulo com redução de séries longas antes da plotagem (LTTB para linhas e envelope min/máx para barras)
+"""
+
+import numpy as np
+
+
+def lttb(x, y, n_pontos):
+    """Largest-Triangle-Three-Buckets: índices de `n_pontos` pontos que preservam a forma da série
+
+    Primeiro e último pontos são sempre mantidos; em cada bucket intermediário é escolhido
+    o ponto que forma o maior triângulo com o ponto anterior escolhido e a média do
+    próximo bucket. Séries com até `n_pontos` pontos são retornadas sem alteração.
+    """
+    n = len(y)
+    if n_pontos >= n or n_pontos < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # n_pontos - 2 buckets entre o primeiro e o último ponto
+    bordas = np.linspace(1, n - 1, n_pontos - 1).astype(np.intp)
+    somas_x = np.add.reduceat(x[1:n - 1], bordas[:-1] - 1)
+    somas_y = np.add.reduceat(y[1:n - 1], bordas[:-1] - 1)
+    tamanhos = np.diff(bordas)
+    medias_x = np.append(somas_x / tamanhos, x[-1])
+    medias_y = np.append(somas_y / tamanhos, y[-1])
+
+    indices = np.empty(n_pontos, dtype=np.intp)
+    indices[0] = 0
+    indices[-1] = n - 1
+    anterior = 0
+
+    for i in range(n_pontos - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        xa, ya = x[anterior], y[anterior]
+        xc, yc = medias_x[i + 1], medias_y[i + 1]
+
+        areas = np.abs((xa - xc) * (y[inicio:fim] - ya) - (xa - x[inicio:fim]) * (yc - ya))
+        anterior = inicio + int(np.argmax(areas))
+        indices[i + 1] = anterior
+
+    return indices
+
+
+def envelope_min_max(valores_minimos, valores_maximos, n_grupos):
+    """Agrupa a série em `n_grupos` blocos contíguos e retorna (inicios, mínimos, máximos) por bloco
+
+    Os extremos de cada bloco são preservados, então picos isolados continuam visíveis.
+    Séries com até `n_grupos` pontos retornam um bloco por ponto.
+    """
+    n = len(valores_maximos)
+    n_grupos = max(1, min(n_grupos, n))
+    inicios = np.linspace(0, n, n_grupos, endpoint=False).astype(np.intp)
+
+    minimos = np.minimum.reduceat(np.asarray(valores_minimos, dtype=float), inicios)
+    maximos = np.maximum.reduceat(np.asarray(valores_maximos, dtype=float), inicios)
+    return inicios, minimos, maximos
+
+
+def pontos_por_eixo(ax, dpi):
+    """Largura aproximada do eixo em pixels no arquivo salvo (alvo de pontos por série)"""
+    largura_figura = ax.figure.get_size_inches()[0]
+    return max(3, int(largura_figura * ax.get_position().width * dpi))
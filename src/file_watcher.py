@@ -0,0 +1,199 @@
+"""
+File Watcher Module
+Módulo do modo de observação: acompanha o arquivo de dados, reexecuta apenas as etapas afetadas
+e publica as saídas de forma atômica
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import time
+
+from src.incremental_reader import DESCRICAO_MUDANCA, IngestaoIncremental
+from src.pipeline import Etapa, ExecutorPipeline, etapas_padrao
+
+# Subpasta (oculta) de PROCESSED_DIR e OUTPUT_DIR onde cada reanálise é montada antes da publicação
+PASTA_PREPARACAO = '.preparacao'
+
+
+def _etapa_ingestao_incremental(contexto):
+    """Ingestão a partir do estado incremental: grava as mesmas saídas da etapa padrão"""
+    from src.data_processor import DataProcessor
+    ingestao = contexto['ingestao_incremental']
+    processador = DataProcessor(contexto['config'])
+    dados_diarios = ingestao.dados_diarios()
+
+    processador.ticks_suspeitos = ingestao.ticks_suspeitos
+    processador.salvar_ticks_suspeitos()
+    processador.salvar_dados_diarios(dados_diarios)
+    processador.exibir_estatisticas_basicas(dados_diarios)
+    return dados_diarios
+
+
+class ObservadorDados:
+    """Reanalisa automaticamente quando DATA_FILE muda e troca as saídas sem expor arquivos pela metade
+
+    O arquivo é verificado a cada OBSERVAR_INTERVALO_S segundos (tamanho e data de
+    modificação) e só é lido depois de ficar estável por um intervalo, para não pegar
+    uma exportação em andamento. Um acréscimo ao final reprocessa apenas o último dia e
+    os dias novos (IngestaoIncremental); uma reescrita recarrega o arquivo. As demais
+    etapas passam pelo cache do pipeline, então só reexecutam as que tiveram a entrada
+    alterada, e gráficos e seções do relatório inalterados não são regenerados.
+
+    Cada reanálise grava em PROCESSED_DIR/.preparacao e OUTPUT_DIR/.preparacao; ao
+    final, os arquivos novos ou alterados são copiados para as pastas finais e trocados
+    com os.replace (atômico), e os que deixaram de ser gerados são removidos. Um
+    consumidor sempre lê a versão anterior ou a nova de cada arquivo, nunca uma parcial.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.config_preparacao = {
+            **config,
+            'PROCESSED_DIR': f"{config['PROCESSED_DIR']}/{PASTA_PREPARACAO}",
+            'OUTPUT_DIR': f"{config['OUTPUT_DIR']}/{PASTA_PREPARACAO}"
+        }
+        self.ingestao = IngestaoIncremental(config)
+        self.publicados = {}
+        self.carregado = False
+
+    def _etapas(self):
+        """Etapas padrão com a ingestão substituída pela incremental (sem cache: já é incremental)"""
+        etapas = []
+        for etapa in etapas_padrao(incluir_graficos=self.config.get('GERAR_GRAFICOS', True)):
+            if etapa.nome == 'ingestao':
+                etapa = Etapa(etapa.nome, etapa.titulo, _etapa_ingestao_incremental, etapa.entradas,
+                              etapa.chaves_config, etapa.modulos, etapa.arquivos, cache=False)
+            etapas.append(etapa)
+        return etapas
+
+    def _reanalisar(self):
+        """Executa o pipeline na pasta de preparação; retorna o executor e a saída de console"""
+        config = self.config_preparacao
+        for pasta in (config['PROCESSED_DIR'], f"{config['OUTPUT_DIR']}/graphs", f"{config['OUTPUT_DIR']}/reports"):
+            os.makedirs(pasta, exist_ok=True)
+
+        executor = ExecutorPipeline(config, self._etapas())
+        executor.contexto['ingestao_incremental'] = self.ingestao
+        saida = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(saida):
+                resultados = executor.executar()
+                if config.get('GERAR_DRILLDOWN_GAPS', False):
+                    from src.gap_drilldown import RenderizadorDrilldown
+                    dados_gaps, _ = resultados['gaps']
+                    RenderizadorDrilldown(config).executar(dados_gaps, resultados['outliers'])
+                executor.finalizar()
+        except Exception:
+            print(saida.getvalue()[-2000:], end='')
+            raise
+        return executor
+
+    def _publicar(self):
+        """Copia arquivos novos ou alterados da preparação para as pastas finais (os.replace por arquivo)"""
+        atuais, copiados, removidos = {}, 0, 0
+        raizes = (
+            (self.config_preparacao['PROCESSED_DIR'], self.config['PROCESSED_DIR']),
+            (self.config_preparacao['OUTPUT_DIR'], self.config['OUTPUT_DIR'])
+        )
+        for raiz_origem, raiz_destino in raizes:
+            for pasta, subpastas, arquivos in os.walk(raiz_origem):
+                # Cache do pipeline, manifesto de saídas e temporários ficam apenas na preparação
+                subpastas[:] = [nome for nome in subpastas if not nome.startswith('.')]
+                for nome in arquivos:
+                    if nome.startswith('.') or nome.endswith('.tmp'):
+                        continue
+                    origem = os.path.join(pasta, nome)
+                    destino = os.path.join(raiz_destino, os.path.relpath(origem, raiz_origem))
+                    estado = os.stat(origem)
+                    atuais[destino] = (estado.st_size, estado.st_mtime_ns)
+                    if self.publicados.get(destino) == atuais[destino] and os.path.exists(destino):
+                        continue
+
+                    os.makedirs(os.path.dirname(destino), exist_ok=True)
+                    temporario = f"{destino}.tmp"
+                    try:
+                        shutil.copy2(origem, temporario)
+                        os.replace(temporario, destino)
+                    except OSError:
+                        with contextlib.suppress(OSError):
+                            os.remove(temporario)
+                        raise
+                    copiados += 1
+
+        for destino in self.publicados.keys() - atuais.keys():
+            if os.path.exists(destino):
+                os.remove(destino)
+                removidos += 1
+        self.publicados = atuais
+        return copiados, removidos
+
+    def atualizar(self):
+        """Verifica o arquivo e, se mudou, reanalisa e publica; retorna o tipo de mudança"""
+        inicio = time.perf_counter()
+        try:
+            mudanca = self.ingestao.atualizar()
+        except Exception as e:
+            print(f"❌ Erro ao ler {self.config['DATA_FILE']}: {e}")
+            return None
+        if mudanca == 'ausente':
+            print(f"⚠️  {self.config['DATA_FILE']} indisponível; mantendo as saídas atuais")
+        if mudanca not in ('acrescimo', 'reescrita'):
+            return mudanca
+
+        try:
+            executor = self._reanalisar()
+        except Exception as e:
+            print(f"❌ Erro na reanálise ({e}); as saídas publicadas não foram alteradas")
+            return None
+        try:
+            copiados, removidos = self._publicar()
+        except Exception as e:
+            # self.publicados só muda ao final de _publicar: a próxima publicação recopia o que faltou
+            print(f"❌ Erro ao publicar as saídas ({e}); publicação interrompida, arquivos já trocados "
+                  f"ficam na versão nova e os demais na anterior")
+            return None
+
+        descricao = DESCRICAO_MUDANCA[mudanca] if self.carregado else "Carga inicial"
+        self.carregado = True
+        executadas = ', '.join(nome for nome, _ in executor.executadas) or '-'
+        reaproveitadas = ', '.join(executor.reaproveitadas) or '-'
+        print(f"🔄 {descricao}: {len(self.ingestao.dados_minuto):,} barras | etapas executadas: {executadas} | "
+              f"do cache: {reaproveitadas} | {copiados} arquivo(s) publicado(s)"
+              f"{f', {removidos} removido(s)' if removidos else ''} ({time.perf_counter() - inicio:.1f}s)")
+        return mudanca
+
+    def _marca_arquivo(self):
+        """Tamanho e data de modificação de DATA_FILE (None se ausente)"""
+        try:
+            estado = os.stat(self.config['DATA_FILE'])
+        except OSError:
+            return None
+        return estado.st_size, estado.st_mtime_ns
+
+    def observar(self):
+        """Análise inicial e reanálise a cada mudança estável do arquivo, até Ctrl+C"""
+        intervalo = self.config.get('OBSERVAR_INTERVALO_S', 2.0)
+        try:
+            self.ingestao.verificar_tamanho()
+        except ValueError as e:
+            print(f"❌ Modo de observação indisponível: {e}; use python run.py sem --observar")
+            return
+        print(f"👀 Observando {self.config['DATA_FILE']} a cada {intervalo:g}s (Ctrl+C para encerrar)")
+        marca = self._marca_arquivo()
+        self.atualizar()
+        try:
+            while True:
+                time.sleep(intervalo)
+                atual = self._marca_arquivo()
+                if atual == marca:
+                    continue
+                # Espera o arquivo parar de mudar (exportação do MT5 em andamento)
+                time.sleep(intervalo)
+                if self._marca_arquivo() != atual:
+                    continue
+                marca = atual
+                self.atualizar()
+        except KeyboardInterrupt:
+            print("\n🛑 Observação encerrada")
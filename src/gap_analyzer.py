@@ -5,6 +5,8 @@ Módulo responsável pela análise de gaps de abertura e fechamento
 
 import pandas as pd
 import numpy as np
+from src.performance import medir_desempenho
+from src.table_store import gravacao_ativa, salvar_tabela
 
 class GapAnalyzer:
     """Classe para análise completa de gaps de abertura"""
@@ -13,6 +15,7 @@ class GapAnalyzer:
         self.config = config
         self.gaps_detectados = None
     
+    @medir_desempenho
     def calcular_gaps(self, dados):
         """Calcula gaps de abertura entre sessões"""
         print(f"🔍 Calculando gaps de abertura...")
@@ -38,6 +41,7 @@ class GapAnalyzer:
         print(f"✅ Gaps calculados para {len(dados)} dias")
         return dados
     
+    @medir_desempenho
     def filtrar_gaps_significativos(self, dados):
         """Filtra apenas gaps significativos baseado na configuração"""
         gap_minimo = self.config['GAP_MINIMO']
@@ -61,6 +65,17 @@ class GapAnalyzer:
         
         return gaps_significativos
     
+    def _janelas_futuras(self, gaps_significativos, dados_completos, inicio=1):
+        """Monta a matriz de posições dos dias seguintes a cada gap (gaps × dias)"""
+        n_dias = len(dados_completos)
+        posicoes = dados_completos.index.get_indexer(gaps_significativos.index)
+        deslocamentos = np.arange(inicio, self.config['DIAS_LIMITE_GAP'] + 1)
+        
+        janelas = posicoes[:, np.newaxis] + deslocamentos
+        validos = janelas < n_dias
+        return np.minimum(janelas, n_dias - 1), validos
+    
+    @medir_desempenho
     def verificar_fechamento_gaps(self, gaps_significativos, dados_completos):
         """Verifica se os gaps foram fechados nos dias subsequentes"""
         print(f"🔄 Verificando fechamento de gaps (limite: {self.config['DIAS_LIMITE_GAP']} dias)")
@@ -70,34 +85,45 @@ class GapAnalyzer:
         gaps_com_fechamento['dias_para_fechamento'] = np.nan
         gaps_com_fechamento['preco_fechamento'] = np.nan
         gaps_com_fechamento['data_fechamento'] = pd.NaT
-        
-        for idx, gap in gaps_significativos.iterrows():
-            gap_valor = gap['gap_abertura']
-            fechamento_anterior = gap['fechamento_anterior']
-            
-            # Definir critério de fechamento baseado no tipo de gap
-            if gap_valor > 0:  # Gap Up
-                nivel_fechamento = fechamento_anterior
-                # Procurar quando o preço voltou ao nível anterior (mínima <= nível)
-                dados_futuros = dados_completos[dados_completos.index > idx][:self.config['DIAS_LIMITE_GAP']]
-                condicao_fechamento = dados_futuros['minima'] <= nivel_fechamento
-            else:  # Gap Down
-                nivel_fechamento = fechamento_anterior
-                # Procurar quando o preço voltou ao nível anterior (máxima >= nível)
-                dados_futuros = dados_completos[dados_completos.index > idx][:self.config['DIAS_LIMITE_GAP']]
-                condicao_fechamento = dados_futuros['maxima'] >= nivel_fechamento
-            
-            # Verificar se gap foi fechado
-            dias_com_fechamento = dados_futuros[condicao_fechamento]
-            
-            if len(dias_com_fechamento) > 0:
-                primeira_data_fechamento = dias_com_fechamento.index[0]
-                dias_para_fechar = (primeira_data_fechamento - idx).days
-                
-                gaps_com_fechamento.loc[idx, 'gap_fechado'] = True
-                gaps_com_fechamento.loc[idx, 'dias_para_fechamento'] = dias_para_fechar
-                gaps_com_fechamento.loc[idx, 'preco_fechamento'] = nivel_fechamento
-                gaps_com_fechamento.loc[idx, 'data_fechamento'] = primeira_data_fechamento
+        gaps_com_fechamento['dias_observados'] = 0.0
+        gaps_com_fechamento['pregoes_observados'] = 0.0
+        
+        if len(gaps_com_fechamento) == 0:
+            return gaps_com_fechamento
+        
+        # Janela dos próximos DIAS_LIMITE_GAP pregões de todos os gaps de uma vez
+        janelas, validos = self._janelas_futuras(gaps_significativos, dados_completos)
+        nivel_fechamento = gaps_significativos['fechamento_anterior'].values[:, np.newaxis]
+        gap_up = (gaps_significativos['gap_abertura'].values > 0)[:, np.newaxis]
+        
+        # Gap Up fecha quando a mínima volta ao nível anterior; Gap Down quando a máxima volta
+        condicao_fechamento = np.where(
+            gap_up,
+            dados_completos['minima'].values[janelas] <= nivel_fechamento,
+            dados_completos['maxima'].values[janelas] >= nivel_fechamento
+        ) & validos
+        
+        fechado = condicao_fechamento.any(axis=1)
+        primeiro_dia = condicao_fechamento.argmax(axis=1)
+        
+        datas_gap = gaps_significativos.index
+        datas_fechamento = dados_completos.index[janelas[np.arange(len(janelas)), primeiro_dia]]
+        dias_para_fechar = (datas_fechamento - datas_gap).days.values.astype(float)
+        
+        # Último dia efetivamente observado (censura à direita dos gaps não fechados)
+        ultimo_valido = np.maximum(validos.sum(axis=1) - 1, 0)
+        datas_ultimo = dados_completos.index[janelas[np.arange(len(janelas)), ultimo_valido]]
+        dias_ate_ultimo = np.where(validos.any(axis=1), (datas_ultimo - datas_gap).days.values, 0)
+        
+        # Mesma duração em pregões (a janela de DIAS_LIMITE_GAP é contada em pregões, não em dias corridos)
+        pregoes_observados = np.where(fechado, primeiro_dia + 1, validos.sum(axis=1))
+        
+        gaps_com_fechamento['gap_fechado'] = fechado
+        gaps_com_fechamento['dias_para_fechamento'] = np.where(fechado, dias_para_fechar, np.nan)
+        gaps_com_fechamento['preco_fechamento'] = np.where(fechado, nivel_fechamento[:, 0], np.nan)
+        gaps_com_fechamento['data_fechamento'] = datas_fechamento.where(fechado, pd.NaT)
+        gaps_com_fechamento['dias_observados'] = np.where(fechado, dias_para_fechar, dias_ate_ultimo).astype(float)
+        gaps_com_fechamento['pregoes_observados'] = pregoes_observados.astype(float)
         
         # Estatísticas de fechamento
         total_gaps = len(gaps_com_fechamento)
@@ -111,6 +137,60 @@ class GapAnalyzer:
         
         return gaps_com_fechamento
     
+    @medir_desempenho
+    def calcular_tempo_pico(self, gaps_com_fechamento, dados_completos):
+        """Mede o dia e o horário da máxima excursão contra o gap antes do fechamento
+
+        O horário vem das colunas hora_maxima/hora_minima dos dados diários (agregadas das
+        barras de minuto na ingestão); dados diários sem essas colunas medem só o dia.
+        """
+        print(f"📍 Medindo tempo até o pico da excursão...")
+        
+        gaps = gaps_com_fechamento.copy()
+        if len(gaps) == 0:
+            return gaps
+        
+        # Janela do próprio dia do gap até o dia do fechamento (ou fim da observação)
+        janelas, validos = self._janelas_futuras(gaps, dados_completos, inicio=0)
+        datas = dados_completos.index
+        posicao_gap = datas.get_indexer(gaps.index)
+        posicao_fechamento = datas.get_indexer(pd.DatetimeIndex(gaps['data_fechamento']))
+        limite = np.where(gaps['gap_fechado'].values, posicao_fechamento - posicao_gap, janelas.shape[1] - 1)
+        validos &= np.arange(janelas.shape[1]) <= limite[:, np.newaxis]
+        
+        # Excursão a favor do gap: máxima acima do nível (Gap Up) ou mínima abaixo (Gap Down)
+        nivel = gaps['fechamento_anterior'].values[:, np.newaxis]
+        gap_up = gaps['gap_abertura'].values > 0
+        excursao = np.where(
+            gap_up[:, np.newaxis],
+            dados_completos['maxima'].values[janelas] - nivel,
+            nivel - dados_completos['minima'].values[janelas]
+        )
+        excursao = np.where(validos, excursao, -np.inf)
+        
+        dia_pico = excursao.argmax(axis=1)
+        linhas = np.arange(len(gaps))
+        posicao_pico = janelas[linhas, dia_pico]
+        datas_pico = datas[posicao_pico]
+        
+        gaps['data_pico'] = datas_pico
+        gaps['dias_para_pico'] = (datas_pico - gaps.index).days.values.astype(float)
+        gaps['excursao_maxima'] = excursao[linhas, dia_pico]
+        
+        # Horário da máxima (Gap Up) ou da mínima (Gap Down) no dia do pico
+        if 'hora_maxima' in dados_completos.columns:
+            gaps['hora_pico'] = np.where(
+                gap_up,
+                dados_completos['hora_maxima'].values[posicao_pico],
+                dados_completos['hora_minima'].values[posicao_pico]
+            )
+        
+        fechados = gaps[gaps['gap_fechado']]
+        if len(fechados) > 0:
+            print(f"✅ Pico medido para {len(gaps)} gaps (médio: {fechados['dias_para_pico'].mean():.1f} dias antes do fechamento)")
+        
+        return gaps
+    
     def analisar_tempo_fechamento(self, gaps_com_fechamento):
         """Analisa estatísticas do tempo para fechamento dos gaps"""
         gaps_fechados = gaps_com_fechamento[gaps_com_fechamento['gap_fechado'] == True]
@@ -182,6 +262,7 @@ class GapAnalyzer:
                 tempo_medio = fechados_tipo['dias_para_fechamento'].mean()
                 print(f"   • Tempo médio fechamento: {tempo_medio:.1f} dias")
     
+    @medir_desempenho
     def filtrar_dados_sem_gaps_abertos(self, dados_originais, gaps_com_fechamento):
         """Remove dias com gaps que não fecharam do dataset"""
         gaps_nao_fechados = gaps_com_fechamento[~gaps_com_fechamento['gap_fechado']]
@@ -212,18 +293,18 @@ class GapAnalyzer:
         
         return dados_limpos
     
+    @medir_desempenho
     def salvar_analise_gaps(self, gaps_com_fechamento, dados_finais):
         """Salva os resultados da análise de gaps"""
         try:
             # Salvar análise completa dos gaps
-            caminho_gaps = f"{self.config['PROCESSED_DIR']}/gaps_analisados.csv"
-            gaps_com_fechamento.to_csv(caminho_gaps)
+            caminho_gaps = salvar_tabela(gaps_com_fechamento, self.config, 'gaps_analisados')
             
             # Salvar dados finais sem gaps abertos
-            caminho_dados_limpos = f"{self.config['PROCESSED_DIR']}/dados_limpos_finais.csv"
-            dados_finais.to_csv(caminho_dados_limpos)
+            caminho_dados_limpos = salvar_tabela(dados_finais, self.config, 'dados_limpos_finais')
             
-            print(f"💾 Análise de gaps salva: {caminho_gaps}")
+            if caminho_gaps:
+                print(f"💾 Análise de gaps salva: {caminho_gaps}")
             print(f"💾 Dados finais salvos: {caminho_dados_limpos}")
             
             return True
@@ -232,6 +313,7 @@ class GapAnalyzer:
             print(f"❌ Erro ao salvar análise de gaps: {e}")
             return False
     
+    @medir_desempenho
     def analisar_gaps(self, dados_sem_outliers):
         """Método principal para análise completa de gaps"""
         print("\n📈 INICIANDO ANÁLISE DE GAPS")
@@ -253,6 +335,7 @@ class GapAnalyzer:
         
         # 3. Verificar fechamento dos gaps
         gaps_com_fechamento = self.verificar_fechamento_gaps(gaps_significativos, dados_com_gaps)
+        gaps_com_fechamento = self.calcular_tempo_pico(gaps_com_fechamento, dados_com_gaps)
         
         # 4. Análises estatísticas
         self.analisar_tempo_fechamento(gaps_com_fechamento)
@@ -262,7 +345,8 @@ class GapAnalyzer:
         dados_finais = self.filtrar_dados_sem_gaps_abertos(dados_sem_outliers, gaps_com_fechamento)
         
         # 6. Salvar resultados
-        self.salvar_analise_gaps(gaps_com_fechamento, dados_finais)
+        if gravacao_ativa(self.config):
+            self.salvar_analise_gaps(gaps_com_fechamento, dados_finais)
         
         # Armazenar para uso posterior
         self.gaps_detectados = gaps_com_fechamento
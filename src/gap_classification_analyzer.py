@@ -7,8 +7,12 @@ Módulo para análise de classificação de gaps integrado ao sistema principal
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import stats
+from src.survival_analyzer import SurvivalAnalyzer
+from src.rolling_classifier import ReclassificadorRolante
+from src.class_lookup import exportar_tabela
+from src.chart_renderer import RenderizadorGraficos
+from src.performance import medir_desempenho
+from src.table_store import carregar_tabela, gravacao_ativa, salvar_tabela
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -50,42 +54,61 @@ class GapClassificationAnalyzer:
         self.config = config
         self.gaps_df = None
         self.metrics_df = None
-        
-    def executar_analise_completa(self):
-        """Executa a análise completa de classificação de gaps"""
+        self.survival_analyzer = SurvivalAnalyzer(config)
+        self.reclassificador = ReclassificadorRolante(config)
+        self.intervals = None
+        self.graficos_pendentes = None
+        
+    @medir_desempenho
+    def executar_analise_completa(self, gaps_df=None):
+        """Executa a análise completa de classificação de gaps
+        
+        `gaps_df` permite receber os gaps já analisados em memória; sem ele, os gaps
+        são lidos da tabela gaps_analisados de PROCESSED_DIR (carregar_tabela).
+        """
         print("\n📊 INICIANDO ANÁLISE DE CLASSIFICAÇÃO DE GAPS")
         print("=" * 60)
         
         # Carregar dados de gaps
-        if not self._carregar_dados_gaps():
+        if not self._carregar_dados_gaps(gaps_df):
             return None, None
             
         # Analisar distribuição
         optimal_intervals = self._analisar_distribuicao()
         
         # Classificar gaps
-        intervals, labels = self._classificar_gaps(optimal_intervals)
+        self.intervals, labels = self._classificar_gaps(optimal_intervals)
         
         # Calcular métricas
         self.metrics_df = self._calcular_metricas_por_classe()
         
-        # Gerar visualizações
-        self._gerar_graficos_classificacao()
+        # Curvas de sobrevivência (tempo até fechamento com censura)
+        self._calcular_sobrevivencia()
+        
+        # Limites e probabilidades em janela móvel (walk-forward)
+        self.reclassificador.executar(self.gaps_df)
+        
+        # Gerar visualizações (GERAR_GRAFICOS=False pula os gráficos e o matplotlib)
+        if self.config.get('GERAR_GRAFICOS', True) and gravacao_ativa(self.config):
+            self._gerar_graficos_classificacao()
         
         # Salvar datasets
-        self._salvar_datasets()
+        if gravacao_ativa(self.config):
+            self._salvar_datasets()
         
         # Exibir relatório detalhado
         self._exibir_relatorio_detalhado()
         
         return self.gaps_df, self.metrics_df
     
-    def _carregar_dados_gaps(self):
-        """Carrega dados de gaps analisados"""
-        gaps_file = f"{self.config['PROCESSED_DIR']}/gaps_analisados.csv"
-        
+    @medir_desempenho
+    def _carregar_dados_gaps(self, gaps_df=None):
+        """Carrega dados de gaps analisados (do DataFrame recebido ou de PROCESSED_DIR)"""
         try:
-            self.gaps_df = pd.read_csv(gaps_file, index_col=0, parse_dates=True)
+            if gaps_df is None:
+                self.gaps_df = carregar_tabela('gaps_analisados', self.config['PROCESSED_DIR'])
+            else:
+                self.gaps_df = gaps_df.copy()
             self.gaps_df = self.gaps_df[self.gaps_df['gap_absoluto'] >= self.config['GAP_MINIMO']]
             
             if len(self.gaps_df) == 0:
@@ -99,6 +122,14 @@ class GapClassificationAnalyzer:
             print("❌ Arquivo de gaps não encontrado. Execute primeiro a análise de gaps.")
             return False
     
+    def _contagens_por_intervalo(self, gaps, intervals):
+        """Contagem por intervalo equivalente a pd.cut(include_lowest=True, duplicates='drop')"""
+        limites = np.unique(intervals)
+        dentro = gaps[(gaps >= limites[0]) & (gaps <= limites[-1])]
+        posicoes = np.maximum(np.searchsorted(limites, dentro, side='left'), 1) - 1
+        return np.bincount(posicoes, minlength=len(limites) - 1)
+    
+    @medir_desempenho
     def _analisar_distribuicao(self):
         """Analisa a distribuição dos gaps"""
         print("\n🔍 ANÁLISE ESTATÍSTICA DA DISTRIBUIÇÃO")
@@ -124,7 +155,8 @@ class GapClassificationAnalyzer:
         print(f"• Q3 (75%): {q3:.0f} pontos")
         print(f"• IQR: {iqr:.0f} pontos")
         
-        # Teste de normalidade
+        # Teste de normalidade (scipy carregado apenas aqui)
+        from scipy import stats
         stat, p_value = stats.normaltest(gaps)
         print(f"• Teste de normalidade: p-value = {p_value:.2e}")
         print(f"• Distribuição: {'Normal' if p_value > 0.05 else 'Não-normal'}")
@@ -132,6 +164,7 @@ class GapClassificationAnalyzer:
         # Otimizar intervalos
         return self._otimizar_intervalos(gaps)
     
+    @medir_desempenho
     def _otimizar_intervalos(self, gaps):
         """Otimiza intervalos usando métodos estatísticos"""
         print(f"\n🎯 OTIMIZAÇÃO DE INTERVALOS")
@@ -203,11 +236,11 @@ class GapClassificationAnalyzer:
         scores = {}
         
         for method_name, intervals in methods.items():
-            bins = pd.cut(gaps, bins=intervals, include_lowest=True, duplicates='drop')
-            bin_counts = bins.value_counts()
+            bin_counts = self._contagens_por_intervalo(gaps, intervals)
             
             # Critério: distribuição balanceada
-            balance_score = 1 / (bin_counts.std() / bin_counts.mean()) if bin_counts.std() > 0 else 1
+            bin_std = bin_counts.std(ddof=1)
+            balance_score = 1 / (bin_std / bin_counts.mean()) if bin_std > 0 else 1
             
             # Critério: observações mínimas por bin
             min_obs_score = 1 if bin_counts.min() >= 10 else bin_counts.min() / 10
@@ -218,6 +251,7 @@ class GapClassificationAnalyzer:
         
         return max(scores, key=scores.get)
     
+    @medir_desempenho
     def _classificar_gaps(self, intervals):
         """Classifica gaps nos intervalos"""
         print(f"\n📋 CLASSIFICAÇÃO DOS GAPS EM INTERVALOS")
@@ -248,6 +282,7 @@ class GapClassificationAnalyzer:
         
         return intervals, labels
     
+    @medir_desempenho
     def _calcular_metricas_por_classe(self):
         """Calcula métricas detalhadas por classe"""
         print(f"\n📈 CALCULANDO MÉTRICAS DETALHADAS POR CLASSE")
@@ -284,6 +319,9 @@ class GapClassificationAnalyzer:
             tempo_pico_up = self._calcular_tempo_pico(class_data[class_data['tipo_gap'] == 'Gap Up'])
             tempo_pico_down = self._calcular_tempo_pico(class_data[class_data['tipo_gap'] == 'Gap Down'])
             
+            excursao_up = self._estatisticas_excursao(class_data[class_data['tipo_gap'] == 'Gap Up'])
+            excursao_down = self._estatisticas_excursao(class_data[class_data['tipo_gap'] == 'Gap Down'])
+            
             result = {
                 'intervalo': gap_class,
                 'n_observacoes': n_obs,
@@ -300,6 +338,10 @@ class GapClassificationAnalyzer:
                 'tempo_fechamento_down': tempo_fechamento_down,
                 'tempo_pico_up': tempo_pico_up,
                 'tempo_pico_down': tempo_pico_down,
+                'excursao_media_up': excursao_up[0],
+                'excursao_media_down': excursao_down[0],
+                'excursao_p90_up': excursao_up[1],
+                'excursao_p90_down': excursao_down[1],
                 'volatilidade_media': class_data['volatilidade'].mean(),
                 'gap_medio': class_data['gap_absoluto'].mean(),
                 'gap_min': class_data['gap_absoluto'].min(),
@@ -310,8 +352,17 @@ class GapClassificationAnalyzer:
         
         return pd.DataFrame(results)
     
+    @medir_desempenho
+    def _calcular_sobrevivencia(self):
+        """Calcula curvas de Kaplan-Meier e adiciona o resumo às métricas por classe"""
+        self.survival_analyzer.calcular_curvas(self.gaps_df)
+        resumo = self.survival_analyzer.resumo_por_classe()
+        
+        self.metrics_df['intervalo'] = self.metrics_df['intervalo'].astype(str)
+        self.metrics_df = self.metrics_df.merge(resumo, on='intervalo', how='left')
+    
     def _calcular_tempo_pico(self, class_data):
-        """Estima tempo para pico do movimento"""
+        """Tempo médio até o pico do movimento (medido na análise de gaps)"""
         if len(class_data) == 0:
             return np.nan
         
@@ -319,37 +370,80 @@ class GapClassificationAnalyzer:
         if len(gaps_with_closure) == 0:
             return np.nan
         
+        if 'dias_para_pico' in gaps_with_closure.columns:
+            return gaps_with_closure['dias_para_pico'].mean()
+        
+        # Arquivos antigos sem o pico medido: estimativa de 50% do tempo de fechamento
         tempo_fechamento = gaps_with_closure['dias_para_fechamento']
-        tempo_pico_estimado = tempo_fechamento * 0.5  # Estimativa: 50% do tempo de fechamento
+        tempo_pico_estimado = tempo_fechamento * 0.5
         
         return tempo_pico_estimado.mean()
     
-    def _gerar_graficos_classificacao(self):
-        """Gera gráficos específicos da análise de classificação"""
-        print(f"\n📊 GERANDO GRÁFICOS DA ANÁLISE DE CLASSIFICAÇÃO")
-        print("-" * 50)
+    def _estatisticas_excursao(self, class_data):
+        """Média e percentil 90 da excursão máxima contra o gap (em pontos)"""
+        if len(class_data) == 0 or 'excursao_maxima' not in class_data.columns:
+            return np.nan, np.nan
         
-        # Configurar estilo
+        excursao = class_data['excursao_maxima'].values
+        return excursao.mean(), np.percentile(excursao, 90)
+    
+    def _configurar_estilo(self):
+        """Configura o estilo dos gráficos (executado em cada processo de renderização)"""
+        import matplotlib.pyplot as plt
         plt.style.use('default')
         plt.rcParams['figure.figsize'] = (15, 10)
         plt.rcParams['font.size'] = 10
+    
+    @medir_desempenho
+    def _gerar_graficos_classificacao(self):
+        """Gera gráficos específicos da análise de classificação (em paralelo)"""
+        print(f"\n📊 GERANDO GRÁFICOS DA ANÁLISE DE CLASSIFICAÇÃO")
+        print("-" * 50)
         
-        # Gráfico 1: Distribuição dos gaps por classe
-        self._plot_distribuicao_classes()
-        
-        # Gráfico 2: Probabilidades de fechamento
-        self._plot_probabilidades_fechamento()
-        
-        # Gráfico 3: Tempos de fechamento por classe
-        self._plot_tempos_fechamento()
-        
-        # Gráfico 4: Análise de volatilidade e amplitude
-        self._plot_volatilidade_amplitude()
+        def metricas(*colunas):
+            return {'metrics_df': self.metrics_df[['intervalo', *colunas]]}
+        
+        pasta = f"{self.config['OUTPUT_DIR']}/graphs"
+        
+        # Cada gráfico recebe apenas as colunas que utiliza
+        tarefas = [
+            # Gráfico 1: Distribuição dos gaps por classe
+            ('_plot_distribuicao_classes', {'gaps_df': self.gaps_df[['gap_absoluto', 'gap_class', 'tipo_gap']]}, (),
+             f"{pasta}/classificacao_distribuicao.png"),
+            # Gráfico 2: Probabilidades de fechamento
+            ('_plot_probabilidades_fechamento', metricas('prob_fechamento_up', 'prob_fechamento_down'), (),
+             f"{pasta}/classificacao_probabilidades.png"),
+            # Gráfico 3: Tempos de fechamento por classe
+            ('_plot_tempos_fechamento', metricas(
+                'tempo_fechamento_up', 'tempo_fechamento_down', 'tempo_pico_up', 'tempo_pico_down'
+            ), (), f"{pasta}/classificacao_tempos.png"),
+            # Gráfico 4: Análise de volatilidade e amplitude
+            ('_plot_volatilidade_amplitude', {
+                **metricas('volatilidade_media', 'amplitude_maxima', 'amplitude_minima', 'amplitude_media', 'gap_medio'),
+                'gaps_df': self.gaps_df[['gap_class', 'amplitude']]
+            }, (), f"{pasta}/classificacao_volatilidade.png")
+        ]
+        
+        resultado = RenderizadorGraficos(self.config).executar(
+            GapClassificationAnalyzer, tarefas, preparar='_configurar_estilo',
+            segundo_plano=self.config.get('GRAFICOS_SEGUNDO_PLANO', False)
+        )
         
-        print(f"✅ 4 gráficos de classificação gerados")
+        if self.config.get('GRAFICOS_SEGUNDO_PLANO', False):
+            self.graficos_pendentes = resultado
+        else:
+            print(f"✅ {resultado} gráficos de classificação gerados")
     
+    def aguardar_graficos(self):
+        """Aguarda os gráficos de classificação em segundo plano (se houver)"""
+        if self.graficos_pendentes is not None:
+            print(f"✅ {self.graficos_pendentes.aguardar()} gráficos de classificação gerados")
+            self.graficos_pendentes = None
+    
+    @medir_desempenho
     def _plot_distribuicao_classes(self):
         """Plota distribuição dos gaps por classe"""
+        import matplotlib.pyplot as plt
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
         fig.suptitle('📊 ANÁLISE DE DISTRIBUIÇÃO DAS CLASSES DE GAPS', fontsize=16, fontweight='bold')
         
@@ -415,8 +509,10 @@ class GapClassificationAnalyzer:
         
         print(f"✅ Gráfico salvo: classificacao_distribuicao.png")
     
+    @medir_desempenho
     def _plot_probabilidades_fechamento(self):
         """Plota probabilidades de fechamento por classe"""
+        import matplotlib.pyplot as plt
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
         fig.suptitle('🎯 PROBABILIDADES DE FECHAMENTO POR CLASSE', fontsize=16, fontweight='bold')
         
@@ -472,8 +568,10 @@ class GapClassificationAnalyzer:
         
         print(f"✅ Gráfico salvo: classificacao_probabilidades.png")
     
+    @medir_desempenho
     def _plot_tempos_fechamento(self):
         """Plota tempos de fechamento por classe"""
+        import matplotlib.pyplot as plt
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
         fig.suptitle('⏱️ ANÁLISE DE TEMPOS POR CLASSE', fontsize=16, fontweight='bold')
         
@@ -561,8 +659,10 @@ class GapClassificationAnalyzer:
         
         print(f"✅ Gráfico salvo: classificacao_tempos.png")
     
+    @medir_desempenho
     def _plot_volatilidade_amplitude(self):
         """Plota análise de volatilidade e amplitude por classe"""
+        import matplotlib.pyplot as plt
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
         fig.suptitle('📊 ANÁLISE DE VOLATILIDADE E AMPLITUDE POR CLASSE', fontsize=16, fontweight='bold')
         
@@ -646,15 +746,14 @@ class GapClassificationAnalyzer:
         
         print(f"✅ Gráfico salvo: classificacao_volatilidade.png")
     
+    @medir_desempenho
     def _salvar_datasets(self):
         """Salva datasets da classificação"""
         # Dataset 1: Gaps classificados
-        classified_file = f"{self.config['PROCESSED_DIR']}/gaps_classificados.csv"
-        self.gaps_df.to_csv(classified_file)
+        classified_file = salvar_tabela(self.gaps_df, self.config, 'gaps_classificados')
         
         # Dataset 2: Métricas por classe
-        metrics_file = f"{self.config['PROCESSED_DIR']}/metricas_por_classe.csv"
-        self.metrics_df.to_csv(metrics_file, index=False)
+        metrics_file = salvar_tabela(self.metrics_df, self.config, 'metricas_por_classe', indice=False)
         
         # Dataset 3: Features para modelo
         features_df = self.gaps_df[[
@@ -665,13 +764,29 @@ class GapClassificationAnalyzer:
         features_df['tipo_gap_up'] = (self.gaps_df['tipo_gap'] == 'Gap Up').astype(int)
         features_df['gap_class_encoded'] = self.gaps_df['gap_class'].cat.codes
         
-        features_file = f"{self.config['PROCESSED_DIR']}/features_para_modelo.csv"
-        features_df.to_csv(features_file)
+        features_file = salvar_tabela(features_df, self.config, 'features_para_modelo')
+        
+        # Dataset 4: Curvas de sobrevivência por classe e tipo
+        survival_file = self.survival_analyzer.salvar_curvas()
+        
+        # Dataset 5: Série de limites e probabilidades em janela móvel
+        rolling_file = self.reclassificador.salvar_serie()
+        
+        # Dataset 6: Tabela compacta para consulta rápida (limites + matriz de métricas)
+        lookup_file = exportar_tabela(
+            f"{self.config['PROCESSED_DIR']}/tabela_classes.npz",
+            self.intervals,
+            self.gaps_df['gap_class'].cat.categories,
+            self.metrics_df
+        )
         
         print(f"✅ Datasets salvos:")
         print(f"   • {classified_file}")
         print(f"   • {metrics_file}")
         print(f"   • {features_file}")
+        print(f"   • {survival_file}")
+        print(f"   • {rolling_file}")
+        print(f"   • {lookup_file}")
     
     def _exibir_relatorio_detalhado(self):
         """Exibe relatório detalhado da análise"""
@@ -701,6 +816,9 @@ class GapClassificationAnalyzer:
             if not pd.isna(row['tempo_fechamento_up']) and not pd.isna(row['tempo_fechamento_down']):
                 print(f"   ⏱️  Tempo Fechamento: Up {row['tempo_fechamento_up']:.1f}d | Down {row['tempo_fechamento_down']:.1f}d")
             
+            if not pd.isna(row['tempo_mediano_km_up']) and not pd.isna(row['tempo_mediano_km_down']):
+                print(f"   ⏳ Mediana Kaplan-Meier: Up {row['tempo_mediano_km_up']:.0f} pregões | Down {row['tempo_mediano_km_down']:.0f} pregões")
+            
             if not pd.isna(row['tempo_pico_up']) and not pd.isna(row['tempo_pico_down']):
                 print(f"   ⏱️  Tempo Pico: Up {row['tempo_pico_up']:.1f}d | Down {row['tempo_pico_down']:.1f}d")
             
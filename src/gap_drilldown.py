@@ -0,0 +1,219 @@
+"""
+Gap Drilldown Module
+Módulo responsável pelos gráficos individuais de cada gap (trajetória diária até o fechamento)
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+# Figura reutilizada por processo: criada uma vez e atualizada a cada gap
+_FIGURA = None
+
+
+def _criar_figura(tamanho, dpi):
+    """Cria a figura e os artistas que serão atualizados em cada gap (sem pyplot)"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import LineCollection
+    from matplotlib.ticker import MaxNLocator
+
+    fig = Figure(figsize=tamanho, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(1, 1, 1)
+
+    faixa = LineCollection([], colors='gray', linewidths=3, alpha=0.5)
+    ax.add_collection(faixa)
+    artistas = {
+        'faixa': faixa,
+        'fechamento': ax.plot([], [], color='blue', linewidth=1.2, marker='o', markersize=3)[0],
+        'nivel': ax.axhline(0, color='red', linestyle='--', linewidth=1),
+        'abertura': ax.plot([], [], linestyle='none', marker='>', color='black', markersize=6)[0],
+        'preenchimento': ax.plot([], [], linestyle='none', marker='*', color='green', markersize=10)[0],
+        'titulo': ax.set_title('', fontsize=9)
+    }
+    ax.set_xlabel('Pregões após o gap', fontsize=8)
+    ax.set_ylabel('Preço (pontos)', fontsize=8)
+    ax.tick_params(labelsize=7)
+    ax.xaxis.set_major_locator(MaxNLocator(nbins=5, integer=True))
+    ax.yaxis.set_major_locator(MaxNLocator(nbins=4))
+    ax.grid(True, alpha=0.3)
+    fig.subplots_adjust(left=0.17, right=0.97, top=0.88, bottom=0.18)
+
+    return fig, ax, artistas
+
+
+def _renderizar_lote(lote, tamanho, dpi):
+    """Renderiza um lote de gaps reaproveitando a figura do processo; retorna os tempos em ms"""
+    global _FIGURA
+    if _FIGURA is None:
+        _FIGURA = _criar_figura(tamanho, dpi)
+    fig, ax, artistas = _FIGURA
+
+    offsets = lote['offsets']
+    tempos = np.empty(len(lote['arquivos']))
+
+    for i, arquivo in enumerate(lote['arquivos']):
+        inicio = time.perf_counter()
+        fatia = slice(offsets[i], offsets[i + 1])
+        maxima, minima, fechamento = lote['maxima'][fatia], lote['minima'][fatia], lote['fechamento'][fatia]
+        nivel = lote['niveis'][i]
+        x = np.arange(len(fechamento))
+
+        # Atualizar dados dos artistas no lugar
+        artistas['faixa'].set_segments(np.stack([np.column_stack([x, minima]), np.column_stack([x, maxima])], axis=1))
+        artistas['fechamento'].set_data(x, fechamento)
+        artistas['nivel'].set_ydata([nivel, nivel])
+        artistas['abertura'].set_data([0], [lote['aberturas'][i]])
+        if lote['fechados'][i]:
+            artistas['preenchimento'].set_data([x[-1]], [nivel])
+        else:
+            artistas['preenchimento'].set_data([], [])
+        artistas['titulo'].set_text(lote['titulos'][i])
+
+        # Limites calculados diretamente (sem relim/autoscale)
+        y_min = min(minima.min(), nivel)
+        y_max = max(maxima.max(), nivel)
+        margem = (y_max - y_min) * 0.08 or 1.0
+        ax.set_xlim(-0.5, max(len(x) - 0.5, 1.5))
+        ax.set_ylim(y_min - margem, y_max + margem)
+
+        # Desenho direto no canvas e PNG com compressão rápida (evita o overhead de savefig)
+        fig.canvas.draw()
+        largura, altura = fig.canvas.get_width_height()
+        Image.frombuffer('RGBA', (largura, altura), fig.canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1).save(
+            arquivo, compress_level=1
+        )
+        tempos[i] = (time.perf_counter() - inicio) * 1000
+
+    return tempos
+
+
+class RenderizadorDrilldown:
+    """Gera um gráfico pequeno por gap: trajetória diária da abertura até o fechamento (ou fim da janela)
+
+    Os gaps são divididos em lotes distribuídos entre processos; cada processo cria
+    uma única figura e apenas atualiza os dados dos artistas a cada gap.
+    Saída: OUTPUT_DIR/graphs/gaps/ com um PNG por gap e o índice `indice.csv`.
+    """
+
+    LOTES_POR_PROCESSO = 4
+
+    def __init__(self, config):
+        self.config = config
+        self.indice = None
+
+    def _trajetorias(self, gaps_df, dados_diarios):
+        """Posições diárias de cada gap concatenadas (início no dia do gap, fim no fechamento ou na janela)"""
+        n_dias = len(dados_diarios)
+        inicio = dados_diarios.index.get_indexer(gaps_df.index)
+
+        fim_janela = np.minimum(inicio + self.config['DIAS_LIMITE_GAP'], n_dias - 1)
+        fechado = gaps_df['gap_fechado'].astype(bool).values
+        datas_fechamento = pd.DatetimeIndex(pd.to_datetime(gaps_df['data_fechamento']))
+        fim_fechamento = dados_diarios.index.get_indexer(datas_fechamento)
+        fim = np.where(fechado & (fim_fechamento >= 0), fim_fechamento, fim_janela)
+
+        comprimentos = fim - inicio + 1
+        offsets = np.concatenate(([0], np.cumsum(comprimentos)))
+        posicoes = np.repeat(inicio - offsets[:-1], comprimentos) + np.arange(offsets[-1])
+        return posicoes, offsets, fechado
+
+    def _lotes(self, gaps_df, dados_diarios, arquivos):
+        """Divide os gaps em lotes com apenas os arrays necessários para o desenho"""
+        posicoes, offsets, fechado = self._trajetorias(gaps_df, dados_diarios)
+        maxima = dados_diarios['maxima'].values[posicoes]
+        minima = dados_diarios['minima'].values[posicoes]
+        fechamento = dados_diarios['fechamento'].values[posicoes]
+
+        titulos = [
+            f"{data:%d/%m/%Y} • {tipo} de {gap:.0f} pts • "
+            + (f"fechou em {dias:.0f}d" if fechou else "não fechou")
+            for data, tipo, gap, fechou, dias in zip(
+                gaps_df.index, gaps_df['tipo_gap'], gaps_df['gap_absoluto'], fechado, gaps_df['dias_para_fechamento']
+            )
+        ]
+
+        n_processos = self._n_processos(len(gaps_df))
+        n_lotes = min(len(gaps_df), n_processos * self.LOTES_POR_PROCESSO)
+        cortes = np.linspace(0, len(gaps_df), n_lotes + 1).astype(int)
+
+        lotes = []
+        for a, b in zip(cortes[:-1], cortes[1:]):
+            fatia = slice(offsets[a], offsets[b])
+            lotes.append({
+                'arquivos': arquivos[a:b],
+                'offsets': offsets[a:b + 1] - offsets[a],
+                'maxima': maxima[fatia],
+                'minima': minima[fatia],
+                'fechamento': fechamento[fatia],
+                'niveis': gaps_df['fechamento_anterior'].values[a:b],
+                'aberturas': gaps_df['abertura'].values[a:b],
+                'fechados': fechado[a:b],
+                'titulos': titulos[a:b]
+            })
+        return lotes, np.diff(offsets)
+
+    def _n_processos(self, n_gaps):
+        """Número de processos: GRAFICOS_PROCESSOS ou os núcleos disponíveis"""
+        n_processos = self.config.get('GRAFICOS_PROCESSOS') or os.cpu_count() or 1
+        return max(1, min(n_processos, n_gaps))
+
+    def _limpar_pasta(self, pasta):
+        """Remove os gráficos e o índice da execução anterior (gaps que deixaram de existir)"""
+        if not os.path.isdir(pasta):
+            return 0
+        antigos = [nome for nome in os.listdir(pasta)
+                   if nome == 'indice.csv' or (nome.startswith('gap_') and nome.endswith('.png'))]
+        for nome in antigos:
+            os.remove(os.path.join(pasta, nome))
+        return len(antigos)
+
+    def executar(self, gaps_df, dados_diarios):
+        """Gera os gráficos de todos os gaps e salva o índice com os tempos de renderização"""
+        print(f"\n🔎 GERANDO GRÁFICOS INDIVIDUAIS DOS GAPS")
+        print("-" * 50)
+
+        pasta = f"{self.config['OUTPUT_DIR']}/graphs/gaps"
+        self._limpar_pasta(pasta)
+        if gaps_df is None or len(gaps_df) == 0:
+            print("⚠️  Nenhum gap para detalhar")
+            return None
+
+        os.makedirs(pasta, exist_ok=True)
+        arquivos = [f"{pasta}/gap_{i:05d}_{data:%Y%m%d}.png" for i, data in enumerate(gaps_df.index)]
+
+        tamanho = self.config.get('DRILLDOWN_TAMANHO', (4, 2.5))
+        dpi = self.config.get('DRILLDOWN_DPI', 100)
+        lotes, n_pregoes = self._lotes(gaps_df, dados_diarios, arquivos)
+        n_processos = self._n_processos(len(gaps_df))
+
+        inicio = time.perf_counter()
+        if n_processos == 1:
+            tempos = [_renderizar_lote(lote, tamanho, dpi) for lote in lotes]
+        else:
+            with ProcessPoolExecutor(max_workers=n_processos) as executor:
+                tempos = list(executor.map(_renderizar_lote, lotes, [tamanho] * len(lotes), [dpi] * len(lotes)))
+        tempo_total = time.perf_counter() - inicio
+        tempos = np.concatenate(tempos)
+
+        self.indice = pd.DataFrame({
+            'arquivo': [os.path.basename(arquivo) for arquivo in arquivos],
+            'data': gaps_df.index,
+            'tipo_gap': gaps_df['tipo_gap'].values,
+            'gap_absoluto': gaps_df['gap_absoluto'].values,
+            'gap_fechado': gaps_df['gap_fechado'].values,
+            'pregoes_exibidos': n_pregoes,
+            'tempo_render_ms': np.round(tempos, 2)
+        })
+        self.indice.to_csv(f"{pasta}/indice.csv", index=False)
+
+        print(f"✅ {len(arquivos)} gráficos salvos em: {pasta}/")
+        print(f"   • Tempo por gap: {np.median(tempos):.1f} ms (mediana), {tempos.max():.1f} ms (máximo)")
+        print(f"   • Tempo total: {tempo_total:.1f}s com {n_processos} processo(s)")
+
+        return self.indice
@@ -0,0 +1,172 @@
+"""
+Incremental Reader Module
+Módulo de leitura incremental do arquivo de dados: detecta se o arquivo cresceu (acréscimo ao final)
+ou foi reescrito, lê apenas as linhas novas e mantém a agregação diária atualizada
+"""
+
+import contextlib
+import hashlib
+import io
+import os
+
+import pandas as pd
+
+from src.data_processor import DataProcessor
+
+# Mensagens por tipo de mudança do arquivo de dados
+DESCRICAO_MUDANCA = {'acrescimo': "Acréscimo detectado", 'reescrita': "Reescrita detectada"}
+
+
+class LeitorIncremental:
+    """Lê o arquivo tabulado do MT5 uma vez e, depois, apenas os bytes acrescentados ao final
+
+    A posição guardada é sempre o fim da última linha completa: uma linha ainda sendo
+    escrita (sem quebra de linha) fica para a próxima leitura. Uma assinatura do início
+    do arquivo e do trecho imediatamente anterior à posição distingue um acréscimo
+    (bytes já lidos intactos) de uma reescrita (exportação nova, arquivo truncado).
+    """
+
+    JANELA_ASSINATURA = 4096  # Bytes do início e do fim do trecho já lido usados na assinatura
+
+    def __init__(self, caminho, separador='\t'):
+        self.caminho = caminho
+        self.separador = separador
+        self.colunas = None
+        self.posicao = 0
+        self.assinatura = None
+
+    def _assinatura(self, posicao):
+        """Hash dos primeiros e dos últimos JANELA_ASSINATURA bytes antes de `posicao`"""
+        with open(self.caminho, 'rb') as f:
+            inicio = f.read(min(self.JANELA_ASSINATURA, posicao))
+            f.seek(max(0, posicao - self.JANELA_ASSINATURA))
+            fim = f.read(posicao - max(0, posicao - self.JANELA_ASSINATURA))
+        return hashlib.blake2b(inicio + b'|' + fim, digest_size=16).hexdigest()
+
+    def verificar(self):
+        """Mudança desde a última leitura: 'inalterado', 'acrescimo', 'reescrita' ou 'ausente'"""
+        try:
+            tamanho = os.path.getsize(self.caminho)
+        except OSError:
+            return 'ausente'
+        if self.assinatura is None or tamanho < self.posicao:
+            return 'reescrita'
+        if self._assinatura(self.posicao) != self.assinatura:
+            return 'reescrita'
+        return 'acrescimo' if tamanho > self.posicao else 'inalterado'
+
+    def _avancar(self, conteudo, cabecalho):
+        """Converte as linhas completas de `conteudo` e avança a posição até o fim delas"""
+        fim = conteudo.rfind(b'\n') + 1
+        if fim == 0:
+            return pd.DataFrame(columns=self.colunas) if self.colunas else None, 0
+
+        if cabecalho:
+            dados = pd.read_csv(io.BytesIO(conteudo[:fim]), sep=self.separador)
+            self.colunas = list(dados.columns)
+        else:
+            dados = pd.read_csv(io.BytesIO(conteudo[:fim]), sep=self.separador, header=None, names=self.colunas)
+        return dados, fim
+
+    def ler_tudo(self):
+        """Lê o arquivo inteiro (até a última linha completa) e reinicia a posição"""
+        with open(self.caminho, 'rb') as f:
+            conteudo = f.read()
+        dados, fim = self._avancar(conteudo, cabecalho=True)
+        if dados is None:
+            raise ValueError(f"Arquivo sem linhas completas: {self.caminho}")
+        self.posicao = fim
+        self.assinatura = self._assinatura(fim)
+        return dados
+
+    def ler_acrescimo(self):
+        """Linhas completas acrescentadas desde a última leitura (DataFrame vazio se não houver)"""
+        with open(self.caminho, 'rb') as f:
+            f.seek(self.posicao)
+            conteudo = f.read()
+        dados, fim = self._avancar(conteudo, cabecalho=False)
+        if fim > 0:
+            self.posicao += fim
+            self.assinatura = self._assinatura(self.posicao)
+        return dados
+
+
+class IngestaoIncremental:
+    """Barras de minuto e agregação diária em memória, atualizadas só no trecho novo do arquivo
+
+    O último dia já lido pode estar incompleto, então suas barras brutas são guardadas e
+    processadas de novo junto com as acrescentadas; os dias anteriores não são tocados.
+    Uma reescrita do arquivo, ou linhas novas com datas anteriores ao último dia, levam a
+    uma carga completa. O resultado é o mesmo de DataProcessor sobre o arquivo inteiro.
+
+    Como as barras de minuto ficam todas em memória, a carga completa é recusada quando o
+    arquivo exige o processamento particionado (PROCESSAMENTO_PARTICIONADO/MAX_FILE_SIZE_MB).
+    """
+
+    def __init__(self, config):
+        self.config = {**config, 'GRAVAR_ARQUIVOS': False}
+        self.leitor = LeitorIncremental(config['DATA_FILE'])
+        self.processador = DataProcessor(self.config)
+        self.brutos_ultimo_dia = None
+        self.dados_minuto = None
+        self.agregado = None
+        self.ticks_suspeitos = None
+
+    def _processar(self, brutos, desde=None):
+        """Processa e agrega as barras brutas, substituindo os dias a partir de `desde`"""
+        with contextlib.redirect_stdout(io.StringIO()) as saida:
+            processados = self.processador.processar_dados(brutos, salvar_relatorio=False)
+        if processados is None:
+            raise ValueError(f"Falha ao processar as barras recebidas: {saida.getvalue().strip()}")
+        agregado = self.processador.agregar_bruto(processados)
+        relatorio = self.processador.ticks_suspeitos
+
+        ultimo_dia = brutos['<DATE>'].iloc[-1]
+        self.brutos_ultimo_dia = brutos[brutos['<DATE>'] == ultimo_dia]
+        if desde is None:
+            self.dados_minuto = processados.reset_index(drop=True)
+            self.agregado = agregado
+            self.ticks_suspeitos = relatorio
+        else:
+            self.dados_minuto = pd.concat(
+                [self.dados_minuto[self.dados_minuto['data_clean'] < desde], processados], ignore_index=True
+            )
+            self.agregado = pd.concat([self.agregado[self.agregado.index < desde], agregado])
+            anteriores = pd.to_datetime(self.ticks_suspeitos['data'], format='%Y.%m.%d') < desde
+            self.ticks_suspeitos = pd.concat([self.ticks_suspeitos[anteriores], relatorio])
+
+    def verificar_tamanho(self):
+        """ValueError se DATA_FILE deve ser processado em partições (não cabe na leitura incremental)"""
+        if self.processador.processamento_particionado():
+            tamanho_mb = os.path.getsize(self.config['DATA_FILE']) / (1024 * 1024)
+            raise ValueError(
+                f"{self.config['DATA_FILE']} ({tamanho_mb:,.0f} MB) exige o processamento particionado "
+                f"(PROCESSAMENTO_PARTICIONADO = {self.config.get('PROCESSAMENTO_PARTICIONADO', 'auto')!r}, "
+                f"MAX_FILE_SIZE_MB = {self.config.get('MAX_FILE_SIZE_MB', 500)}), mas a leitura incremental "
+                f"mantém todas as barras de minuto em memória"
+            )
+
+    def carregar(self):
+        """Carga completa do arquivo"""
+        self.verificar_tamanho()
+        self._processar(self.leitor.ler_tudo())
+
+    def atualizar(self):
+        """Verifica o arquivo e incorpora a mudança; retorna 'inalterado', 'acrescimo', 'reescrita' ou 'ausente'"""
+        mudanca = self.leitor.verificar()
+        if mudanca == 'reescrita':
+            self.carregar()
+        elif mudanca == 'acrescimo':
+            novos = self.leitor.ler_acrescimo()
+            if len(novos) == 0:
+                return 'inalterado'
+            desde = pd.to_datetime(self.brutos_ultimo_dia['<DATE>'].iloc[0], format='%Y.%m.%d')
+            if pd.to_datetime(novos['<DATE>'], format='%Y.%m.%d').min() < desde:
+                self.carregar()
+                return 'reescrita'
+            self._processar(pd.concat([self.brutos_ultimo_dia, novos], ignore_index=True), desde)
+        return mudanca
+
+    def dados_diarios(self):
+        """Dados diários com as métricas derivadas (igual a DataProcessor.agregar_por_dia)"""
+        return self.processador.calcular_metricas_diarias(self.agregado.copy())
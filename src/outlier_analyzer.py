@@ -3,105 +3,274 @@ Outlier Analyzer Module
 Módulo responsável pela detecção e tratamento de outliers nos dados
 """
 
+import bisect
+import math
 import pandas as pd
 import numpy as np
-from scipy import stats
+from src.performance import medir_desempenho
+from src.table_store import gravacao_ativa, salvar_tabela
 
 class OutlierAnalyzer:
     """Classe para análise e tratamento de outliers"""
     
+    COLUNAS_PADRAO = ['amplitude', 'retorno_diario', 'volatilidade', 'volume_total']
+    METODOS = ['iqr', 'zscore', 'mad', 'percentil']
+    NOMES_METODOS = {
+        'iqr': 'IQR (Interquartile Range)',
+        'zscore': 'Z-Score',
+        'mad': 'MAD (Median Absolute Deviation)',
+        'percentil': 'Percentis extremos'
+    }
+    
+    METRICAS_IMPACTO = ['retorno_diario', 'volatilidade', 'amplitude', 'volume_total']
+    LIMITE_PERCENTUAL = 5.0  # Se > 5% são outliers, manter
+    LIMITE_IMPACTO = 10.0    # Se impacto > 10% nas métricas, manter
+    
     def __init__(self, config):
         self.config = config
         self.outliers_detectados = None
+        self.mascaras = None
     
-    def detectar_outliers_iqr(self, dados, colunas_analise=None):
-        """Detecta outliers usando método IQR (Interquartile Range)"""
-        if colunas_analise is None:
-            colunas_analise = ['amplitude', 'retorno_diario', 'volatilidade', 'volume_total']
+    def _min_periodos(self, janela):
+        """Mínimo de dias na janela para avaliar um dia (OUTLIER_JANELA_MIN, limitado à própria janela)"""
+        min_periodos = self.config.get('OUTLIER_JANELA_MIN') or max(janela // 2, 2)
+        if min_periodos > janela:
+            print(f"⚠️  OUTLIER_JANELA_MIN ({min_periodos}) maior que OUTLIER_JANELA ({janela}); usando {janela}")
+            min_periodos = janela
+        return min_periodos
+    
+    def _estatisticas_rolantes(self, dados_colunas, janela, quantis):
+        """Quantis, média e desvio em janela móvel (pandas usa skiplist: O(n log w) por quantil)"""
+        min_periodos = self._min_periodos(janela)
+        rolante = dados_colunas.rolling(janela, min_periods=min_periodos)
         
-        print(f"🔍 Detectando outliers usando método IQR (threshold: {self.config['OUTLIER_THRESHOLD']})")
+        resultado = [rolante.quantile(q).to_numpy(dtype=float) for q in quantis]
+        media = rolante.mean().to_numpy(dtype=float)
+        desvio = rolante.std(ddof=0).to_numpy(dtype=float)
+        return resultado, media, desvio, min_periodos
+    
+    @staticmethod
+    def _k_esimo_desvio(ordenados, corte, mediana, k):
+        """k-ésimo menor (base 0) de |x - mediana| sobre a janela ordenada, em O(log w)
+
+        Os desvios à esquerda de `corte` (mediana - x) e à direita (x - mediana) já formam
+        duas sequências crescentes; a busca binária escolhe quantos dos k + 1 menores vêm
+        da esquerda, sem montar nem ordenar os desvios.
+        """
+        n_direita = len(ordenados) - corte
         
-        outliers_indices = set()
-        outliers_por_coluna = {}
+        def esquerda(t):
+            return mediana - ordenados[corte - 1 - t]
+        
+        def direita(t):
+            return ordenados[corte + t] - mediana
         
+        baixo, alto = max(0, k + 1 - n_direita), min(k + 1, corte)
+        while baixo < alto:
+            i = (baixo + alto) // 2
+            if esquerda(i) < direita(k - i):
+                baixo = i + 1
+            else:
+                alto = i
+        # `baixo` desvios vêm da esquerda e k + 1 - baixo da direita; o k-ésimo é o maior deles
+        if baixo == 0:
+            return direita(k)
+        if baixo == k + 1:
+            return esquerda(k)
+        return max(esquerda(baixo - 1), direita(k - baixo))
+    
+    def _mad_rolante(self, valores, janela, min_periodos):
+        """MAD de cada janela móvel: mediana dos desvios em relação à mediana da própria janela
+
+        Cada coluna mantém a janela ordenada (bisect), atualizada com o valor que entra e o
+        que sai a cada linha; a mediana é lida da posição central e a mediana dos desvios
+        vem de _k_esimo_desvio, sem recalcular a janela inteira. Valores ausentes ficam fora
+        da janela e não contam para `min_periodos`.
+        """
+        n_linhas, n_colunas = valores.shape
+        mad = np.full((n_linhas, n_colunas), np.nan)
+        for j in range(n_colunas):
+            coluna = valores[:, j].tolist()
+            ordenados = []
+            for i, valor in enumerate(coluna):
+                if not math.isnan(valor):
+                    bisect.insort(ordenados, valor)
+                if i >= janela and not math.isnan(coluna[i - janela]):
+                    del ordenados[bisect.bisect_left(ordenados, coluna[i - janela])]
+                
+                contagem = len(ordenados)
+                if contagem == 0 or contagem < min_periodos:
+                    continue
+                meio = contagem // 2
+                if contagem % 2:
+                    mediana = ordenados[meio]
+                    corte = bisect.bisect_left(ordenados, mediana)
+                    mad[i, j] = self._k_esimo_desvio(ordenados, corte, mediana, meio)
+                else:
+                    mediana = (ordenados[meio - 1] + ordenados[meio]) / 2
+                    corte = bisect.bisect_left(ordenados, mediana)
+                    mad[i, j] = (self._k_esimo_desvio(ordenados, corte, mediana, meio - 1)
+                                 + self._k_esimo_desvio(ordenados, corte, mediana, meio)) / 2
+        return mad
+    
+    @medir_desempenho
+    def calcular_mascaras(self, dados, colunas_analise=None, metodos=None, threshold_zscore=None, janela=None):
+        """Calcula a matriz booleana de outliers (linhas × colunas × métodos) de forma vetorizada
+
+        Com `janela` (ou OUTLIER_JANELA), os limites são recalculados em janela móvel
+        dos últimos `janela` dias em vez de sobre todo o histórico.
+        """
+        if janela is None:
+            janela = self.config.get('OUTLIER_JANELA')
+        if colunas_analise is None:
+            colunas_analise = self.COLUNAS_PADRAO
+        if metodos is None:
+            metodos = self.METODOS
+        
+        colunas = []
         for coluna in colunas_analise:
             if coluna not in dados.columns:
                 print(f"⚠️  Coluna '{coluna}' não encontrada, ignorando...")
                 continue
-            
-            # Calcular quartis e IQR
-            Q1 = dados[coluna].quantile(0.25)
-            Q3 = dados[coluna].quantile(0.75)
-            IQR = Q3 - Q1
-            
-            # Definir limites
-            limite_inferior = Q1 - self.config['OUTLIER_THRESHOLD'] * IQR
-            limite_superior = Q3 + self.config['OUTLIER_THRESHOLD'] * IQR
-            
-            # Identificar outliers
-            outliers_coluna = dados[
-                (dados[coluna] < limite_inferior) | 
-                (dados[coluna] > limite_superior)
-            ].index
-            
+            colunas.append(coluna)
+        
+        valores = dados[colunas].to_numpy(dtype=float)
+        
+        p_inferior, p_superior = self.config.get('OUTLIER_PERCENTIS', (1, 99))
+        niveis_quantis = [0.25, 0.5, 0.75, p_inferior / 100, p_superior / 100]
+        
+        if janela:
+            # Limites locais: cada dia é comparado apenas com a janela que termina nele
+            quantis, media, desvio_padrao, min_periodos = self._estatisticas_rolantes(dados[colunas], janela, niveis_quantis)
+            q1, mediana, q3, limite_p_inferior, limite_p_superior = quantis
+        else:
+            # Todos os quantis de todas as colunas em uma única chamada
+            quantis = dados[colunas].quantile(niveis_quantis).to_numpy(dtype=float)
+            q1, mediana, q3, limite_p_inferior, limite_p_superior = quantis
+            media = np.nanmean(valores, axis=0)
+            desvio_padrao = np.nanstd(valores, axis=0)
+        
+        limites = {}
+        for metodo in metodos:
+            if metodo == 'iqr':
+                iqr = q3 - q1
+                limites[metodo] = (q1 - self.config['OUTLIER_THRESHOLD'] * iqr,
+                                   q3 + self.config['OUTLIER_THRESHOLD'] * iqr)
+            elif metodo == 'zscore':
+                if threshold_zscore is None:
+                    threshold_zscore = self.config.get('OUTLIER_ZSCORE_THRESHOLD', 3)
+                desvio = desvio_padrao * threshold_zscore
+                limites[metodo] = (media - desvio, media + desvio)
+            elif metodo == 'mad':
+                if janela:
+                    mad = self._mad_rolante(valores, janela, min_periodos) * 1.4826
+                else:
+                    mad = np.nanmedian(np.abs(valores - mediana), axis=0) * 1.4826
+                desvio = mad * self.config.get('OUTLIER_MAD_THRESHOLD', 3.5)
+                limites[metodo] = (mediana - desvio, mediana + desvio)
+            elif metodo == 'percentil':
+                limites[metodo] = (limite_p_inferior, limite_p_superior)
+            else:
+                raise ValueError(f"Método de outlier desconhecido: {metodo}")
+        
+        # Comparações com NaN resultam em False: linhas sem valor nunca são outliers
+        mascaras = np.stack([
+            (valores < limites[metodo][0]) | (valores > limites[metodo][1])
+            for metodo in metodos
+        ], axis=2)
+        
+        return mascaras, colunas, limites
+    
+    def _detectar(self, dados, colunas_analise, metodo, threshold_zscore=None):
+        """Detecta outliers por um método e registra o resumo por coluna"""
+        mascaras, colunas, limites = self.calcular_mascaras(dados, colunas_analise, [metodo], threshold_zscore)
+        mascara_colunas = mascaras[:, :, 0]
+        
+        outliers_por_coluna = {}
+        # Em janela móvel os limites variam por linha: registrar os da última janela
+        limite_inferior = np.asarray(limites[metodo][0])
+        limite_superior = np.asarray(limites[metodo][1])
+        if limite_inferior.ndim == 2:
+            limite_inferior, limite_superior = limite_inferior[-1], limite_superior[-1]
+        
+        for j, coluna in enumerate(colunas):
+            quantidade = int(mascara_colunas[:, j].sum())
             outliers_por_coluna[coluna] = {
-                'indices': list(outliers_coluna),
-                'quantidade': len(outliers_coluna),
-                'percentual': len(outliers_coluna) / len(dados) * 100,
-                'limite_inferior': limite_inferior,
-                'limite_superior': limite_superior
+                'quantidade': quantidade,
+                'percentual': quantidade / len(dados) * 100,
+                'limite_inferior': limite_inferior[j],
+                'limite_superior': limite_superior[j]
             }
-            
-            outliers_indices.update(outliers_coluna)
-            print(f"   • {coluna}: {len(outliers_coluna)} outliers ({len(outliers_coluna)/len(dados)*100:.1f}%)")
+            print(f"   • {coluna}: {quantidade} outliers ({quantidade/len(dados)*100:.1f}%)")
         
         self.outliers_detectados = outliers_por_coluna
-        return outliers_indices
+        self.mascaras = mascara_colunas
+        
+        # Máscara por linha: outlier em qualquer uma das colunas analisadas
+        return mascara_colunas.any(axis=1)
+    
+    def detectar_outliers_iqr(self, dados, colunas_analise=None):
+        """Detecta outliers usando método IQR (Interquartile Range)"""
+        print(f"🔍 Detectando outliers usando método IQR (threshold: {self.config['OUTLIER_THRESHOLD']})")
+        return self._detectar(dados, colunas_analise, 'iqr')
     
     def detectar_outliers_zscore(self, dados, colunas_analise=None, threshold=3):
         """Detecta outliers usando Z-Score"""
-        if colunas_analise is None:
-            colunas_analise = ['amplitude', 'retorno_diario', 'volatilidade', 'volume_total']
-        
         print(f"🔍 Detectando outliers usando Z-Score (threshold: {threshold})")
+        return self._detectar(dados, colunas_analise, 'zscore', threshold)
+    
+    def detectar_outliers(self, dados, colunas_analise=None):
+        """Detecta outliers pelo método configurado em OUTLIER_METHOD"""
+        metodo = self.config.get('OUTLIER_METHOD', 'iqr')
+        if metodo == 'iqr':
+            return self.detectar_outliers_iqr(dados, colunas_analise)
+        if metodo == 'zscore':
+            return self.detectar_outliers_zscore(dados, colunas_analise, self.config.get('OUTLIER_ZSCORE_THRESHOLD', 3))
         
-        outliers_indices = set()
+        print(f"🔍 Detectando outliers usando método {self.NOMES_METODOS[metodo]}")
+        return self._detectar(dados, colunas_analise, metodo)
+    
+    def _estatisticas_mascaradas(self, valores, mascara_outliers):
+        """Média e desvio (ddof=1) com e sem outliers a partir de somas, somas de quadrados e contagens"""
+        validos = ~np.isnan(valores)
         
-        for coluna in colunas_analise:
-            if coluna not in dados.columns:
-                continue
-                
-            # Calcular Z-scores
-            z_scores = np.abs(stats.zscore(dados[coluna].dropna()))
-            outliers_coluna = dados.iloc[np.where(z_scores > threshold)[0]].index
-            
-            outliers_indices.update(outliers_coluna)
-            print(f"   • {coluna}: {len(outliers_coluna)} outliers")
+        # Deslocar pelo primeiro valor válido de cada coluna para estabilidade numérica
+        primeiro_valido = validos.argmax(axis=0)
+        deslocamento = valores[primeiro_valido, np.arange(valores.shape[1])]
+        centrados = np.where(validos, valores - deslocamento, 0.0)
+        
+        # Pesos: linha 0 = todos os dados válidos, linha 1 = válidos sem outliers
+        pesos = np.stack([validos, validos & ~mascara_outliers[:, np.newaxis]]).astype(float)
+        contagens = pesos.sum(axis=1)
+        somas = np.einsum('knm,nm->km', pesos, centrados)
+        somas_quadrados = np.einsum('knm,nm->km', pesos, centrados * centrados)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            medias = deslocamento + somas / contagens
+            variancias = (somas_quadrados - somas * somas / contagens) / (contagens - 1)
+        desvios = np.sqrt(np.maximum(variancias, 0))
         
-        return outliers_indices
+        return medias, desvios
     
-    def analisar_impacto_remocao(self, dados_originais, outliers_indices):
+    @medir_desempenho
+    def analisar_impacto_remocao(self, dados_originais, mascara_outliers):
         """Analisa o impacto da remoção de outliers nas estatísticas"""
         print(f"\n🔬 ANÁLISE DE IMPACTO DA REMOÇÃO DE OUTLIERS")
         print("-" * 50)
         
-        dados_sem_outliers = dados_originais.drop(outliers_indices)
-        
         # Métricas para comparação
-        metricas = ['retorno_diario', 'volatilidade', 'amplitude', 'volume_total']
+        metricas = [metrica for metrica in self.METRICAS_IMPACTO if metrica in dados_originais.columns]
+        
+        medias, desvios = self._estatisticas_mascaradas(
+            dados_originais[metricas].to_numpy(dtype=float), mascara_outliers
+        )
         
         impactos = {}
         
-        for metrica in metricas:
-            if metrica not in dados_originais.columns:
-                continue
-                
+        for j, metrica in enumerate(metricas):
             # Estatísticas originais vs sem outliers
-            original_mean = dados_originais[metrica].mean()
-            original_std = dados_originais[metrica].std()
-            
-            sem_outliers_mean = dados_sem_outliers[metrica].mean()
-            sem_outliers_std = dados_sem_outliers[metrica].std()
+            original_mean, sem_outliers_mean = medias[:, j]
+            original_std, sem_outliers_std = desvios[:, j]
             
             # Calcular mudanças percentuais
             mudanca_media = abs(sem_outliers_mean - original_mean) / abs(original_mean) * 100 if original_mean != 0 else 0
@@ -122,52 +291,168 @@ class OutlierAnalyzer:
             print(f"   • Mudança na média: {mudanca_media:.2f}%")
             print(f"   • Mudança no desvio: {mudanca_std:.2f}%")
         
-        return impactos, dados_sem_outliers
+        return impactos
+    
+    def _decidir(self, outliers_pct, impactos):
+        """Aplica os critérios de decisão: (decisao, impacto_alto)"""
+        impacto_alto = any(
+            impactos[metrica]['mudanca_media'] > self.LIMITE_IMPACTO 
+            for metrica in impactos
+        )
+        
+        if outliers_pct <= self.LIMITE_PERCENTUAL and not impacto_alto:
+            return "REMOVER", impacto_alto
+        return "MANTER", impacto_alto
     
-    def decidir_remocao_outliers(self, dados_originais, outliers_indices):
+    @medir_desempenho
+    def decidir_remocao_outliers(self, dados_originais, mascara_outliers):
         """Decide se deve remover outliers baseado em critérios estatísticos"""
-        outliers_pct = len(outliers_indices) / len(dados_originais) * 100
+        total_outliers = int(mascara_outliers.sum())
+        outliers_pct = total_outliers / len(dados_originais) * 100
         
         print(f"\n📊 DECISÃO SOBRE REMOÇÃO DE OUTLIERS")
         print("-" * 50)
-        print(f"• Total de outliers: {len(outliers_indices)} ({outliers_pct:.1f}% dos dados)")
+        print(f"• Total de outliers: {total_outliers} ({outliers_pct:.1f}% dos dados)")
         
-        # Critérios para decisão
-        LIMITE_PERCENTUAL = 5.0  # Se > 5% são outliers, manter
-        LIMITE_IMPACTO = 10.0    # Se impacto > 10% nas métricas, manter
-        
-        # Analisar impacto
-        impactos, dados_sem_outliers = self.analisar_impacto_remocao(dados_originais, outliers_indices)
-        
-        # Verificar se alguma métrica tem impacto alto
-        impacto_alto = any(
-            impactos[metrica]['mudanca_media'] > LIMITE_IMPACTO 
-            for metrica in impactos
-        )
+        # Analisar impacto (sem materializar o dataset filtrado)
+        impactos = self.analisar_impacto_remocao(dados_originais, mascara_outliers)
+        decisao, impacto_alto = self._decidir(outliers_pct, impactos)
         
-        if outliers_pct <= LIMITE_PERCENTUAL and not impacto_alto:
-            decisao = "REMOVER"
-            dados_finais = dados_sem_outliers
+        if decisao == "REMOVER":
+            # Cópia filtrada criada apenas quando será efetivamente usada
+            dados_finais = dados_originais[~mascara_outliers]
             print(f"\n✅ DECISÃO: REMOVER outliers")
-            print(f"   • Percentual baixo ({outliers_pct:.1f}% < {LIMITE_PERCENTUAL}%)")
+            print(f"   • Percentual baixo ({outliers_pct:.1f}% < {self.LIMITE_PERCENTUAL}%)")
             print(f"   • Impacto estatístico aceitável")
         else:
-            decisao = "MANTER"
             dados_finais = dados_originais
             print(f"\n⚠️  DECISÃO: MANTER outliers")
-            if outliers_pct > LIMITE_PERCENTUAL:
-                print(f"   • Percentual alto ({outliers_pct:.1f}% > {LIMITE_PERCENTUAL}%)")
+            if outliers_pct > self.LIMITE_PERCENTUAL:
+                print(f"   • Percentual alto ({outliers_pct:.1f}% > {self.LIMITE_PERCENTUAL}%)")
             if impacto_alto:
                 print(f"   • Impacto estatístico significativo")
         
         return decisao, dados_finais
     
-    def salvar_analise_outliers(self, dados_finais, outliers_indices, decisao):
+    def _quartis_ordenados(self, ordenados, n_validos):
+        """Q1 e Q3 por interpolação linear sobre colunas já ordenadas (NaN ao final)"""
+        quartis = []
+        for q in [0.25, 0.75]:
+            h = (n_validos - 1) * q
+            inferior = np.floor(h).astype(int)
+            superior = np.ceil(h).astype(int)
+            colunas = np.arange(ordenados.shape[1])
+            v_inferior = ordenados[inferior, colunas]
+            v_superior = ordenados[superior, colunas]
+            quartis.append(v_inferior + (h - inferior) * (v_superior - v_inferior))
+        return quartis
+    
+    def varrer_thresholds(self, dados, thresholds, colunas_analise=None):
+        """Contagem, impacto e decisão para vários multiplicadores IQR com uma única ordenação
+
+        Reproduz apenas o método IQR com limites sobre todo o histórico; com OUTLIER_METHOD
+        diferente de 'iqr' ou com OUTLIER_JANELA a execução real removeria outros dias, e a
+        varredura recusa a configuração (ValueError).
+        """
+        metodo = self.config.get('OUTLIER_METHOD', 'iqr')
+        if metodo != 'iqr' or self.config.get('OUTLIER_JANELA'):
+            raise ValueError(
+                f"A varredura de thresholds só reproduz o método IQR sem janela móvel "
+                f"(OUTLIER_METHOD={metodo!r}, OUTLIER_JANELA={self.config.get('OUTLIER_JANELA')!r})"
+            )
+        
+        print(f"\n🎚️  VARREDURA DE OUTLIER_THRESHOLD: {list(thresholds)}")
+        print("-" * 50)
+        
+        if colunas_analise is None:
+            colunas_analise = self.COLUNAS_PADRAO
+        colunas = [coluna for coluna in colunas_analise if coluna in dados.columns]
+        metricas = [metrica for metrica in self.METRICAS_IMPACTO if metrica in dados.columns]
+        
+        valores = dados[colunas].to_numpy(dtype=float)
+        n_linhas = len(valores)
+        
+        # Quartis não dependem do threshold: uma ordenação por coluna
+        ordenados = np.sort(valores, axis=0)
+        q1, q3 = self._quartis_ordenados(ordenados, (~np.isnan(valores)).sum(axis=0))
+        iqr = q3 - q1
+        
+        # Multiplicador crítico de cada linha: outlier para todo threshold menor que ele
+        with np.errstate(invalid='ignore', divide='ignore'):
+            critico = np.fmax((q1 - valores) / iqr, (valores - q3) / iqr)
+        critico = np.where(np.isnan(critico), -np.inf, critico).max(axis=1)
+        
+        # Linhas ordenadas do maior para o menor crítico: os outliers de cada threshold são um prefixo
+        ordem = np.argsort(-critico, kind='mergesort')
+        criticos_crescentes = np.sort(critico)
+        thresholds = np.asarray(thresholds, dtype=float)
+        n_outliers = n_linhas - np.searchsorted(criticos_crescentes, thresholds, side='right')
+        
+        # Somas acumuladas das métricas na ordem dos críticos (deslocadas para estabilidade)
+        metricas_valores = dados[metricas].to_numpy(dtype=float)[ordem]
+        validos = ~np.isnan(metricas_valores)
+        deslocamento = metricas_valores[validos.argmax(axis=0), np.arange(len(metricas))]
+        centrados = np.where(validos, metricas_valores - deslocamento, 0.0)
+        
+        zero = np.zeros((1, len(metricas)))
+        contagens_acum = np.vstack([zero, np.cumsum(validos, axis=0)])
+        somas_acum = np.vstack([zero, np.cumsum(centrados, axis=0)])
+        quadrados_acum = np.vstack([zero, np.cumsum(centrados * centrados, axis=0)])
+        
+        def media_desvio(contagem, soma, quadrados):
+            with np.errstate(invalid='ignore', divide='ignore'):
+                media = deslocamento + soma / contagem
+                variancia = (quadrados - soma * soma / contagem) / (contagem - 1)
+            return media, np.sqrt(np.maximum(variancia, 0))
+        
+        media_original, desvio_original = media_desvio(contagens_acum[-1], somas_acum[-1], quadrados_acum[-1])
+        
+        linhas = []
+        for threshold, k in zip(thresholds, n_outliers):
+            media, desvio = media_desvio(
+                contagens_acum[-1] - contagens_acum[k],
+                somas_acum[-1] - somas_acum[k],
+                quadrados_acum[-1] - quadrados_acum[k]
+            )
+            
+            outliers_pct = k / n_linhas * 100
+            linha = {'threshold': threshold, 'n_outliers': int(k), 'percentual': outliers_pct}
+            impactos = {}
+            for j, metrica in enumerate(metricas):
+                mudanca_media = abs(media[j] - media_original[j]) / abs(media_original[j]) * 100 if media_original[j] != 0 else 0
+                mudanca_std = abs(desvio[j] - desvio_original[j]) / abs(desvio_original[j]) * 100 if desvio_original[j] != 0 else 0
+                impactos[metrica] = {'mudanca_media': mudanca_media}
+                linha[f'mudanca_media_{metrica}'] = mudanca_media
+                linha[f'mudanca_std_{metrica}'] = mudanca_std
+            
+            linha['decisao'] = self._decidir(outliers_pct, impactos)[0] if k > 0 else "NENHUM"
+            linhas.append(linha)
+        
+        resultado = pd.DataFrame(linhas)
+        
+        for _, linha in resultado.iterrows():
+            print(f"   • {linha['threshold']:.2f}: {linha['n_outliers']} outliers "
+                  f"({linha['percentual']:.1f}%) -> {linha['decisao']}")
+        
+        return resultado
+    
+    def _descricao_threshold(self, metodo):
+        """Parâmetro de corte efetivamente usado pelo método (para o relatório)"""
+        if metodo == 'iqr':
+            return f"{self.config['OUTLIER_THRESHOLD']} × IQR"
+        if metodo == 'zscore':
+            return f"{self.config.get('OUTLIER_ZSCORE_THRESHOLD', 3)} desvios-padrão"
+        if metodo == 'mad':
+            return f"{self.config.get('OUTLIER_MAD_THRESHOLD', 3.5)} × MAD"
+        p_inferior, p_superior = self.config.get('OUTLIER_PERCENTIS', (1, 99))
+        return f"abaixo do percentil {p_inferior} ou acima do percentil {p_superior}"
+    
+    @medir_desempenho
+    def salvar_analise_outliers(self, dados_finais, mascara_outliers, decisao):
         """Salva os resultados da análise de outliers"""
         try:
             # Salvar dados finais
-            caminho_dados = f"{self.config['PROCESSED_DIR']}/dados_sem_outliers.csv"
-            dados_finais.to_csv(caminho_dados)
+            salvar_tabela(dados_finais, self.config, 'dados_sem_outliers')
             
             # Salvar relatório de outliers
             caminho_relatorio = f"{self.config['OUTPUT_DIR']}/reports/analise_outliers.txt"
@@ -176,9 +461,12 @@ class OutlierAnalyzer:
                 f.write("RELATÓRIO DE ANÁLISE DE OUTLIERS\n")
                 f.write("=" * 50 + "\n\n")
                 
-                f.write(f"Método utilizado: IQR (Interquartile Range)\n")
-                f.write(f"Threshold: {self.config['OUTLIER_THRESHOLD']}\n")
-                f.write(f"Total de outliers detectados: {len(outliers_indices)}\n")
+                metodo = self.config.get('OUTLIER_METHOD', 'iqr')
+                f.write(f"Método utilizado: {self.NOMES_METODOS[metodo]}\n")
+                f.write(f"Threshold: {self._descricao_threshold(metodo)}\n")
+                if self.config.get('OUTLIER_JANELA'):
+                    f.write(f"Janela móvel: {self.config['OUTLIER_JANELA']} dias (limites da última janela)\n")
+                f.write(f"Total de outliers detectados: {int(mascara_outliers.sum())}\n")
                 f.write(f"Decisão: {decisao}\n\n")
                 
                 if self.outliers_detectados:
@@ -198,6 +486,7 @@ class OutlierAnalyzer:
             print(f"❌ Erro ao salvar análise de outliers: {e}")
             return False
     
+    @medir_desempenho
     def analisar_outliers(self, dados_diarios):
         """Método principal para análise completa de outliers"""
         print("\n🔍 INICIANDO ANÁLISE DE OUTLIERS")
@@ -207,18 +496,19 @@ class OutlierAnalyzer:
             print("❌ Dados diários não disponíveis para análise de outliers")
             return dados_diarios
         
-        # 1. Detectar outliers
-        outliers_indices = self.detectar_outliers_iqr(dados_diarios)
+        # 1. Detectar outliers (máscara booleana por linha)
+        mascara_outliers = self.detectar_outliers(dados_diarios)
         
-        if len(outliers_indices) == 0:
+        if not mascara_outliers.any():
             print("✅ Nenhum outlier detectado")
             return dados_diarios
         
         # 2. Analisar impacto e decidir
-        decisao, dados_finais = self.decidir_remocao_outliers(dados_diarios, outliers_indices)
+        decisao, dados_finais = self.decidir_remocao_outliers(dados_diarios, mascara_outliers)
         
         # 3. Salvar resultados
-        self.salvar_analise_outliers(dados_finais, outliers_indices, decisao)
+        if gravacao_ativa(self.config):
+            self.salvar_analise_outliers(dados_finais, mascara_outliers, decisao)
         
         print(f"\n✅ Análise de outliers concluída!")
         print(f"📊 Dados finais: {len(dados_finais)} registros")
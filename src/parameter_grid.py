@@ -0,0 +1,231 @@
+"""
+Parameter Grid Module
+Módulo responsável pela execução da análise para uma grade de parâmetros em paralelo
+"""
+
+import contextlib
+import io
+import itertools
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Dados diários do processo atual (no worker, visões somente leitura sobre a memória compartilhada)
+_DADOS = None
+_MEMORIA = None
+
+# Parâmetros aceitos na grade
+PARAMETROS_GRADE = ('GAP_MINIMO', 'DIAS_LIMITE_GAP', 'OUTLIER_THRESHOLD')
+
+
+def _publicar(dados):
+    """Copia índice e colunas numéricas para memória compartilhada; retorna o bloco e o descritor"""
+    numericas = list(dados.select_dtypes(include='number').columns)
+    outras = [coluna for coluna in dados.columns if coluna not in numericas]
+    n = len(dados)
+
+    indice = dados.index.values
+    memoria = shared_memory.SharedMemory(create=True, size=max(indice.nbytes + n * len(numericas) * 8, 1))
+    np.ndarray(indice.shape, dtype=indice.dtype, buffer=memoria.buf)[:] = indice
+    np.ndarray((n, len(numericas)), dtype=np.float64, buffer=memoria.buf, offset=indice.nbytes)[:] = (
+        dados[numericas].to_numpy(dtype=np.float64)
+    )
+
+    descritor = {
+        'nome': memoria.name,
+        'n': n,
+        'dtype_indice': indice.dtype.str,
+        'nome_indice': dados.index.name,
+        'numericas': numericas,
+        'outras': {coluna: (dados.columns.get_loc(coluna), dados[coluna].to_numpy()) for coluna in outras}
+    }
+    return memoria, descritor
+
+
+def _anexar(descritor):
+    """Reconstrói o DataFrame sobre a memória compartilhada sem copiar as colunas numéricas"""
+    global _DADOS, _MEMORIA
+    _MEMORIA = shared_memory.SharedMemory(name=descritor['nome'])
+    n = descritor['n']
+
+    indice = np.ndarray((n,), dtype=np.dtype(descritor['dtype_indice']), buffer=_MEMORIA.buf)
+    valores = np.ndarray((n, len(descritor['numericas'])), dtype=np.float64, buffer=_MEMORIA.buf,
+                         offset=indice.nbytes)
+    indice.flags.writeable = False
+    valores.flags.writeable = False
+
+    dados = pd.DataFrame(valores, index=pd.DatetimeIndex(indice, name=descritor['nome_indice']),
+                         columns=descritor['numericas'], copy=False)
+    for coluna, (posicao, valores_coluna) in descritor['outras'].items():
+        dados.insert(posicao, coluna, valores_coluna)
+    _DADOS = dados
+
+
+def _resumir(parametros, dados_sem_outliers, gaps, dados_finais, metricas, tempo):
+    """Linha da tabela de comparação para um ponto da grade"""
+    linha = {**parametros, 'dias_sem_outliers': len(dados_sem_outliers)}
+    if gaps is None or len(gaps) == 0:
+        return {**linha, 'gaps': 0, 'dias_finais': len(dados_finais), 'tempo_s': round(tempo, 3)}
+
+    fechados = gaps['gap_fechado'].astype(bool)
+    linha.update({
+        'gaps': len(gaps),
+        'gaps_up': int((gaps['tipo_gap'] == 'Gap Up').sum()),
+        'taxa_fechamento_pct': round(fechados.mean() * 100, 2),
+        'dias_medios_fechamento': round(gaps.loc[fechados, 'dias_para_fechamento'].mean(), 2),
+        'dias_finais': len(dados_finais),
+        'classes': len(metricas) if metricas is not None else 0,
+        'intervalos': ' | '.join(metricas['intervalo'].astype(str)) if metricas is not None else '',
+        'tempo_s': round(tempo, 3)
+    })
+    return linha
+
+
+def _executar_ponto(parametros, config, graficos):
+    """Outliers, gaps e classificação para um ponto da grade, com a saída de console suprimida"""
+    from src.outlier_analyzer import OutlierAnalyzer
+    from src.gap_analyzer import GapAnalyzer
+    from src.gap_classification_analyzer import GapClassificationAnalyzer
+
+    for pasta in (config['PROCESSED_DIR'], f"{config['OUTPUT_DIR']}/graphs", f"{config['OUTPUT_DIR']}/reports"):
+        os.makedirs(pasta, exist_ok=True)
+
+    saida = io.StringIO()
+    inicio = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(saida):
+            dados_sem_outliers = OutlierAnalyzer(config).analisar_outliers(_DADOS)
+            gaps, dados_finais = GapAnalyzer(config).analisar_gaps(dados_sem_outliers)
+            metricas = None
+            if gaps is not None:
+                _, metricas = GapClassificationAnalyzer(config).executar_analise_completa(gaps)
+            if graficos:
+                from src.visualizer import Visualizer
+                Visualizer(config).gerar_todos_graficos(_DADOS, gaps, dados_finais)
+    except Exception as e:
+        return {**parametros, 'erro': f"{type(e).__name__}: {e}"}
+
+    return _resumir(parametros, dados_sem_outliers, gaps, dados_finais, metricas, time.perf_counter() - inicio)
+
+
+class ExecutorGrade:
+    """Executa outliers, gaps e classificação para todas as combinações de uma grade de parâmetros
+
+    Os dados são carregados e agregados uma única vez (reaproveitando o cache da etapa de
+    ingestão) e publicados em memória compartilhada; cada processo do pool anexa o bloco
+    uma vez e executa os pontos da grade sobre ele. Gráficos só são gerados com
+    `graficos=True`. Com SAVE_INTERMEDIATE=False os CSVs de cada ponto vão para uma pasta
+    temporária descartada ao final; a tabela de comparação é sempre salva em
+    OUTPUT_DIR/reports/comparacao_grade.csv.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.resultados = None
+
+    def _pontos(self, grade):
+        """Combinações da grade; parâmetros ausentes usam o valor de CONFIG"""
+        desconhecidos = [nome for nome in grade if nome not in PARAMETROS_GRADE]
+        if desconhecidos:
+            raise ValueError(f"Parâmetros fora da grade suportada {PARAMETROS_GRADE}: {desconhecidos}")
+
+        valores = [list(grade.get(nome, [self.config[nome]])) for nome in PARAMETROS_GRADE]
+        return [dict(zip(PARAMETROS_GRADE, combinacao)) for combinacao in itertools.product(*valores)]
+
+    def _config_ponto(self, i, parametros, pasta_dados, pasta_saida, graficos):
+        """Configuração de um ponto: parâmetros da grade e pastas próprias"""
+        nome = f"ponto_{i:03d}"
+        return {
+            **self.config, **parametros,
+            'PROCESSED_DIR': f"{pasta_dados}/{nome}",
+            'OUTPUT_DIR': f"{pasta_saida}/{nome}",
+            'GERAR_GRAFICOS': graficos,
+            'GRAFICOS_PROCESSOS': 1,
+            'GRAFICOS_SEGUNDO_PLANO': False,
+            'PULAR_SAIDAS_INALTERADAS': False,
+            'LOG_PERFORMANCE': False,
+            'DEBUG_MODE': False
+        }
+
+    def _carregar_dados(self):
+        """Dados diários via etapa de ingestão do pipeline (com cache)"""
+        from src.pipeline import ExecutorPipeline, etapas_padrao
+
+        ingestao = [etapa for etapa in etapas_padrao() if etapa.nome == 'ingestao']
+        executor = ExecutorPipeline(self.config, ingestao)
+        resultados = executor.executar()
+        executor.finalizar()
+        return resultados['ingestao']
+
+    def _n_processos(self, n_pontos):
+        """Número de processos: GRADE_PROCESSOS ou os núcleos disponíveis"""
+        n_processos = self.config.get('GRADE_PROCESSOS') or os.cpu_count() or 1
+        return max(1, min(n_processos, n_pontos))
+
+    def executar(self, grade, graficos=False):
+        """Executa todos os pontos da grade e retorna a tabela de comparação"""
+        global _DADOS
+        print("\n🧮 EXECUTANDO GRADE DE PARÂMETROS")
+        print("=" * 50)
+
+        pontos = self._pontos(grade)
+        dados_diarios = self._carregar_dados()
+        n_processos = self._n_processos(len(pontos))
+        print(f"\n📐 {len(pontos)} combinações de {', '.join(PARAMETROS_GRADE)} em {n_processos} processo(s)")
+
+        pasta_grade = f"{self.config['OUTPUT_DIR']}/grade"
+        temporaria = None
+        if self.config.get('SAVE_INTERMEDIATE', True):
+            pasta_dados = pasta_grade
+        else:
+            temporaria = tempfile.TemporaryDirectory(prefix='grade_')
+            pasta_dados = temporaria.name
+        pasta_saida = pasta_grade if graficos else pasta_dados
+
+        configs = [self._config_ponto(i, p, pasta_dados, pasta_saida, graficos) for i, p in enumerate(pontos)]
+
+        inicio = time.perf_counter()
+        try:
+            if n_processos == 1:
+                _DADOS = dados_diarios
+                linhas = [_executar_ponto(p, c, graficos) for p, c in zip(pontos, configs)]
+            else:
+                memoria, descritor = _publicar(dados_diarios)
+                try:
+                    with ProcessPoolExecutor(max_workers=n_processos, initializer=_anexar,
+                                             initargs=(descritor,)) as executor:
+                        linhas = list(executor.map(_executar_ponto, pontos, configs, [graficos] * len(pontos)))
+                finally:
+                    memoria.close()
+                    memoria.unlink()
+        finally:
+            _DADOS = None
+            if temporaria is not None:
+                temporaria.cleanup()
+        tempo_total = time.perf_counter() - inicio
+
+        self.resultados = pd.DataFrame(linhas)
+        os.makedirs(f"{self.config['OUTPUT_DIR']}/reports", exist_ok=True)
+        caminho = f"{self.config['OUTPUT_DIR']}/reports/comparacao_grade.csv"
+        self.resultados.to_csv(caminho, index=False)
+
+        self._exibir_comparacao()
+        print(f"\n✅ Grade concluída em {tempo_total:.1f}s")
+        print(f"💾 Comparação salva em: {caminho}")
+        return self.resultados
+
+    def _exibir_comparacao(self):
+        """Exibe a tabela de comparação (sem a coluna de intervalos, que fica no CSV)"""
+        print(f"\n📋 COMPARAÇÃO ENTRE OS PONTOS DA GRADE")
+        print("-" * 50)
+        colunas = [coluna for coluna in self.resultados.columns if coluna != 'intervalos']
+        print(self.resultados[colunas].to_string(index=False))
+
+        if 'erro' in self.resultados.columns:
+            for _, linha in self.resultados[self.resultados['erro'].notna()].iterrows():
+                print(f"❌ {dict(linha[list(PARAMETROS_GRADE)])}: {linha['erro']}")
@@ -0,0 +1,161 @@
+"""
+Performance Module
+Módulo de instrumentação das etapas: tempo, CPU, memória e linhas processadas (LOG_PERFORMANCE/DEBUG_MODE)
+"""
+
+import contextlib
+import functools
+import json
+import os
+import time
+import tracemalloc
+from datetime import datetime
+
+# Medições abertas no processo atual (para o nível de aninhamento e o pico de memória dos pais)
+_PILHA = []
+
+
+def desempenho_ativo(config):
+    """Instrumentação ligada por LOG_PERFORMANCE ou DEBUG_MODE"""
+    return bool(config.get('LOG_PERFORMANCE', False) or config.get('DEBUG_MODE', False))
+
+
+def caminho_registro(config):
+    """Arquivo JSON-lines com uma linha por chamada medida"""
+    return f"{config['OUTPUT_DIR']}/reports/desempenho.jsonl"
+
+
+def _linhas(objeto):
+    """Linhas de DataFrames, Series e arrays (somadas em tuplas e listas); None para outros objetos"""
+    if isinstance(objeto, (tuple, list)):
+        contagens = [n for n in (_linhas(item) for item in objeto) if n is not None]
+        return sum(contagens) if contagens else None
+    if hasattr(objeto, 'shape') and getattr(objeto, 'ndim', 0) >= 1:
+        return int(objeto.shape[0])
+    return None
+
+
+def _gravar(config, registro):
+    """Acrescenta o registro ao arquivo (processos de renderização gravam no mesmo arquivo)"""
+    caminho = caminho_registro(config)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+
+@contextlib.contextmanager
+def medicao(config, nome, entradas=None):
+    """Mede o bloco e grava o registro; o chamador pode informar a saída em `medida['saida']`"""
+    medida = {'saida': None}
+    if not desempenho_ativo(config):
+        yield medida
+        return
+
+    # tracemalloc deixa o código medido bem mais lento: PERFIL_MEMORIA=False mede só tempos e linhas;
+    # o rastreamento é parado ao sair da medição que o iniciou (a mais externa), não fica ligado no processo
+    perfil_memoria = config.get('PERFIL_MEMORIA', True)
+    iniciou_rastreamento = perfil_memoria and not tracemalloc.is_tracing()
+    if iniciou_rastreamento:
+        tracemalloc.start()
+
+    # O pico do pai até aqui é preservado antes de zerar o pico para este bloco
+    memoria_inicial, pico = tracemalloc.get_traced_memory()
+    if _PILHA:
+        _PILHA[-1]['pico'] = max(_PILHA[-1]['pico'], pico)
+    tracemalloc.reset_peak()
+
+    quadro = {'pico': memoria_inicial}
+    _PILHA.append(quadro)
+    inicio_data = datetime.now().isoformat(timespec='microseconds')
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield medida
+    finally:
+        tempo, tempo_cpu = time.perf_counter() - inicio, time.process_time() - inicio_cpu
+        pico = max(quadro['pico'], tracemalloc.get_traced_memory()[1])
+        _PILHA.pop()
+        if _PILHA:
+            _PILHA[-1]['pico'] = max(_PILHA[-1]['pico'], pico)
+        if iniciou_rastreamento:
+            tracemalloc.stop()
+
+        _gravar(config, {
+            'funcao': nome,
+            'nivel': len(_PILHA),
+            'pid': os.getpid(),
+            'inicio': inicio_data,
+            'tempo_s': round(tempo, 6),
+            'cpu_s': round(tempo_cpu, 6),
+            'memoria_pico_mb': round((pico - memoria_inicial) / 1024 ** 2, 3) if perfil_memoria else None,
+            'linhas_entrada': _linhas(entradas),
+            'linhas_saida': _linhas(medida['saida'])
+        })
+
+
+def medir_desempenho(metodo):
+    """Decorador para métodos de classes com `self.config`: registra cada chamada quando ativo"""
+    @functools.wraps(metodo)
+    def envoltorio(self, *args, **kwargs):
+        if not desempenho_ativo(self.config):
+            return metodo(self, *args, **kwargs)
+        with medicao(self.config, metodo.__qualname__, args) as medida:
+            medida['saida'] = metodo(self, *args, **kwargs)
+        return medida['saida']
+    return envoltorio
+
+
+def iniciar_registro(config):
+    """Descarta o registro da execução anterior"""
+    if desempenho_ativo(config) and os.path.exists(caminho_registro(config)):
+        os.remove(caminho_registro(config))
+
+
+def resumo_desempenho(config):
+    """Exibe e salva a tabela de desempenho agregada por função (na ordem da primeira chamada)"""
+    if not desempenho_ativo(config) or not os.path.exists(caminho_registro(config)):
+        return None
+
+    funcoes = {}
+    with open(caminho_registro(config), encoding='utf-8') as f:
+        for linha in f:
+            registro = json.loads(linha)
+            item = funcoes.setdefault(registro['funcao'], {
+                'nivel': registro['nivel'], 'inicio': registro['inicio'], 'chamadas': 0, 'tempo_s': 0.0,
+                'cpu_s': 0.0, 'memoria_pico_mb': None, 'linhas_entrada': None, 'linhas_saida': None
+            })
+            item['nivel'] = min(item['nivel'], registro['nivel'])
+            item['inicio'] = min(item['inicio'], registro['inicio'])
+            item['chamadas'] += 1
+            item['tempo_s'] += registro['tempo_s']
+            item['cpu_s'] += registro['cpu_s']
+            for campo in ('linhas_entrada', 'linhas_saida'):
+                if registro[campo] is not None:
+                    item[campo] = (item[campo] or 0) + registro[campo]
+            if registro['memoria_pico_mb'] is not None:
+                item['memoria_pico_mb'] = max(item['memoria_pico_mb'] or 0.0, registro['memoria_pico_mb'])
+
+    def formatar(valor, formato=','):
+        return '-' if valor is None else f"{valor:{formato}}"
+
+    linhas = [
+        f"{'Função':<66} {'Chamadas':>8} {'Tempo (s)':>10} {'CPU (s)':>9} {'Memória (MB)':>13} "
+        f"{'Linhas entrada':>15} {'Linhas saída':>13}",
+        "-" * 140
+    ]
+    for nome, item in sorted(funcoes.items(), key=lambda par: (par[1]['inicio'], par[1]['nivel'])):
+        linhas.append(
+            f"{'  ' * item['nivel'] + nome:<66} {item['chamadas']:>8} {item['tempo_s']:>10.3f} {item['cpu_s']:>9.3f} "
+            f"{formatar(item['memoria_pico_mb'], ',.1f'):>13} {formatar(item['linhas_entrada']):>15} {formatar(item['linhas_saida']):>13}"
+        )
+
+    print(f"\n⏱️  DESEMPENHO POR ETAPA")
+    print("=" * 50)
+    for linha in linhas:
+        print(linha)
+
+    caminho_resumo = f"{config['OUTPUT_DIR']}/reports/desempenho_resumo.txt"
+    with open(caminho_resumo, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(linhas) + '\n')
+    print(f"\n💾 Registro detalhado: {caminho_registro(config)}")
+    print(f"💾 Resumo salvo em: {caminho_resumo}")
+    return funcoes
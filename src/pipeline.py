@@ -0,0 +1,336 @@
+"""
+Pipeline Module
+Módulo com o executor das etapas da análise como grafo de dependências com cache por conteúdo
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import pickle
+import shutil
+import sys
+import time
+
+from src.content_cache import hash_conteudo, hash_modulos
+from src.performance import medicao
+from src.table_store import modelos_tabela
+
+
+class Etapa:
+    """Etapa do pipeline: função, etapas de entrada, chaves de configuração lidas e arquivos gerados
+
+    `funcao(contexto, *entradas)` recebe o contexto compartilhado (config e objetos
+    auxiliares) e os resultados das etapas listadas em `entradas`. Com `cache=False`
+    a etapa sempre executa (gráficos e relatório têm seu próprio controle de saídas).
+    """
+
+    def __init__(self, nome, titulo, funcao, entradas=(), chaves_config=(), modulos=(),
+                 arquivos=(), arquivos_entrada=(), cache=True):
+        self.nome = nome
+        self.titulo = titulo
+        self.funcao = funcao
+        self.entradas = tuple(entradas)
+        self.chaves_config = tuple(chaves_config)
+        self.modulos = tuple(modulos)
+        self.arquivos = tuple(arquivos)
+        self.arquivos_entrada = tuple(arquivos_entrada)
+        self.cache = cache
+
+
+def ordenar_etapas(etapas):
+    """Ordem topológica das etapas (erro se houver ciclo ou entrada desconhecida)"""
+    por_nome = {etapa.nome: etapa for etapa in etapas}
+    for etapa in etapas:
+        desconhecidas = [entrada for entrada in etapa.entradas if entrada not in por_nome]
+        if desconhecidas:
+            raise ValueError(f"Etapa '{etapa.nome}' depende de etapas inexistentes: {desconhecidas}")
+
+    ordem, visitadas, em_visita = [], set(), set()
+
+    def visitar(etapa):
+        if etapa.nome in visitadas:
+            return
+        if etapa.nome in em_visita:
+            raise ValueError(f"Ciclo de dependências envolvendo a etapa '{etapa.nome}'")
+        em_visita.add(etapa.nome)
+        for entrada in etapa.entradas:
+            visitar(por_nome[entrada])
+        em_visita.discard(etapa.nome)
+        visitadas.add(etapa.nome)
+        ordem.append(etapa)
+
+    for etapa in etapas:
+        visitar(etapa)
+    return ordem
+
+
+class ExecutorPipeline:
+    """Executa as etapas em ordem topológica reaproveitando resultados em cache
+
+    A chave de cada etapa combina o hash do conteúdo dos resultados de entrada
+    (ou dos arquivos de entrada), os valores das chaves de configuração que ela
+    lê e o código-fonte dos seus módulos. Em um acerto, o resultado é carregado
+    de PROCESSED_DIR/.cache e os arquivos gerados pela etapa são restaurados;
+    como as chaves usam o conteúdo das saídas, uma etapa reexecutada que produz
+    o mesmo resultado não invalida as seguintes.
+    """
+
+    ENTRADAS_POR_ETAPA = 3
+
+    def __init__(self, config, etapas):
+        self.config = config
+        self.etapas = ordenar_etapas(etapas)
+        self.pasta_cache = f"{config['PROCESSED_DIR']}/.cache"
+        self.usar_cache = config.get('CACHE_ETAPAS', True)
+        self.contexto = {'config': config, 'pendentes': []}
+        self.resultados = {}
+        self.hashes_saida = {}
+        self.arquivos_para_guardar = []
+        self.executadas = []
+        self.reaproveitadas = []
+        self.tempos_importacao = {}
+
+    def _importar_modulos(self, etapa):
+        """Importa os módulos da etapa somente quando ela é alcançada, registrando o tempo de cada um"""
+        for nome in etapa.modulos:
+            if nome in sys.modules:
+                continue
+            inicio = time.perf_counter()
+            importlib.import_module(nome)
+            self.tempos_importacao[nome] = time.perf_counter() - inicio
+            print(f"📦 {nome} importado em {self.tempos_importacao[nome]:.2f}s")
+
+    def _hash_arquivo(self, caminho):
+        """Hash do conteúdo de um arquivo, reaproveitado enquanto tamanho e data de modificação não mudam"""
+        caminho_indice = f"{self.pasta_cache}/arquivos.json"
+        try:
+            with open(caminho_indice, encoding='utf-8') as f:
+                indice = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            indice = {}
+
+        estado = os.stat(caminho)
+        assinatura = [estado.st_size, estado.st_mtime_ns]
+        registro = indice.get(os.path.abspath(caminho))
+        if registro and registro['assinatura'] == assinatura:
+            return registro['hash']
+
+        h = hashlib.blake2b(digest_size=16)
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(8 * 1024 * 1024), b''):
+                h.update(bloco)
+
+        indice[os.path.abspath(caminho)] = {'assinatura': assinatura, 'hash': h.hexdigest()}
+        os.makedirs(self.pasta_cache, exist_ok=True)
+        with open(caminho_indice, 'w', encoding='utf-8') as f:
+            json.dump(indice, f)
+        return h.hexdigest()
+
+    def _chave(self, etapa):
+        """Chave de cache da etapa a partir das entradas, configuração e código (com os src.* importados)"""
+        arquivos = [self._hash_arquivo(self.config[chave]) for chave in etapa.arquivos_entrada]
+        entradas = [self.hashes_saida[nome] for nome in etapa.entradas]
+        return hash_conteudo(
+            etapa.nome, hash_modulos(etapa.modulos), arquivos, entradas,
+            config=self.config, chaves=etapa.chaves_config
+        )
+
+    def _caminhos_arquivos(self, etapa):
+        """Arquivos gerados pela etapa (modelos com {PROCESSED_DIR}/{OUTPUT_DIR} resolvidos)"""
+        return [modelo.format(**self.config) for modelo in etapa.arquivos]
+
+    def _carregar(self, etapa, chave):
+        """Carrega resultado e restaura arquivos de uma entrada de cache (None se ausente)"""
+        pasta = f"{self.pasta_cache}/{etapa.nome}_{chave}"
+        try:
+            with open(f"{pasta}/meta.json", encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(f"{pasta}/resultado.pkl", 'rb') as f:
+                resultado = pickle.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, pickle.UnpicklingError, EOFError):
+            return None
+
+        # PROCESSED_DIR fica igual ao da execução guardada (sem variantes de formato de outra configuração)
+        pasta_dados = os.path.abspath(self.config['PROCESSED_DIR'])
+        for i, caminho in enumerate(self._caminhos_arquivos(etapa)):
+            copia = f"{pasta}/arquivo_{i}"
+            if os.path.exists(copia):
+                os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+                shutil.copy2(copia, caminho)
+            elif os.path.dirname(os.path.abspath(caminho)) == pasta_dados and os.path.exists(caminho):
+                os.remove(caminho)
+
+        os.utime(pasta)
+        return resultado, meta['hash_saida']
+
+    def _guardar(self, etapa, chave, resultado, hash_saida):
+        """Grava resultado e metadados da etapa; os arquivos são copiados em `finalizar`"""
+        pasta = f"{self.pasta_cache}/{etapa.nome}_{chave}"
+        os.makedirs(pasta, exist_ok=True)
+        with open(f"{pasta}/resultado.pkl", 'wb') as f:
+            pickle.dump(resultado, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(f"{pasta}/meta.json", 'w', encoding='utf-8') as f:
+            json.dump({'etapa': etapa.nome, 'hash_saida': hash_saida}, f)
+
+        self.arquivos_para_guardar.append((pasta, self._caminhos_arquivos(etapa)))
+        self._limpar_antigas(etapa)
+
+    def _limpar_antigas(self, etapa):
+        """Mantém apenas as ENTRADAS_POR_ETAPA entradas usadas mais recentemente da etapa"""
+        prefixo = f"{etapa.nome}_"
+        pastas = [
+            os.path.join(self.pasta_cache, nome) for nome in os.listdir(self.pasta_cache)
+            if nome.startswith(prefixo) and os.path.isdir(os.path.join(self.pasta_cache, nome))
+        ]
+        pastas.sort(key=os.path.getmtime, reverse=True)
+        for pasta in pastas[self.ENTRADAS_POR_ETAPA:]:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    def _executar_etapa(self, etapa, entradas):
+        """Carrega a etapa do cache ou a executa (e guarda o resultado)"""
+        if self.usar_cache and etapa.cache:
+            chave = self._chave(etapa)
+            carregado = self._carregar(etapa, chave)
+            if carregado is not None:
+                self.resultados[etapa.nome], self.hashes_saida[etapa.nome] = carregado
+                self.reaproveitadas.append(etapa.nome)
+                print(f"♻️  Etapa '{etapa.nome}' inalterada - resultado reaproveitado do cache ({chave[:8]})")
+                return
+
+        inicio = time.perf_counter()
+        resultado = etapa.funcao(self.contexto, *entradas)
+        self.resultados[etapa.nome] = resultado
+        self.hashes_saida[etapa.nome] = hash_conteudo(resultado)
+        self.executadas.append((etapa.nome, time.perf_counter() - inicio))
+
+        if self.usar_cache and etapa.cache:
+            self._guardar(etapa, chave, resultado, self.hashes_saida[etapa.nome])
+
+    def executar(self):
+        """Executa o pipeline e retorna os resultados por nome de etapa"""
+        for etapa in self.etapas:
+            print(f"\n{etapa.titulo}")
+            entradas = [self.resultados[nome] for nome in etapa.entradas]
+            self._importar_modulos(etapa)
+
+            with medicao(self.config, f"etapa:{etapa.nome}", entradas) as medida:
+                self._executar_etapa(etapa, entradas)
+                medida['saida'] = self.resultados[etapa.nome]
+
+        return self.resultados
+
+    def finalizar(self):
+        """Aguarda gráficos em segundo plano e copia os arquivos gerados para o cache"""
+        for objeto in self.contexto['pendentes']:
+            objeto.aguardar_graficos()
+        self.contexto['pendentes'] = []
+
+        for pasta, caminhos in self.arquivos_para_guardar:
+            for i, caminho in enumerate(caminhos):
+                if os.path.exists(caminho):
+                    shutil.copy2(caminho, f"{pasta}/arquivo_{i}")
+        self.arquivos_para_guardar = []
+
+        if self.reaproveitadas:
+            print(f"\n♻️  Etapas reaproveitadas do cache: {', '.join(self.reaproveitadas)}")
+
+
+def _etapa_ingestao(contexto):
+    from src.data_processor import DataProcessor
+    dados_diarios = DataProcessor(contexto['config']).carregar_e_agregar_dados(contexto.get('dados_brutos'))
+    if dados_diarios is None:
+        raise RuntimeError("Erro no processamento dos dados")
+    return dados_diarios
+
+
+def _etapa_outliers(contexto, dados_diarios):
+    from src.outlier_analyzer import OutlierAnalyzer
+    return OutlierAnalyzer(contexto['config']).analisar_outliers(dados_diarios)
+
+
+def _etapa_gaps(contexto, dados_sem_outliers):
+    from src.gap_analyzer import GapAnalyzer
+    return GapAnalyzer(contexto['config']).analisar_gaps(dados_sem_outliers)
+
+
+def _etapa_classificacao(contexto, resultado_gaps):
+    from src.gap_classification_analyzer import GapClassificationAnalyzer
+    dados_gaps, _ = resultado_gaps
+    if dados_gaps is None:
+        return None, None
+    analisador = GapClassificationAnalyzer(contexto['config'])
+    resultado = analisador.executar_analise_completa(dados_gaps)
+    contexto['pendentes'].append(analisador)
+    return resultado
+
+
+def _etapa_graficos(contexto, dados_diarios, resultado_gaps):
+    from src.visualizer import Visualizer
+    dados_gaps, dados_finais = resultado_gaps
+    visualizer = Visualizer(contexto['config'])
+    visualizer.gerar_todos_graficos(dados_diarios, dados_gaps, dados_finais)
+    contexto['pendentes'].append(visualizer)
+
+
+def _etapa_relatorio(contexto, dados_diarios, resultado_gaps):
+    from src.report_generator import ReportGenerator
+    dados_gaps, dados_finais = resultado_gaps
+    ReportGenerator(contexto['config']).gerar_relatorio_completo(dados_diarios, dados_gaps, dados_finais)
+
+
+# Configurações de gravação das tabelas (formato, CSV e intermediárias)
+CHAVES_ARQUIVOS = ('GRAVAR_ARQUIVOS', 'SAVE_INTERMEDIATE', 'FORMATO_INTERMEDIARIO', 'EXPORTAR_CSV')
+
+# Configurações que alteram a saída de cada etapa (caminhos e PROCESSAMENTO_PARTICIONADO, que não
+# muda o resultado, não entram na chave)
+CHAVES_OUTLIERS = (
+    'OUTLIER_THRESHOLD', 'OUTLIER_METHOD', 'OUTLIER_ZSCORE_THRESHOLD', 'OUTLIER_MAD_THRESHOLD',
+    'OUTLIER_PERCENTIS', 'OUTLIER_JANELA', 'OUTLIER_JANELA_MIN', *CHAVES_ARQUIVOS
+)
+CHAVES_CLASSIFICACAO = (
+    'GAP_MINIMO', 'DIAS_LIMITE_GAP', 'JANELA_RECLASSIFICACAO', 'GRAPH_DPI',
+    'GERAR_GRAFICOS', *CHAVES_ARQUIVOS
+)
+
+
+def etapas_padrao(incluir_graficos=True):
+    """As seis etapas de run.py: ingestão, outliers, gaps, classificação, gráficos e relatório
+
+    Com `incluir_graficos=False` a etapa de gráficos é omitida (execução apenas de dados).
+    """
+    etapas = [
+        Etapa('ingestao', "📊 ETAPA 1: Processamento e Agregação de Dados", _etapa_ingestao,
+              chaves_config=('FILTRAR_TICKS_SUSPEITOS', 'TICK_SALTO_MAXIMO_PCT', *CHAVES_ARQUIVOS),
+              modulos=('src.data_processor', 'src.table_store'),
+              arquivos=(*modelos_tabela('dados_diarios'), '{PROCESSED_DIR}/ticks_suspeitos.csv'),
+              arquivos_entrada=('DATA_FILE',)),
+        Etapa('outliers', "🔍 ETAPA 2: Análise de Outliers", _etapa_outliers,
+              entradas=('ingestao',), chaves_config=CHAVES_OUTLIERS,
+              modulos=('src.outlier_analyzer', 'src.table_store'),
+              arquivos=(*modelos_tabela('dados_sem_outliers'), '{OUTPUT_DIR}/reports/analise_outliers.txt')),
+        Etapa('gaps', "📈 ETAPA 3: Análise de Gaps", _etapa_gaps,
+              entradas=('outliers',), chaves_config=('GAP_MINIMO', 'DIAS_LIMITE_GAP', *CHAVES_ARQUIVOS),
+              modulos=('src.gap_analyzer', 'src.table_store'),
+              arquivos=(*modelos_tabela('gaps_analisados'), *modelos_tabela('dados_limpos_finais'))),
+        Etapa('classificacao', "🎯 ETAPA 4: Classificação Estatística de Gaps", _etapa_classificacao,
+              entradas=('gaps',), chaves_config=CHAVES_CLASSIFICACAO,
+              modulos=('src.gap_classification_analyzer', 'src.survival_analyzer', 'src.rolling_classifier',
+                       'src.class_lookup', 'src.table_store'),
+              arquivos=(
+                  *modelos_tabela('gaps_classificados'), *modelos_tabela('metricas_por_classe'),
+                  *modelos_tabela('features_para_modelo'), *modelos_tabela('reclassificacao_rolante'),
+                  '{PROCESSED_DIR}/curvas_sobrevivencia.npz', '{PROCESSED_DIR}/tabela_classes.npz',
+                  '{OUTPUT_DIR}/graphs/classificacao_distribuicao.png',
+                  '{OUTPUT_DIR}/graphs/classificacao_probabilidades.png',
+                  '{OUTPUT_DIR}/graphs/classificacao_tempos.png',
+                  '{OUTPUT_DIR}/graphs/classificacao_volatilidade.png'
+              )),
+        Etapa('graficos', "📊 ETAPA 5: Geração de Gráficos", _etapa_graficos,
+              entradas=('ingestao', 'gaps'), modulos=('src.visualizer',), cache=False),
+        Etapa('relatorio', "📋 ETAPA 6: Geração de Relatório", _etapa_relatorio,
+              entradas=('ingestao', 'gaps'), modulos=('src.report_generator',), cache=False)
+    ]
+    if not incluir_graficos:
+        etapas = [etapa for etapa in etapas if etapa.nome != 'graficos']
+    return etapas
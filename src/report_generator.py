@@ -7,6 +7,8 @@ import pandas as pd
 import numpy as np
 import os
 from datetime import datetime
+from src.content_cache import ManifestoSaidas, caminho_manifesto, hash_codigo, hash_conteudo
+from src.performance import medir_desempenho
 
 class ReportGenerator:
     """Classe para geração de relatórios detalhados da análise"""
@@ -15,6 +17,23 @@ class ReportGenerator:
         self.config = config
         # Criar pasta de relatórios se não existir
         os.makedirs(f"{config['OUTPUT_DIR']}/reports", exist_ok=True)
+        self.manifesto = None
+        self.secoes_reaproveitadas = 0
+    
+    def _gerar_secao(self, nome, gerador, *dados, chaves=()):
+        """Gera uma seção ou reaproveita o texto guardado se dados, chaves e código não mudaram"""
+        if self.manifesto is None:
+            return gerador(*dados)
+        
+        chave = f"relatorio/{nome}"
+        hash_entrada = hash_conteudo(hash_codigo(ReportGenerator), nome, *dados, config=self.config, chaves=chaves)
+        if self.manifesto.atualizado(chave, hash_entrada):
+            self.secoes_reaproveitadas += 1
+            return self.manifesto.obter(chave, 'linhas')
+        
+        linhas = gerador(*dados)
+        self.manifesto.registrar(chave, hash_entrada, linhas=linhas)
+        return linhas
     
     def calcular_metricas_performance(self, dados):
         """Calcula métricas de performance financeira"""
@@ -246,7 +265,7 @@ class ReportGenerator:
             linhas.append("")
         
         linhas.append("RECOMENDAÇÕES PARA TRADING:")
-        linhas.append("  🎯 Utilizar arquivo 'dados_limpos_finais.csv' para backtesting")
+        linhas.append("  🎯 Utilizar a tabela 'dados_limpos_finais' (carregar_tabela) para backtesting")
         linhas.append("  📈 Considerar estratégias de reversão em gaps")
         linhas.append(f"  🔍 Focar em gaps >= {self.config['GAP_MINIMO']} pontos")
         
@@ -295,12 +314,18 @@ class ReportGenerator:
         
         return linhas
     
+    @medir_desempenho
     def gerar_relatorio_completo(self, dados_diarios, gaps_analisados, dados_finais):
         """Gera relatório completo da análise"""
         print("\n📋 INICIANDO GERAÇÃO DE RELATÓRIO")
         print("=" * 50)
         
         try:
+            # Seções inalteradas são reaproveitadas do manifesto (PULAR_SAIDAS_INALTERADAS)
+            if self.config.get('PULAR_SAIDAS_INALTERADAS', True):
+                self.manifesto = ManifestoSaidas(caminho_manifesto(self.config))
+            self.secoes_reaproveitadas = 0
+            
             # Montar conteúdo do relatório
             conteudo = []
             
@@ -308,16 +333,18 @@ class ReportGenerator:
             conteudo.extend(self.gerar_cabecalho_relatorio())
             
             # Seções
-            conteudo.extend(self.gerar_secao_dados_originais(dados_diarios))
+            conteudo.extend(self._gerar_secao('dados_originais', self.gerar_secao_dados_originais, dados_diarios))
             conteudo.append("")
             
-            conteudo.extend(self.gerar_secao_gaps(gaps_analisados))
+            conteudo.extend(self._gerar_secao('gaps', self.gerar_secao_gaps, gaps_analisados,
+                                              chaves=('GAP_MINIMO',)))
             conteudo.append("")
             
-            conteudo.extend(self.gerar_secao_dados_finais(dados_diarios, dados_finais))
+            conteudo.extend(self._gerar_secao('dados_finais', self.gerar_secao_dados_finais, dados_diarios, dados_finais))
             conteudo.append("")
             
-            conteudo.extend(self.gerar_secao_recomendacoes(gaps_analisados))
+            conteudo.extend(self._gerar_secao('recomendacoes', self.gerar_secao_recomendacoes, gaps_analisados,
+                                              chaves=('GAP_MINIMO',)))
             
             # Rodapé
             conteudo.append("")
@@ -333,6 +360,10 @@ class ReportGenerator:
             
             print(f"✅ Relatório gerado: {caminho_relatorio}")
             print(f"📄 {len(conteudo)} linhas de conteúdo")
+            if self.secoes_reaproveitadas:
+                print(f"⏭️  {self.secoes_reaproveitadas} seções inalteradas reaproveitadas")
+            if self.manifesto is not None:
+                self.manifesto.salvar()
             
             return True
             
@@ -0,0 +1,185 @@
+"""
+Rolling Classifier Module
+Módulo responsável pela reclassificação de gaps em janela móvel (walk-forward)
+"""
+
+import numpy as np
+import pandas as pd
+from src.performance import medir_desempenho
+from src.table_store import salvar_tabela
+
+
+class ArvoreFenwick:
+    """Árvore de Fenwick sobre postos comprimidos: contagem por prefixo e k-ésimo elemento em O(log n)"""
+
+    def __init__(self, tamanho):
+        self.tamanho = tamanho
+        self.arvore = [0] * (tamanho + 1)
+        self.total = 0
+        self.passo_maximo = 1 << (tamanho.bit_length() - 1) if tamanho > 0 else 0
+
+    def atualizar(self, posto, delta):
+        """Soma `delta` à contagem do posto (0-based)"""
+        self.total += delta
+        i = posto + 1
+        while i <= self.tamanho:
+            self.arvore[i] += delta
+            i += i & -i
+
+    def prefixo(self, posto):
+        """Quantidade de elementos com posto <= `posto` (posto -1 retorna 0)"""
+        total = 0
+        i = posto + 1
+        while i > 0:
+            total += self.arvore[i]
+            i -= i & -i
+        return total
+
+    def k_esimo(self, k):
+        """Posto do k-ésimo menor elemento (k 0-based)"""
+        posicao = 0
+        restante = k + 1
+        passo = self.passo_maximo
+        while passo:
+            proxima = posicao + passo
+            if proxima <= self.tamanho and self.arvore[proxima] < restante:
+                posicao = proxima
+                restante -= self.arvore[proxima]
+            passo >>= 1
+        return posicao
+
+
+class ReclassificadorRolante:
+    """Recalcula limites de classe (quartis) e métricas por classe em uma janela móvel de gaps"""
+
+    QUANTIS = [0.25, 0.5, 0.75]
+
+    def __init__(self, config):
+        self.config = config
+        self.serie = None
+
+    def _quantil(self, arvore, valores_unicos, q):
+        """Quantil com interpolação linear (mesma convenção de np.percentile)"""
+        h = (arvore.total - 1) * q
+        inferior = int(np.floor(h))
+        superior = int(np.ceil(h))
+        v_inferior = valores_unicos[arvore.k_esimo(inferior)]
+        v_superior = valores_unicos[arvore.k_esimo(superior)]
+        return v_inferior + (h - inferior) * (v_superior - v_inferior)
+
+    def _contagens_por_classe(self, arvore, postos_limite):
+        """Contagens por classe a partir das contagens acumuladas até cada limite (include_lowest)"""
+        acumulado = [arvore.prefixo(posto) for posto in postos_limite[1:]]
+        return np.diff([0] + acumulado)
+
+    def _datas_resolucao(self, gaps_df):
+        """Data em que o resultado de cada gap passa a ser conhecido (fechamento ou fim da observação)"""
+        if 'dias_observados' in gaps_df.columns:
+            fim_observacao = gaps_df.index + pd.to_timedelta(gaps_df['dias_observados'].values, unit='D')
+        else:
+            fim_observacao = gaps_df.index + pd.Timedelta(days=self.config['DIAS_LIMITE_GAP'])
+
+        data_fechamento = pd.DatetimeIndex(pd.to_datetime(gaps_df['data_fechamento']))
+        return data_fechamento.where(gaps_df['gap_fechado'].values, fim_observacao)
+
+    @medir_desempenho
+    def executar(self, gaps_df, janela=None, min_periodos=None):
+        """Percorre os gaps em ordem cronológica e gera a série temporal de limites e probabilidades"""
+        janela = janela or self.config.get('JANELA_RECLASSIFICACAO', 500)
+        min_periodos = min_periodos or min(janela, 100)
+
+        print(f"\n🔁 RECLASSIFICAÇÃO EM JANELA MÓVEL ({janela} gaps)")
+        print("-" * 50)
+
+        gaps_df = gaps_df.sort_index()
+        valores = gaps_df['gap_absoluto'].values.astype(float)
+        valores_unicos = np.unique(valores)
+        postos = np.searchsorted(valores_unicos, valores)
+        gap_up = (gaps_df['tipo_gap'] == 'Gap Up').values
+        gap_down = (gaps_df['tipo_gap'] == 'Gap Down').values
+        fechado = gaps_df['gap_fechado'].astype(bool).values
+
+        # Resultados só entram nos contadores depois de conhecidos (sem look-ahead)
+        datas = gaps_df.index.values
+        resolucao = self._datas_resolucao(gaps_df).values
+        ordem_resolucao = np.argsort(resolucao, kind='mergesort')
+        proxima_resolucao = 0
+
+        n_unicos = len(valores_unicos)
+        arvore_janela = ArvoreFenwick(n_unicos)
+        resolvidos = {'up': ArvoreFenwick(n_unicos), 'down': ArvoreFenwick(n_unicos)}
+        fechados = {'up': ArvoreFenwick(n_unicos), 'down': ArvoreFenwick(n_unicos)}
+        estado = np.zeros(len(valores), dtype=np.int8)  # 0 = fora, 1 = na janela, 2 = resolvido na janela
+
+        def alterar_resolvido(i, delta):
+            direcao = 'up' if gap_up[i] else 'down' if gap_down[i] else None
+            if direcao is None:
+                return
+            resolvidos[direcao].atualizar(postos[i], delta)
+            if fechado[i]:
+                fechados[direcao].atualizar(postos[i], delta)
+
+        linhas = []
+        for i in range(len(valores)):
+            # Entrada do novo gap e saída do mais antigo
+            arvore_janela.atualizar(postos[i], 1)
+            estado[i] = 1
+            if i >= janela:
+                saindo = i - janela
+                arvore_janela.atualizar(postos[saindo], -1)
+                if estado[saindo] == 2:
+                    alterar_resolvido(saindo, -1)
+                estado[saindo] = 0
+
+            # Resultados conhecidos antes do dia do gap atual
+            while proxima_resolucao < len(ordem_resolucao) and resolucao[ordem_resolucao[proxima_resolucao]] < datas[i]:
+                j = ordem_resolucao[proxima_resolucao]
+                if estado[j] == 1:
+                    alterar_resolvido(j, 1)
+                    estado[j] = 2
+                proxima_resolucao += 1
+
+            if arvore_janela.total < min_periodos:
+                continue
+
+            limites = [valores_unicos[arvore_janela.k_esimo(0)]]
+            limites += [self._quantil(arvore_janela, valores_unicos, q) for q in self.QUANTIS]
+            limites.append(valores_unicos[arvore_janela.k_esimo(arvore_janela.total - 1)])
+            postos_limite = np.searchsorted(valores_unicos, limites, side='right') - 1
+
+            linha = {
+                'data': gaps_df.index[i],
+                'n_janela': arvore_janela.total,
+                'limite_min': limites[0],
+                'q1': limites[1],
+                'q2': limites[2],
+                'q3': limites[3],
+                'limite_max': limites[4]
+            }
+
+            n_classe = self._contagens_por_classe(arvore_janela, postos_limite)
+            for k, n in enumerate(n_classe, start=1):
+                linha[f'n_classe{k}'] = n
+
+            for direcao in ['up', 'down']:
+                n_resolvidos = self._contagens_por_classe(resolvidos[direcao], postos_limite)
+                n_fechados = self._contagens_por_classe(fechados[direcao], postos_limite)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    probabilidades = np.where(n_resolvidos > 0, n_fechados / n_resolvidos, np.nan)
+                for k, prob in enumerate(probabilidades, start=1):
+                    linha[f'prob_fechamento_{direcao}_classe{k}'] = prob
+
+            linhas.append(linha)
+
+        self.serie = pd.DataFrame(linhas).set_index('data') if linhas else pd.DataFrame()
+
+        print(f"✅ {len(self.serie)} passos calculados (mínimo de {min_periodos} gaps na janela)")
+        if len(self.serie) > 0:
+            print(f"   • Q2 atual: {self.serie['q2'].iloc[-1]:.0f} pontos "
+                  f"(variação na série: {self.serie['q2'].min():.0f}-{self.serie['q2'].max():.0f})")
+
+        return self.serie
+
+    def salvar_serie(self):
+        """Salva a série de limites e probabilidades em PROCESSED_DIR"""
+        return salvar_tabela(self.serie, self.config, 'reclassificacao_rolante')
@@ -0,0 +1,187 @@
+"""
+Survival Analyzer Module
+Módulo responsável pelas curvas de sobrevivência (Kaplan-Meier) do tempo de fechamento dos gaps
+"""
+
+import numpy as np
+import pandas as pd
+from src.performance import medir_desempenho
+
+TIPOS_GAP = ['Gap Up', 'Gap Down']
+
+
+def kaplan_meier(duracoes, eventos):
+    """Estimador de Kaplan-Meier vetorizado com censura à direita
+
+    Retorna os tempos com evento, a sobrevivência S(t), o risco discreto h(t),
+    o número em risco e o número de eventos em cada tempo.
+    """
+    duracoes = np.asarray(duracoes, dtype=float)
+    eventos = np.asarray(eventos, dtype=bool)
+
+    duracoes_ordenadas = np.sort(duracoes)
+    tempos, n_eventos = np.unique(duracoes[eventos], return_counts=True)
+
+    # Em risco no tempo t: todos com duração >= t (fechados ou censurados)
+    n_em_risco = len(duracoes_ordenadas) - np.searchsorted(duracoes_ordenadas, tempos, side='left')
+
+    risco = n_eventos / n_em_risco
+    sobrevivencia = np.cumprod(1.0 - risco)
+
+    return tempos, sobrevivencia, risco, n_em_risco, n_eventos
+
+
+class CurvasSobrevivencia:
+    """Curvas de sobrevivência compactas (uma por classe e tipo de gap) com consulta rápida
+
+    Os tempos são contados em pregões após o gap, a mesma unidade da janela DIAS_LIMITE_GAP.
+    """
+
+    def __init__(self, classes, tempos, sobrevivencia, risco, offsets, observacoes=None):
+        self.classes = [str(classe) for classe in classes]
+        self.tempos = tempos
+        self.sobrevivencia = sobrevivencia
+        self.risco = risco
+        self.offsets = offsets
+        self.observacoes = observacoes  # Gaps (fechados ou censurados) de cada curva
+
+    def _posicao(self, classe, tipo_gap):
+        """Posição da curva de uma classe/tipo em offsets e observacoes"""
+        return self.classes.index(str(classe)) * len(TIPOS_GAP) + TIPOS_GAP.index(tipo_gap)
+
+    def _segmento(self, classe, tipo_gap):
+        """Retorna o intervalo [inicio, fim) da curva de uma classe/tipo nos arrays concatenados"""
+        posicao = self._posicao(classe, tipo_gap)
+        return self.offsets[posicao], self.offsets[posicao + 1]
+
+    def curva(self, classe, tipo_gap):
+        """Retorna (tempos, sobrevivencia, risco) de uma classe e tipo de gap"""
+        inicio, fim = self._segmento(classe, tipo_gap)
+        return self.tempos[inicio:fim], self.sobrevivencia[inicio:fim], self.risco[inicio:fim]
+
+    def probabilidade_aberto(self, classe, tipo_gap, pregoes):
+        """Probabilidade de o gap continuar aberto após `pregoes` pregões (aceita escalar ou array)
+
+        NaN se a classe/tipo não tem nenhum gap observado.
+        """
+        tempos, sobrevivencia, _ = self.curva(classe, tipo_gap)
+        posicao = np.searchsorted(tempos, pregoes, side='right')
+        if self.observacoes is not None and self.observacoes[self._posicao(classe, tipo_gap)] == 0:
+            return np.full(np.shape(posicao), np.nan)[()]
+        return np.concatenate(([1.0], sobrevivencia))[posicao]
+
+    def tempo_mediano(self, classe, tipo_gap):
+        """Menor tempo em que a sobrevivência cai a 50% ou menos (NaN se não atingir)"""
+        tempos, sobrevivencia, _ = self.curva(classe, tipo_gap)
+        abaixo = np.flatnonzero(sobrevivencia <= 0.5)
+        return tempos[abaixo[0]] if len(abaixo) > 0 else np.nan
+
+    def salvar(self, caminho):
+        """Salva as curvas em formato binário compacto (.npz)"""
+        np.savez(
+            caminho,
+            classes=np.array(self.classes),
+            tempos=self.tempos,
+            sobrevivencia=self.sobrevivencia,
+            risco=self.risco,
+            offsets=self.offsets,
+            observacoes=self.observacoes
+        )
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Carrega curvas salvas por `salvar`"""
+        with np.load(caminho) as arquivo:
+            return cls(
+                arquivo['classes'].tolist(),
+                arquivo['tempos'],
+                arquivo['sobrevivencia'],
+                arquivo['risco'],
+                arquivo['offsets'],
+                arquivo['observacoes'] if 'observacoes' in arquivo.files else None
+            )
+
+
+class SurvivalAnalyzer:
+    """Classe para análise de sobrevivência do tempo até o fechamento dos gaps"""
+
+    def __init__(self, config):
+        self.config = config
+        self.curvas = None
+
+    def _duracoes_e_eventos(self, gaps_df):
+        """Extrai durações (pregões até fechar ou até o fim da observação) e indicador de fechamento"""
+        eventos = gaps_df['gap_fechado'].astype(bool).values
+
+        if 'pregoes_observados' in gaps_df.columns:
+            duracoes = gaps_df['pregoes_observados'].values.astype(float)
+        else:
+            # Arquivos antigos: dias corridos, com os gaps não fechados censurados no limite de observação
+            print("⚠️  Coluna 'pregoes_observados' ausente - usando dias corridos e censurando em DIAS_LIMITE_GAP")
+            duracoes = gaps_df['dias_para_fechamento'].fillna(self.config['DIAS_LIMITE_GAP']).values.astype(float)
+
+        return duracoes, eventos
+
+    @medir_desempenho
+    def calcular_curvas(self, gaps_df):
+        """Calcula as curvas de Kaplan-Meier por classe e tipo de gap"""
+        print(f"\n⏳ CALCULANDO CURVAS DE SOBREVIVÊNCIA (KAPLAN-MEIER)")
+        print("-" * 50)
+
+        duracoes, eventos = self._duracoes_e_eventos(gaps_df)
+        classes = list(gaps_df['gap_class'].cat.categories)
+
+        tempos, sobrevivencia, risco, observacoes = [], [], [], []
+        offsets = [0]
+
+        for classe in classes:
+            for tipo in TIPOS_GAP:
+                filtro = ((gaps_df['gap_class'] == classe) & (gaps_df['tipo_gap'] == tipo)).values
+                t, s, h, _, _ = kaplan_meier(duracoes[filtro], eventos[filtro])
+
+                tempos.append(t)
+                sobrevivencia.append(s)
+                risco.append(h)
+                offsets.append(offsets[-1] + len(t))
+                observacoes.append(int(filtro.sum()))
+
+        self.curvas = CurvasSobrevivencia(
+            classes,
+            np.concatenate(tempos),
+            np.concatenate(sobrevivencia),
+            np.concatenate(risco),
+            np.array(offsets),
+            np.array(observacoes)
+        )
+
+        n_censurados = int((~eventos).sum())
+        print(f"✅ Curvas calculadas: {len(classes)} classes × {len(TIPOS_GAP)} tipos")
+        print(f"   • Gaps censurados (não fechados): {n_censurados} de {len(eventos)}")
+
+        return self.curvas
+
+    def resumo_por_classe(self):
+        """Resume as curvas em métricas por classe (tempo mediano e probabilidade de seguir aberto)
+
+        Ambas em pregões: a probabilidade é avaliada ao fim dos DIAS_LIMITE_GAP pregões da
+        janela e coincide com 1 - taxa de fechamento quando nenhum gap é censurado antes.
+        """
+        dias_limite = self.config['DIAS_LIMITE_GAP']
+        linhas = []
+
+        for classe in self.curvas.classes:
+            linha = {'intervalo': classe}
+            for tipo, sufixo in zip(TIPOS_GAP, ['up', 'down']):
+                linha[f'tempo_mediano_km_{sufixo}'] = self.curvas.tempo_mediano(classe, tipo)
+                linha[f'prob_aberto_limite_{sufixo}'] = float(
+                    self.curvas.probabilidade_aberto(classe, tipo, dias_limite)
+                )
+            linhas.append(linha)
+
+        return pd.DataFrame(linhas)
+
+    def salvar_curvas(self):
+        """Salva as curvas de sobrevivência em PROCESSED_DIR"""
+        caminho = f"{self.config['PROCESSED_DIR']}/curvas_sobrevivencia.npz"
+        self.curvas.salvar(caminho)
+        return caminho
@@ -0,0 +1,104 @@
+"""
+Table Store Module
+Módulo de leitura e gravação das tabelas de PROCESSED_DIR em formato binário colunar
+(Parquet com pyarrow, pickle como alternativa) com exportação CSV opcional
+"""
+
+import importlib.util
+import os
+
+import pandas as pd
+
+EXTENSOES = {'parquet': '.parquet', 'pickle': '.pkl', 'csv': '.csv'}
+
+# Aviso de gravação em pickle por falta do pyarrow já exibido neste processo
+_AVISO_PICKLE_EXIBIDO = False
+
+# Tabelas intermediárias entre etapas (gravadas apenas com SAVE_INTERMEDIATE)
+TABELAS_INTERMEDIARIAS = ('dados_diarios', 'dados_sem_outliers', 'gaps_analisados')
+
+
+def gravacao_ativa(config):
+    """Gravação de arquivos ligada (GRAVAR_ARQUIVOS=False mantém os resultados apenas em memória)"""
+    return config.get('GRAVAR_ARQUIVOS', True)
+
+
+def formato_binario(config):
+    """Formato das tabelas: FORMATO_INTERMEDIARIO ('auto' = Parquet se o pyarrow estiver instalado, senão pickle)
+
+    Sem o pyarrow (requirements.txt), 'auto' e 'parquet' caem para pickle com um aviso:
+    o pickle não é colunar e pode não abrir em outra versão do pandas.
+    """
+    global _AVISO_PICKLE_EXIBIDO
+    formato = config.get('FORMATO_INTERMEDIARIO', 'auto')
+    if formato not in ('auto', 'parquet'):
+        return formato
+    if importlib.util.find_spec('pyarrow') is not None:
+        return 'parquet'
+    if not _AVISO_PICKLE_EXIBIDO:
+        print("⚠️  pyarrow não instalado: tabelas gravadas em pickle (não colunar, dependente da versão do pandas); "
+              "instale com: pip install pyarrow")
+        _AVISO_PICKLE_EXIBIDO = True
+    return 'pickle'
+
+
+def modelos_tabela(nome):
+    """Modelos de caminho de todas as variantes da tabela (para o cache de etapas do pipeline)"""
+    return tuple(f"{{PROCESSED_DIR}}/{nome}{extensao}" for extensao in EXTENSOES.values())
+
+
+def salvar_tabela(dados, config, nome, indice=True):
+    """Grava a tabela no formato binário (e em CSV com EXPORTAR_CSV); retorna o caminho principal ou None
+
+    Variantes antigas da mesma tabela em outros formatos são removidas para que os
+    leitores nunca encontrem uma versão desatualizada.
+    """
+    if not gravacao_ativa(config):
+        return None
+    if nome in TABELAS_INTERMEDIARIAS and not config.get('SAVE_INTERMEDIATE', True):
+        return None
+
+    base = f"{config['PROCESSED_DIR']}/{nome}"
+    formato = formato_binario(config)
+    if formato == 'parquet':
+        try:
+            dados.to_parquet(base + EXTENSOES['parquet'])
+        except (TypeError, ValueError, NotImplementedError) as e:
+            # Tipos sem representação Arrow (ex.: categorias de intervalos em versões antigas)
+            print(f"⚠️  {nome}: Parquet indisponível para estes tipos ({e}); usando pickle")
+            formato = 'pickle'
+    if formato == 'pickle':
+        dados.to_pickle(base + EXTENSOES['pickle'])
+
+    exportar_csv = config.get('EXPORTAR_CSV', False)
+    if exportar_csv:
+        dados.to_csv(base + EXTENSOES['csv'], index=indice)
+
+    for outro, extensao in EXTENSOES.items():
+        if outro != formato and not (outro == 'csv' and exportar_csv) and os.path.exists(base + extensao):
+            os.remove(base + extensao)
+
+    return base + EXTENSOES[formato]
+
+
+def caminho_tabela(pasta, nome):
+    """Arquivo existente da tabela, preferindo os formatos binários (None se não houver)"""
+    for extensao in EXTENSOES.values():
+        if os.path.exists(f"{pasta}/{nome}{extensao}"):
+            return f"{pasta}/{nome}{extensao}"
+    return None
+
+
+def carregar_tabela(nome, pasta='data/processed', indice=True):
+    """Carrega a tabela com tipos e índice preservados; CSV (com datas convertidas) como último recurso"""
+    caminho = caminho_tabela(pasta, nome)
+    if caminho is None:
+        raise FileNotFoundError(f"Tabela '{nome}' não encontrada em {pasta}/ ({', '.join(EXTENSOES.values())})")
+
+    if caminho.endswith(EXTENSOES['parquet']):
+        return pd.read_parquet(caminho)
+    if caminho.endswith(EXTENSOES['pickle']):
+        return pd.read_pickle(caminho)
+    if indice:
+        return pd.read_csv(caminho, index_col=0, parse_dates=True)
+    return pd.read_csv(caminho)
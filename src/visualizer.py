@@ -4,9 +4,13 @@ Módulo responsável pela geração de gráficos e visualizações
 """
 
 import matplotlib.pyplot as plt
+from matplotlib.collections import PolyCollection
 import pandas as pd
 import numpy as np
 import os
+from src.chart_renderer import RenderizadorGraficos
+from src.downsampling import lttb, envelope_min_max, pontos_por_eixo
+from src.performance import medir_desempenho
 
 # Configurar matplotlib
 plt.style.use('default')
@@ -20,40 +24,102 @@ class Visualizer:
         self.config = config
         # Criar pasta de gráficos se não existir
         os.makedirs(f"{config['OUTPUT_DIR']}/graphs", exist_ok=True)
+        self.graficos_pendentes = None
     
+    def _serie_reduzida(self, ax, indice, valores):
+        """Índice e valores reduzidos por LTTB à largura do eixo em pixels"""
+        selecionados = lttb(indice.asi8, valores, pontos_por_eixo(ax, self.config.get('GRAPH_DPI', 300)))
+        return indice[selecionados], valores[selecionados]
+    
+    def _envelope_barras(self, ax, indice, valores_minimos, valores_maximos):
+        """Blocos de dias (início, largura em dias, mínimo, máximo) limitados à largura do eixo em pixels"""
+        n_grupos = pontos_por_eixo(ax, self.config.get('GRAPH_DPI', 300))
+        inicios, minimos, maximos = envelope_min_max(valores_minimos, valores_maximos, n_grupos)
+        
+        if len(inicios) == len(indice):
+            # Sem redução: uma barra de 1 dia centrada em cada data
+            return indice, 1, minimos, maximos
+        
+        # Cada bloco vai do seu primeiro dia até o início do bloco seguinte
+        datas = indice[inicios]
+        limites = datas.append(pd.DatetimeIndex([indice[-1] + pd.Timedelta(days=1)]))
+        larguras = ((limites[1:] - limites[:-1]) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+        return datas + pd.to_timedelta(larguras / 2, unit='D'), larguras, minimos, maximos
+    
+    def _barras_colecao(self, ax, x, alturas, larguras, cores, alpha):
+        """Desenha barras centradas em `x` (base 0) como uma única PolyCollection
+        
+        Equivale a `ax.bar` sem criar um Rectangle por barra; `x` pode ser um índice de datas
+        (larguras em dias) e `cores` um array com uma cor por barra.
+        """
+        ax.xaxis.update_units(x)
+        centros = np.asarray(ax.convert_xunits(x), dtype=float)
+        alturas = np.asarray(alturas, dtype=float)
+        meia_largura = np.broadcast_to(np.asarray(larguras, dtype=float) / 2, centros.shape)
+        
+        # Vértices (n, 4, 2): esquerda-base, esquerda-topo, direita-topo, direita-base
+        vertices = np.empty((len(centros), 4, 2))
+        vertices[:, :2, 0] = (centros - meia_largura)[:, None]
+        vertices[:, 2:, 0] = (centros + meia_largura)[:, None]
+        vertices[:, [0, 3], 1] = 0.0
+        vertices[:, [1, 2], 1] = alturas[:, None]
+        
+        colecao = PolyCollection(vertices, facecolors=cores, edgecolors='none', alpha=alpha)
+        colecao.sticky_edges.y.append(0)
+        ax.add_collection(colecao)
+        ax.autoscale_view()
+        return colecao
+    
+    @medir_desempenho
     def plotar_evolucao_precos(self, dados_diarios):
-        """Gera gráfico de evolução temporal dos preços"""
+        """Gera gráfico de evolução temporal dos preços
+        
+        Séries mais longas que a largura de cada eixo em pixels são reduzidas antes
+        do desenho (LTTB para linhas, envelope mínimo/máximo para faixas e barras).
+        """
         print("📊 Gerando gráfico de evolução de preços...")
         
         try:
             fig, axes = plt.subplots(2, 2, figsize=(20, 12))
             fig.suptitle('WIN$N - Análise Temporal (Dados Diários)', fontsize=16, fontweight='bold')
+            indice = pd.DatetimeIndex(dados_diarios.index)
             
             # 1. Evolução dos preços de fechamento
             ax1 = axes[0, 0]
-            ax1.plot(dados_diarios.index, dados_diarios['fechamento'], 
+            ax1.plot(*self._serie_reduzida(ax1, indice, dados_diarios['fechamento'].values), 
                      color='blue', linewidth=1, alpha=0.8)
-            ax1.fill_between(dados_diarios.index, 
-                           dados_diarios['minima'], dados_diarios['maxima'], 
+            datas, _, minimas, maximas = self._envelope_barras(
+                ax1, indice, dados_diarios['minima'].values, dados_diarios['maxima'].values
+            )
+            ax1.fill_between(datas, minimas, maximas, 
                            alpha=0.2, color='gray', label='Range Min-Max')
             ax1.set_title('Evolução dos Preços de Fechamento')
             ax1.set_ylabel('Preço (pontos)')
             ax1.grid(True, alpha=0.3)
             ax1.legend()
             
-            # 2. Volume diário
+            # 2. Volume diário (máximo de cada bloco)
             ax2 = axes[0, 1]
-            ax2.bar(dados_diarios.index, dados_diarios['volume_total'], 
-                   width=1, alpha=0.6, color='orange')
+            volume = dados_diarios['volume_total'].values
+            datas, larguras, _, volume_maximo = self._envelope_barras(ax2, indice, volume, volume)
+            self._barras_colecao(ax2, datas, volume_maximo, larguras, 'orange', alpha=0.6)
             ax2.set_title('Volume Diário Total')
             ax2.set_ylabel('Volume')
             ax2.grid(True, alpha=0.3)
             
-            # 3. Retornos diários
+            # 3. Retornos diários (maior alta e maior queda de cada bloco)
             ax3 = axes[1, 0]
-            retornos = dados_diarios['retorno_diario'] * 100
-            cores = ['green' if x > 0 else 'red' for x in retornos]
-            ax3.bar(dados_diarios.index, retornos, width=1, color=cores, alpha=0.7)
+            retornos = dados_diarios['retorno_diario'].values * 100
+            datas, larguras, retorno_minimo, retorno_maximo = self._envelope_barras(ax3, indice, retornos, retornos)
+            if len(datas) == len(indice):
+                alturas = retornos
+                cores = np.where(retornos > 0, 'green', 'red')
+            else:
+                datas = datas.append(datas)
+                larguras = np.concatenate([larguras, larguras])
+                alturas = np.concatenate([np.maximum(retorno_maximo, 0), np.minimum(retorno_minimo, 0)])
+                cores = np.repeat(['green', 'red'], len(retorno_maximo))
+            self._barras_colecao(ax3, datas, alturas, larguras, cores, alpha=0.7)
             ax3.axhline(y=0, color='black', linestyle='-', alpha=0.8)
             ax3.set_title('Retornos Diários (%)')
             ax3.set_ylabel('Retorno (%)')
@@ -61,7 +127,7 @@ class Visualizer:
             
             # 4. Volatilidade diária
             ax4 = axes[1, 1]
-            ax4.plot(dados_diarios.index, dados_diarios['volatilidade'], 
+            ax4.plot(*self._serie_reduzida(ax4, indice, dados_diarios['volatilidade'].values), 
                      color='purple', linewidth=1, alpha=0.8)
             ax4.set_title('Volatilidade Diária (%)')
             ax4.set_ylabel('Volatilidade (%)')
@@ -81,6 +147,7 @@ class Visualizer:
             print(f"❌ Erro ao gerar gráfico de evolução: {e}")
             return False
     
+    @medir_desempenho
     def plotar_analise_gaps(self, gaps_analisados):
         """Gera gráficos de análise de gaps"""
         if gaps_analisados is None or len(gaps_analisados) == 0:
@@ -184,6 +251,7 @@ class Visualizer:
             print(f"❌ Erro ao gerar gráfico de gaps: {e}")
             return False
     
+    @medir_desempenho
     def plotar_comparacao_datasets(self, dados_originais, dados_finais):
         """Compara datasets antes e depois da limpeza"""
         print("📊 Gerando gráfico de comparação...")
@@ -281,28 +349,58 @@ class Visualizer:
             print(f"❌ Erro ao gerar gráfico de comparação: {e}")
             return False
     
+    @medir_desempenho
     def gerar_todos_graficos(self, dados_diarios, gaps_analisados, dados_finais):
-        """Gera todos os gráficos da análise"""
+        """Gera todos os gráficos da análise (em paralelo; em segundo plano com GRAFICOS_SEGUNDO_PLANO)
+        
+        Gráficos cujos dados de entrada não mudaram desde a última execução não são
+        renderizados novamente (PULAR_SAIDAS_INALTERADAS).
+        """
         print("\n📊 INICIANDO GERAÇÃO DE GRÁFICOS")
         print("=" * 50)
         
-        graficos_gerados = 0
+        colunas_comparacao = ['retorno_diario', 'volatilidade', 'fechamento']
+        pasta = f"{self.config['OUTPUT_DIR']}/graphs"
         
-        # 1. Evolução de preços
-        if self.plotar_evolucao_precos(dados_diarios):
-            graficos_gerados += 1
+        # Cada gráfico recebe apenas as colunas que utiliza
+        tarefas = [
+            # 1. Evolução de preços
+            ('plotar_evolucao_precos', {}, (dados_diarios[[
+                'fechamento', 'minima', 'maxima', 'volume_total', 'retorno_diario', 'volatilidade'
+            ]],), f"{pasta}/evolucao_precos.png")
+        ]
         
         # 2. Análise de gaps (se houver)
         if gaps_analisados is not None:
-            if self.plotar_analise_gaps(gaps_analisados):
-                graficos_gerados += 1
+            tarefas.append(('plotar_analise_gaps', {}, (gaps_analisados[[
+                'gap_absoluto', 'gap_fechado', 'tipo_gap', 'dias_para_fechamento'
+            ]] if len(gaps_analisados) > 0 else gaps_analisados,), f"{pasta}/analise_gaps.png"))
         
         # 3. Comparação de datasets
-        if self.plotar_comparacao_datasets(dados_diarios, dados_finais):
-            graficos_gerados += 1
+        tarefas.append(('plotar_comparacao_datasets', {}, (
+            dados_diarios[colunas_comparacao], dados_finais[colunas_comparacao]
+        ), f"{pasta}/comparacao_datasets.png"))
         
+        segundo_plano = self.config.get('GRAFICOS_SEGUNDO_PLANO', False)
+        resultado = RenderizadorGraficos(self.config).executar(Visualizer, tarefas, segundo_plano=segundo_plano)
+        
+        if segundo_plano:
+            self.graficos_pendentes = resultado
+            return True
+        return self._resumo_graficos(resultado)
+    
+    def aguardar_graficos(self):
+        """Aguarda os gráficos em segundo plano (se houver) e exibe o resumo"""
+        if self.graficos_pendentes is None:
+            return True
+        graficos_gerados = self.graficos_pendentes.aguardar()
+        self.graficos_pendentes = None
+        return self._resumo_graficos(graficos_gerados)
+    
+    def _resumo_graficos(self, graficos_gerados):
+        """Exibe o resumo da geração de gráficos"""
         print(f"\n✅ Geração de gráficos concluída!")
         print(f"📊 {graficos_gerados} gráficos gerados com sucesso")
         print(f"📁 Pasta: {self.config['OUTPUT_DIR']}/graphs/")
         
-        return graficos_gerados > 0
\ No newline at end of file
+        return graficos_gerados > 0
@@ -0,0 +1,47 @@
+"""
+Testes da tabela compacta de classes (src/class_lookup.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.class_lookup import METRICAS_LOOKUP, TabelaClasses, exportar_tabela, montar_matriz
+
+LIMITES = [100, 200, 300, 400]
+CLASSES = pd.CategoricalIndex(['100-200', '200-300', '300-400'])
+
+
+def metricas_sem_classe_do_meio():
+    """Métricas como as de _calcular_metricas_por_classe quando a classe 200-300 não tem gaps"""
+    return pd.DataFrame({
+        'intervalo': ['100-200', '300-400'],
+        'prob_fechamento_up': [0.9, 0.7],
+        'prob_fechamento_down': [0.8, 0.6],
+        'tempo_fechamento_up': [2.0, 5.0],
+    })
+
+
+def test_montar_matriz_alinha_por_intervalo_e_deixa_classe_vazia_nan():
+    matriz = montar_matriz(CLASSES, metricas_sem_classe_do_meio())
+    prob = METRICAS_LOOKUP.index('prob_fechamento')
+    tempo = METRICAS_LOOKUP.index('tempo_fechamento')
+
+    assert matriz.shape == (2, 3, len(METRICAS_LOOKUP))
+    np.testing.assert_array_equal(matriz[0, :, prob], [0.9, np.nan, 0.7])
+    np.testing.assert_array_equal(matriz[1, :, prob], [0.8, np.nan, 0.6])
+    np.testing.assert_array_equal(matriz[0, :, tempo], [2.0, np.nan, 5.0])
+    assert np.isnan(matriz[1, :, tempo]).all()
+
+
+def test_tabela_exportada_e_em_memoria_com_classe_vazia(tmp_path):
+    metricas = metricas_sem_classe_do_meio()
+    caminho = exportar_tabela(tmp_path / 'tabela_classes.npz', LIMITES, CLASSES, metricas)
+
+    for tabela in (TabelaClasses.carregar(caminho), TabelaClasses.de_metricas(LIMITES, CLASSES, metricas)):
+        vazia = tabela.pontuar(250)
+        assert vazia['classe'] == '200-300'
+        assert np.isnan(vazia['prob_fechamento'])
+
+        assert tabela.pontuar(-350)['prob_fechamento'] == 0.6
+        lote = tabela.pontuar_lote([150, -250, 350])
+        np.testing.assert_array_equal(lote['prob_fechamento'], [0.9, np.nan, 0.7])
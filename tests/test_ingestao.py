@@ -0,0 +1,64 @@
+"""
+Testes de equivalência da ingestão: caminho em memória, particionado (src/data_processor.py)
+e incremental (src/incremental_reader.py) sobre os mesmos dados sintéticos
+"""
+
+import contextlib
+import io
+
+import pytest
+
+from benchmarks.dados_sinteticos import gerar_m1, salvar_m1
+from src.data_processor import DataProcessor
+from src.incremental_reader import IngestaoIncremental
+
+
+@pytest.fixture(scope='module')
+def arquivo_m1(tmp_path_factory):
+    """Arquivo M1 sintético de ~2 meses no layout do MT5"""
+    return salvar_m1(gerar_m1(anos=0.15, semente=7), str(tmp_path_factory.mktemp('dados') / 'WIN$N_M1.csv'))
+
+
+def configuracao(caminho, **extras):
+    return {'DATA_FILE': caminho, 'PROCESSED_DIR': str(caminho).rsplit('/', 1)[0], 'GRAVAR_ARQUIVOS': False, **extras}
+
+
+def em_memoria(config):
+    processador = DataProcessor(config)
+    with contextlib.redirect_stdout(io.StringIO()):
+        dados = processador.processar_dados(processador.carregar_dados_brutos(), salvar_relatorio=False)
+        return processador.agregar_por_dia(dados)
+
+
+def test_em_memoria_e_particionado_iguais(arquivo_m1):
+    esperado = em_memoria(configuracao(arquivo_m1))
+    assert len(esperado) > 30
+
+    # Leituras menores que um dia, de alguns dias e maiores que o arquivo
+    for linhas in (97, 1000, 7919, 10_000_000):
+        processador = DataProcessor(configuracao(arquivo_m1, LINHAS_POR_LEITURA=linhas))
+        with contextlib.redirect_stdout(io.StringIO()):
+            particionado = processador.carregar_e_agregar_particionado()
+        assert particionado.equals(esperado), f"LINHAS_POR_LEITURA={linhas}"
+
+
+def test_incremental_com_acrescimo_no_meio_da_linha(arquivo_m1, tmp_path):
+    esperado = em_memoria(configuracao(arquivo_m1))
+    with open(arquivo_m1, 'rb') as f:
+        conteudo = f.read()
+
+    # Corte no meio de uma linha, dentro de um dia que continua no acréscimo
+    corte = conteudo.index(b'\n', len(conteudo) * 2 // 3) - 5
+    caminho = tmp_path / 'WIN$N_M1.csv'
+    caminho.write_bytes(conteudo[:corte])
+
+    ingestao = IngestaoIncremental(configuracao(str(caminho)))
+    ingestao.carregar()
+    parcial = ingestao.dados_diarios()
+    assert len(parcial) < len(esperado)
+
+    with open(caminho, 'ab') as f:
+        f.write(conteudo[corte:])
+    assert ingestao.atualizar() == 'acrescimo'
+    assert ingestao.dados_diarios().equals(esperado)
+    assert ingestao.atualizar() == 'inalterado'